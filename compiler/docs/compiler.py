@@ -331,6 +331,7 @@ def hydrogram_api():
         Advanced
             invoke
             resolve_peer
+            resolve_peers
             save_file
         """,
     }
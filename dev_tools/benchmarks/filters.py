@@ -0,0 +1,87 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the throughput of ``filters.text & filters.private & ~filters.me``.
+
+Compares the inline evaluation of synchronous filters against running every one of them in the
+client's executor, as it used to be done. Run with ``python -m dev_tools.benchmarks.filters``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+
+from hydrogram import Client, enums, filters, types
+
+ROUNDS = 20000
+
+
+async def run_in_executor(flt, client: Client, update: types.Update):
+    # The former evaluation: one executor round trip per synchronous filter
+    if isinstance(flt, filters.InvertFilter):
+        return not await run_in_executor(flt.base, client, update)
+
+    if isinstance(flt, filters.AndFilter):
+        return await run_in_executor(flt.base, client, update) and await run_in_executor(
+            flt.other, client, update
+        )
+
+    if isinstance(flt, filters.OrFilter):
+        return await run_in_executor(flt.base, client, update) or await run_in_executor(
+            flt.other, client, update
+        )
+
+    if inspect.iscoroutinefunction(flt.__call__):
+        return await flt(client, update)
+
+    return await client.loop.run_in_executor(client.executor, flt, client, update)
+
+
+async def measure(evaluate, flt, client: Client, message: types.Message) -> float:
+    start = time.perf_counter()
+
+    for _ in range(ROUNDS):
+        assert await evaluate(flt, client, message)
+
+    return ROUNDS / (time.perf_counter() - start)
+
+
+async def main():
+    client = Client("benchmark", in_memory=True)
+    message = types.Message(
+        id=1,
+        chat=types.Chat(id=2, type=enums.ChatType.PRIVATE),
+        from_user=types.User(id=2, is_self=False),
+        text="hello",
+    )
+    flt = filters.text & filters.private & ~filters.me
+
+    executor = await measure(run_in_executor, flt, client, message)
+    inline = await measure(filters.run_filter, flt, client, message)
+
+    print(f"{'executor':>10}: {executor:>10.0f} checks/s")
+    print(f"{'inline':>10}: {inline:>10.0f} checks/s ({inline / executor:.1f}x)")
+
+    client.executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure listener lookups with 5000 pending conversations, one per chat and user.
+
+Compares scanning every listener, as it used to be done, against the
+:class:`~hydrogram.types.ListenerIndex`. Run with ``python -m dev_tools.benchmarks.listeners``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from hydrogram.types import Identifier, Listener, ListenerIndex, ListenerTypes
+
+LISTENERS = 5000
+ROUNDS = 2000
+
+
+def scan(listeners: list[Listener], data: Identifier) -> Listener | None:
+    # The former lookup
+    matching = [listener for listener in listeners if listener.identifier.matches(data)]
+
+    return max(matching, key=lambda listener: listener.identifier.count_populated(), default=None)
+
+
+def measure(lookup, listeners, messages: list[Identifier]) -> float:
+    start = time.perf_counter()
+
+    for data in messages:
+        lookup(listeners, data)
+
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    listeners = [
+        Listener(
+            listener_type=ListenerTypes.MESSAGE,
+            filters=None,
+            unallowed_click_alert=True,
+            identifier=Identifier(chat_id=i, from_user_id=i),
+        )
+        for i in range(LISTENERS)
+    ]
+    index = ListenerIndex()
+
+    for listener in listeners:
+        index.append(listener)
+
+    messages = [
+        Identifier(
+            chat_id=[i * 7 % LISTENERS, None],
+            from_user_id=[i * 7 % LISTENERS, None],
+            message_id=i,
+        )
+        for i in range(ROUNDS)
+    ]
+
+    assert scan(listeners, messages[1]) is index.get_most_specific(messages[1])
+
+    scanned = measure(scan, listeners, messages)
+    indexed = measure(ListenerIndex.get_most_specific, index, messages)
+
+    print(f"{'scan':>10}: {scanned:>10.0f} lookups/s")
+    print(f"{'index':>10}: {indexed:>10.0f} lookups/s ({indexed / scanned:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
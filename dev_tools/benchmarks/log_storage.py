@@ -0,0 +1,85 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure peer writes of an update-heavy workload on session files.
+
+Stores 2000 batches of 100 peers drawn from 50000, as fetch_peers does for incoming updates,
+then reopens the session. Compares :class:`~hydrogram.storage.SQLiteStorage` against
+:class:`~hydrogram.storage.LogStorage`. Run with ``python -m dev_tools.benchmarks.log_storage``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from hydrogram.storage import BaseStorage, LogStorage, SQLiteStorage
+
+PEERS = 50000
+BATCHES = 2000
+BATCH_SIZE = 100
+
+
+async def measure(name: str, factory):
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = Path(directory)
+        storage: BaseStorage = factory(workdir)
+        await storage.open()
+
+        start = time.perf_counter()
+
+        for _ in range(BATCHES):
+            await storage.update_peers([
+                (peer_id, peer_id, "user", f"user{peer_id}", None)
+                for peer_id in random.sample(range(1, PEERS + 1), BATCH_SIZE)
+            ])
+
+        written = time.perf_counter() - start
+
+        await storage.close()
+
+        size = sum(path.stat().st_size for path in workdir.iterdir())
+
+        storage = factory(workdir)
+
+        start = time.perf_counter()
+        await storage.open()
+        opened = time.perf_counter() - start
+
+        await storage.get_peer_by_id(1)
+        await storage.close()
+
+    print(
+        f"{name:>10}: {BATCHES * BATCH_SIZE / written:>8.0f} peers/s, "
+        f"open {opened * 1000:6.1f} ms, {size / 1024**2:5.1f} MiB on disk"
+    )
+
+
+async def main():
+    await measure("sqlite", lambda workdir: SQLiteStorage("bench", workdir))
+    await measure("log", lambda workdir: LogStorage("bench", workdir))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the throughput of a CPU-bound handler callback.
+
+Compares running the callback in the client's thread pool executor against running it in the
+process pool with :func:`~hydrogram.process_pool.run_in_process`. Run with
+``python -m dev_tools.benchmarks.process_pool``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from hydrogram import Client, types
+from hydrogram.process_pool import ProcessPool, run_in_process
+
+UPDATES = 64
+
+
+def digest(_, message: types.Message) -> int:
+    # Pure Python work, holding the GIL for the whole time
+    value = len(message.text)
+
+    for i in range(300000):
+        value = (value * 31 + i) % 1000003
+
+    return value
+
+
+async def measure(run, messages: list[types.Message]) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(run(message) for message in messages))
+
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def main():
+    client = Client("benchmark", in_memory=True)
+    messages = [types.Message(id=i, text=f"message {i}") for i in range(UPDATES)]
+
+    pool = ProcessPool(client)
+    callback = run_in_process(digest)
+
+    # Start the workers before measuring
+    await asyncio.gather(*(pool.run(callback, message) for message in messages[:8]))
+
+    threads = await measure(
+        lambda message: client.loop.run_in_executor(client.executor, digest, client, message),
+        messages,
+    )
+    processes = await measure(lambda message: pool.run(callback, message), messages)
+
+    print(f"{'threads':>10}: {threads:>10.1f} updates/s ({client.workers} threads)")
+    print(
+        f"{'processes':>10}: {processes:>10.1f} updates/s ({client.process_workers or os.cpu_count()} processes,"
+        f" {processes / threads:.1f}x)"
+    )
+
+    await pool.stop()
+    client.executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure checking a message against 10, 100 and 1,000 regex patterns.
+
+Compares one :meth:`~hydrogram.filters.regex` filter per pattern against the filters of a single
+:class:`~hydrogram.filters.regex_set`, checking every filter as the dispatcher does when one handler
+per pattern is registered. Run with ``python -m dev_tools.benchmarks.regex_set``.
+"""
+
+from __future__ import annotations
+
+import time
+
+from hydrogram import Client, filters, types
+
+PATTERNS = (10, 100, 1000)
+ROUNDS = 20
+
+TEXT = (
+    "Hello everyone, this is a perfectly normal message sent to a group chat. It talks about the "
+    "weather, the plans for the weekend and links to nothing suspicious at all. See you tomorrow!"
+)
+
+
+def measure(client: Client, checks: list[filters.Filter]) -> float:
+    start = time.perf_counter()
+
+    for _ in range(ROUNDS):
+        message = types.Message(id=1, text=TEXT)
+
+        for check in checks:
+            check(client, message)
+
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def main():
+    client = Client("benchmark", in_memory=True)
+
+    print(f"{'patterns':>10} {'regex (ms)':>11} {'regex_set (ms)':>15} {'speedup':>8}")
+
+    for count in PATTERNS:
+        patterns = [rf"\bforbidden{i}\b|sp[a4]m{i}" for i in range(count)]
+
+        regex = measure(client, [filters.regex(pattern) for pattern in patterns])
+
+        regex_set = filters.regex_set(patterns)
+        combined = measure(client, [regex_set[i] for i in range(count)])
+
+        print(
+            f"{count:>10} {regex * 1000:>11.3f} {combined * 1000:>15.3f} {regex / combined:>7.1f}x"
+        )
+
+    client.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the dispatcher throughput by replaying a recording of 20000 private messages.
+
+The recording is written to a temporary file with :class:`~hydrogram.updates.UpdateRecorder` and
+replayed as fast as possible into a filtered message handler of a
+:class:`~hydrogram.updates.replay.ReplayClient`. Pass the path of a real recording to replay it
+instead. Run with ``python -m dev_tools.benchmarks.replay [path]``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+from hydrogram import filters, raw
+from hydrogram.updates import UpdateRecorder
+from hydrogram.updates.replay import ReplayClient, UpdateReplayer
+
+UPDATES = 20000
+USERS = 100
+
+
+def record(path: str):
+    recorder = UpdateRecorder(path)
+
+    for i in range(UPDATES):
+        user_id = i % USERS + 1
+
+        recorder.record(
+            raw.types.Updates(
+                updates=[
+                    raw.types.UpdateNewMessage(
+                        message=raw.types.Message(
+                            id=i + 1,
+                            peer_id=raw.types.PeerUser(user_id=user_id),
+                            from_id=raw.types.PeerUser(user_id=user_id),
+                            date=0,
+                            message=f"/start {i}",
+                        ),
+                        pts=i + 1,
+                        pts_count=1,
+                    )
+                ],
+                users=[raw.types.User(id=user_id, access_hash=user_id, first_name="User")],
+                chats=[],
+                date=0,
+                seq=0,
+            )
+        )
+
+    recorder.close()
+
+
+async def replay(path: str):
+    client = ReplayClient()
+    handled = 0
+
+    @client.on_message(filters.private & filters.text)
+    async def on_message(_, __):
+        nonlocal handled
+        handled += 1
+        await asyncio.sleep(0)
+
+    await client.start()
+
+    replayer = UpdateReplayer(client, path)
+    await replayer.replay(speed=None)
+
+    await client.stop()
+
+    print(
+        f"{'updates':>10}: {replayer.updates:>10} ({replayer.skipped} skipped, {handled} handled)"
+    )
+    print(f"{'elapsed':>10}: {replayer.elapsed:>10.2f} s")
+    print(f"{'replay':>10}: {replayer.throughput:>10.0f} updates/s")
+
+
+def main():
+    if len(sys.argv) > 1:
+        asyncio.run(replay(sys.argv[1]))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "updates.bin")
+
+        record(path)
+        asyncio.run(replay(path))
+
+
+if __name__ == "__main__":
+    main()
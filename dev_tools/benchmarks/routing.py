@@ -0,0 +1,93 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the cost of finding the handler of a message among 10, 100 and 1,000 handlers.
+
+Every handler filters a different command; the message matches the last one registered, which is
+the worst case for a linear scan. Run with ``python -m dev_tools.benchmarks.routing``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from hydrogram import Client, enums, filters, types
+from hydrogram.handlers import MessageHandler
+
+HANDLERS = (10, 100, 1000)
+ROUNDS = 200
+
+
+async def callback(*_):
+    pass
+
+
+async def find_handler(client: Client, message: types.Message, prune: bool) -> MessageHandler:
+    for group in client.dispatcher.router.route(message, MessageHandler, prune=prune):
+        for handler in group:
+            if await handler.check(client, message):
+                return handler
+
+    raise LookupError("No handler found")
+
+
+async def measure(client: Client, message: types.Message, prune: bool) -> float:
+    start = time.perf_counter()
+
+    for _ in range(ROUNDS):
+        await find_handler(client, message, prune)
+
+    return (time.perf_counter() - start) / ROUNDS
+
+
+async def main():
+    client = Client("benchmark", in_memory=True)
+    client.me = types.User(id=1, username="benchmark_bot", is_self=True)
+
+    print(f"{'handlers':>10} {'linear (ms)':>12} {'indexed (ms)':>13} {'speedup':>8}")
+
+    for count in HANDLERS:
+        for group in client.dispatcher.groups.values():
+            group.clear()
+
+        for i in range(count):
+            client.dispatcher.add_handler(
+                MessageHandler(callback, filters.command(f"command{i}") & filters.private), 0
+            )
+
+        message = types.Message(
+            id=1,
+            chat=types.Chat(id=2, type=enums.ChatType.PRIVATE),
+            from_user=types.User(id=2),
+            text=f"/command{count - 1} argument",
+        )
+
+        linear = await measure(client, message, prune=False)
+        indexed = await measure(client, message, prune=True)
+
+        print(
+            f"{count:>10} {linear * 1000:>12.3f} {indexed * 1000:>13.3f} {linear / indexed:>7.1f}x"
+        )
+
+    client.executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
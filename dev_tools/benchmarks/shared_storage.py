@@ -0,0 +1,99 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the footprint of 200 sessions storing mostly the same peers.
+
+Every session stores 2000 peers common to all of them, such as popular channels, and 100 of its
+own. Compares a :class:`~hydrogram.storage.SQLiteStorage` file per session against a single
+:class:`~hydrogram.storage.SharedDatabase`. Run with ``python -m dev_tools.benchmarks.shared_storage``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from itertools import starmap
+from pathlib import Path
+
+from hydrogram.storage import BaseStorage, SharedDatabase, SQLiteStorage
+
+ACCOUNTS = 200
+COMMON_PEERS = 2000
+OWN_PEERS = 100
+
+
+def open_files() -> int:
+    # Linux only
+    return len(os.listdir("/proc/self/fd")) if Path("/proc/self/fd").is_dir() else -1
+
+
+async def measure(name: str, workdir: Path, storages: list[BaseStorage]):
+    start = time.perf_counter()
+
+    await asyncio.gather(*(storage.open() for storage in storages))
+
+    threads = threading.active_count()
+    files = open_files()
+
+    async def store(index: int, storage: BaseStorage):
+        own = (index + 1) * 1000000
+
+        await storage.update_peers([
+            (peer_id, peer_id + index, "user", f"user{peer_id}", None)
+            for peer_id in [*range(1, COMMON_PEERS + 1), *range(own, own + OWN_PEERS)]
+        ])
+
+    await asyncio.gather(*starmap(store, enumerate(storages)))
+    await asyncio.gather(*(storage.close() for storage in storages))
+
+    elapsed = time.perf_counter() - start
+    size = sum(path.stat().st_size for path in workdir.iterdir())
+
+    print(
+        f"{name:>10}: {threads:>4} threads, {files:>4} open files, "
+        f"{size / 1024**2:6.1f} MiB on disk, {elapsed:5.2f} s"
+    )
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = Path(directory)
+
+        await measure(
+            "separate",
+            workdir,
+            [SQLiteStorage(f"account{i}", workdir) for i in range(ACCOUNTS)],
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = Path(directory)
+        database = SharedDatabase(workdir / "accounts.db")
+
+        await measure(
+            "shared",
+            workdir,
+            [database.storage(f"account{i}") for i in range(ACCOUNTS)],
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure the startup time of a session file with 5 million peers.
+
+The file is created with the schema of version 4, which :class:`~hydrogram.storage.SQLiteStorage`
+used to VACUUM on every start. Compares that full VACUUM against the first start, which migrates the
+file to incremental auto-vacuum with one last VACUUM, and the starts after it. Run with
+``python -m dev_tools.benchmarks.startup [peers]``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hydrogram.storage import SQLiteStorage
+
+PEERS = 5000000
+BATCH = 100000
+
+V4_SCHEMA = """
+CREATE TABLE sessions (dc_id INTEGER PRIMARY KEY, api_id INTEGER, test_mode INTEGER, auth_key BLOB,
+                       date INTEGER NOT NULL, user_id INTEGER, is_bot INTEGER);
+CREATE TABLE peers (id INTEGER PRIMARY KEY, access_hash INTEGER, type INTEGER NOT NULL, username TEXT,
+                    phone_number TEXT,
+                    last_update_on INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER)));
+CREATE TABLE update_state (id INTEGER PRIMARY KEY, pts INTEGER, qts INTEGER, date INTEGER, seq INTEGER);
+CREATE TABLE version (number INTEGER PRIMARY KEY);
+CREATE INDEX idx_peers_id ON peers (id);
+CREATE INDEX idx_peers_username ON peers (username);
+CREATE INDEX idx_peers_phone_number ON peers (phone_number);
+INSERT INTO version VALUES (4);
+INSERT INTO sessions VALUES (2, 1, 0, NULL, 0, 1, 0);
+"""
+
+
+def create(path: Path, peers: int):
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(V4_SCHEMA)
+
+        for start in range(0, peers, BATCH):
+            conn.executemany(
+                "INSERT INTO peers (id, access_hash, type, username) VALUES (?, ?, 'user', ?)",
+                ((i, i, f"user{i}" if i % 4 == 0 else None) for i in range(start, start + BATCH)),
+            )
+            conn.commit()
+
+    conn.close()
+
+
+def vacuum(path: Path):
+    with sqlite3.connect(path) as conn:
+        conn.execute("VACUUM")
+
+    conn.close()
+
+
+async def start(workdir: Path) -> float:
+    storage = SQLiteStorage("bench", workdir)
+
+    begin = time.perf_counter()
+    await storage.open()
+    elapsed = time.perf_counter() - begin
+
+    await storage.close()
+
+    return elapsed
+
+
+def main():
+    peers = int(sys.argv[1]) if len(sys.argv) > 1 else PEERS
+
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = Path(directory)
+        path = workdir / f"bench{SQLiteStorage.FILE_EXTENSION}"
+
+        create(path, peers)
+        print(f"{'peers':>10}: {peers} ({path.stat().st_size / 1024**2:.0f} MiB)")
+
+        begin = time.perf_counter()
+        vacuum(path)
+        print(f"{'vacuum':>10}: {time.perf_counter() - begin:>8.2f} s (every start before)")
+
+        print(f"{'migrate':>10}: {asyncio.run(start(workdir)):>8.2f} s (first start, once)")
+        print(f"{'start':>10}: {asyncio.run(start(workdir)):>8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/bin/env python
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measure peer lookup latency of a session file while peers are being written.
+
+A writer stores bursts of 1000 peers, as fetch_peers does for large updates, while 20
+concurrent lookups run in a loop. Compares a single connection, as it used to be, against
+the read-only connection pool of :class:`~hydrogram.storage.SQLiteStorage`. Run with
+``python -m dev_tools.benchmarks.storage``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from hydrogram.storage import SQLiteStorage
+
+PEERS = 100000
+BURST = 1000
+LOOKUPS = 20
+DURATION = 3
+
+
+def peers(start: int, count: int) -> list[tuple]:
+    return [(i, i, "user", f"user{i}", None) for i in range(start, start + count)]
+
+
+async def measure(workdir: Path, readers: int) -> list[float]:
+    storage = SQLiteStorage(f"readers{readers}", workdir)
+    storage.READERS = readers
+
+    await storage.open()
+    await storage.update_peers(peers(1, PEERS))
+
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+
+    async def write():
+        start = 1
+
+        while time.perf_counter() < deadline:
+            await storage.update_peers(peers(start, BURST))
+            start = start % PEERS + BURST
+
+    async def lookup(offset: int):
+        peer_id = offset + 1
+
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await storage.get_peer_by_id(peer_id)
+            latencies.append(time.perf_counter() - start)
+
+            peer_id = (peer_id * 7919) % PEERS + 1
+
+    await asyncio.gather(write(), *(lookup(i) for i in range(LOOKUPS)))
+    await storage.close()
+
+    return latencies
+
+
+def report(name: str, latencies: list[float]):
+    quantiles = statistics.quantiles(latencies, n=100)
+
+    print(
+        f"{name:>10}: {len(latencies) / DURATION:>8.0f} lookups/s, "
+        f"p50 {quantiles[49] * 1000:6.2f} ms, p99 {quantiles[98] * 1000:6.2f} ms"
+    )
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        report("single", await measure(Path(directory), 0))
+        report("pool", await measure(Path(directory), SQLiteStorage.READERS))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -23,6 +23,7 @@ import asyncio
 import contextlib
 import functools
 import inspect
+import itertools
 import logging
 import os
 import platform
@@ -47,15 +48,14 @@ from hydrogram.errors import (
     AuthBytesInvalid,
     BadRequest,
     CDNFileHashMismatch,
-    ChannelPrivate,
     SessionPasswordNeeded,
     VolumeLocNotFound,
 )
 from hydrogram.handlers.handler import Handler
 from hydrogram.methods import Methods
 from hydrogram.session import Auth, Session
-from hydrogram.storage import BaseStorage, SQLiteStorage
-from hydrogram.types import ListenerTypes, TermsOfService, User
+from hydrogram.storage import BaseStorage, PeerCache, SQLiteStorage
+from hydrogram.types import ListenerIndex, ListenerTypes, TermsOfService, User
 from hydrogram.utils import ainput
 
 from .connection import Connection
@@ -64,7 +64,9 @@ from .dispatcher import Dispatcher
 from .file_id import FileId, FileType, ThumbnailSource
 from .mime_types import mime_types
 from .parser import Parser
+from .peer_resolver import PeerResolver
 from .session.internals import MsgId
+from .updates import MinPeerResolver, ShortMessageBuilder, UpdateRecorder, UpdatesManager
 
 if TYPE_CHECKING:
     import builtins
@@ -153,6 +155,32 @@ class Client(Methods):
             Number of maximum concurrent workers for handling incoming updates.
             Defaults to ``min(32, os.cpu_count() + 4)``.
 
+        sharded_updates (``bool``, *optional*):
+            Pass True to dispatch updates to one lane per worker based on their chat.
+            Updates of the same chat are handled one at a time and in the order they are received, while
+            updates of different chats are still handled concurrently.
+            Defaults to False (any worker handles any update).
+
+        lane_size (``int``, *optional*):
+            Maximum amount of pending updates per lane when *sharded_updates* is enabled.
+            Once a lane is full, no more updates are dispatched until it has room again.
+            Defaults to 1000.
+
+        process_workers (``int``, *optional*):
+            Number of worker processes running the handler callbacks marked with
+            :func:`~hydrogram.process_pool.run_in_process`. They are started on the first of such callbacks.
+            Defaults to ``os.cpu_count()``.
+
+        update_stream (``str``, *optional*):
+            Path of a Unix domain socket to publish the raw updates to, so that other processes can consume
+            them with :obj:`~hydrogram.updates.UpdateConsumer`. Registered handlers keep working as usual.
+            Defaults to None (updates are not published).
+
+        record_updates (``str``, *optional*):
+            Path of a file to record the raw updates received by the client to, so that they can be replayed
+            later with :obj:`~hydrogram.updates.replay.UpdateReplayer`, e.g. for benchmarks and regression tests.
+            Defaults to None (updates are not recorded).
+
         workdir (``str``, *optional*):
             Define a custom working directory.
             The working directory is the location in the filesystem where Hydrogram will store the session files.
@@ -243,6 +271,11 @@ class Client(Methods):
         phone_code: str | None = None,
         password: str | None = None,
         workers: int = WORKERS,
+        sharded_updates: bool = False,
+        lane_size: int = Dispatcher.LANE_SIZE,
+        process_workers: int | None = None,
+        update_stream: str | None = None,
+        record_updates: str | None = None,
         workdir: str = str(WORKDIR),
         plugins: dict | None = None,
         parse_mode: enums.ParseMode = enums.ParseMode.DEFAULT,
@@ -273,6 +306,11 @@ class Client(Methods):
         self.phone_code = phone_code
         self.password = password
         self.workers = workers
+        self.sharded_updates = sharded_updates
+        self.lane_size = lane_size
+        self.process_workers = process_workers
+        self.update_stream = update_stream
+        self.record_updates = record_updates
         self.workdir = Path(workdir)
         self.plugins = plugins
         self.parse_mode = parse_mode
@@ -297,8 +335,18 @@ class Client(Methods):
         else:
             self.storage = SQLiteStorage(self.name, self.workdir)
 
+        self.peer_cache = PeerCache(self.storage)
+
         self.dispatcher = Dispatcher(self)
 
+        self.updates_manager = UpdatesManager(self)
+        self.min_peer_resolver = MinPeerResolver(self)
+        self.peer_resolver = PeerResolver(self)
+        self.short_message_builder = ShortMessageBuilder(self)
+        self.update_recorder = (
+            UpdateRecorder(record_updates) if record_updates is not None else None
+        )
+
         self.rnd_id = MsgId
 
         self.parser = Parser(self)
@@ -330,7 +378,7 @@ class Client(Methods):
         self.updates_watchdog_event = asyncio.Event()
         self.last_update_time = datetime.now()
 
-        self.listeners = {listener_type: [] for listener_type in ListenerTypes}
+        self.listeners = {listener_type: ListenerIndex() for listener_type in ListenerTypes}
 
     async def __aenter__(self):
         return await self.start()
@@ -527,6 +575,7 @@ class Client(Methods):
     ) -> bool:
         is_min = False
         parsed_peers = []
+        raw_peers = {}
 
         for peer in peers:
             if getattr(peer, "min", False):
@@ -571,67 +620,62 @@ class Client(Methods):
                 continue
 
             parsed_peers.append((peer_id, access_hash, peer_type, username, phone_number))
+            raw_peers[peer_id] = peer
 
-        await self.storage.update_peers(parsed_peers)
+        self.peer_cache.update_raw_peers(raw_peers)
+        await self.peer_cache.update_peers(parsed_peers)
 
         return is_min
 
     async def handle_updates(self, updates):
         self.last_update_time = datetime.now()
 
+        if self.update_recorder is not None:
+            self.update_recorder.record(updates)
+
         if isinstance(updates, (raw.types.Updates, raw.types.UpdatesCombined)):
             is_min = any((
                 await self.fetch_peers(updates.users),
                 await self.fetch_peers(updates.chats),
             ))
 
+            if not self.updates_manager.check_seq(updates):
+                return
+
             users = {u.id: u for u in updates.users}
             chats = {c.id: c for c in updates.chats}
 
-            for update in updates.updates:
-                channel_id = getattr(
-                    getattr(getattr(update, "message", None), "peer_id", None),
-                    "channel_id",
-                    None,
-                ) or getattr(update, "channel_id", None)
+            if is_min:
+                min_messages: dict[int, list[int]] = {}
+
+                for update in updates.updates:
+                    if (
+                        isinstance(update, raw.types.UpdateNewChannelMessage)
+                        and not isinstance(update.message, raw.types.MessageEmpty)
+                        and not self.updates_manager.is_duplicate(update)
+                    ):
+                        min_messages.setdefault(update.message.peer_id.channel_id, []).append(
+                            update.message.id
+                        )
 
-                pts = getattr(update, "pts", None)
-                pts_count = getattr(update, "pts_count", None)
+                for resolved_users, resolved_chats in await asyncio.gather(
+                    *itertools.starmap(self.min_peer_resolver.resolve, min_messages.items())
+                ):
+                    users.update(resolved_users)
+                    chats.update(resolved_chats)
 
-                if isinstance(update, raw.types.UpdateChannelTooLong):
-                    log.info(update)
+            for update in updates.updates:
+                self.updates_manager.process_update(update, users, chats)
 
-                if isinstance(update, raw.types.UpdateNewChannelMessage) and is_min:
-                    message = update.message
+            self.updates_manager.update_seq(updates)
+        elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
+            if self.updates_manager.is_duplicate(updates):
+                return
 
-                    if not isinstance(message, raw.types.MessageEmpty):
-                        try:
-                            diff = await self.invoke(
-                                raw.functions.updates.GetChannelDifference(
-                                    channel=await self.resolve_peer(
-                                        utils.get_channel_id(channel_id)
-                                    ),
-                                    filter=raw.types.ChannelMessagesFilter(
-                                        ranges=[
-                                            raw.types.MessageRange(
-                                                min_id=update.message.id,
-                                                max_id=update.message.id,
-                                            )
-                                        ]
-                                    ),
-                                    pts=pts - pts_count,
-                                    limit=pts,
-                                )
-                            )
-                        except ChannelPrivate:
-                            pass
-                        else:
-                            if not isinstance(diff, raw.types.updates.ChannelDifferenceEmpty):
-                                users.update({u.id: u for u in diff.users})
-                                chats.update({c.id: c for c in diff.chats})
+            if built := await self.short_message_builder.build(updates):
+                self.updates_manager.process_update(*built)
+                return
 
-                self.dispatcher.updates_queue.put_nowait((update, users, chats))
-        elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
             diff = await self.invoke(
                 raw.functions.updates.GetDifference(
                     pts=updates.pts - updates.pts_count, date=updates.date, qts=-1
@@ -639,7 +683,7 @@ class Client(Methods):
             )
 
             if diff.new_messages:
-                self.dispatcher.updates_queue.put_nowait((
+                self.updates_manager.process_update(
                     raw.types.UpdateNewMessage(
                         message=diff.new_messages[0],
                         pts=updates.pts,
@@ -647,13 +691,15 @@ class Client(Methods):
                     ),
                     {u.id: u for u in diff.users},
                     {c.id: c for c in diff.chats},
-                ))
+                )
             elif diff.other_updates:  # The other_updates list can be empty
-                self.dispatcher.updates_queue.put_nowait((diff.other_updates[0], {}, {}))
+                self.updates_manager.process_update(diff.other_updates[0], {}, {})
         elif isinstance(updates, raw.types.UpdateShort):
-            self.dispatcher.updates_queue.put_nowait((updates.update, {}, {}))
+            self.updates_manager.process_update(updates.update, {}, {})
+            self.updates_manager.update_seq(updates)
         elif isinstance(updates, raw.types.UpdatesTooLong):
             log.info(updates)
+            self.updates_manager.recover()
 
     async def load_session(self):
         await self.storage.open()
@@ -23,10 +23,10 @@ import asyncio
 import inspect
 import logging
 from collections import OrderedDict
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, ClassVar
 
 import hydrogram
-from hydrogram import raw, types, utils
+from hydrogram import filters, raw, types, utils
 from hydrogram.handlers import (
     CallbackQueryHandler,
     ChatJoinRequestHandler,
@@ -36,11 +36,13 @@ from hydrogram.handlers import (
     EditedMessageHandler,
     ErrorHandler,
     InlineQueryHandler,
+    MessageBatchHandler,
     MessageHandler,
     PollHandler,
     RawUpdateHandler,
     UserStatusHandler,
 )
+from hydrogram.process_pool import ProcessPool
 from hydrogram.raw.types import (
     UpdateBotCallbackQuery,
     UpdateBotChatInviteRequester,
@@ -59,6 +61,9 @@ from hydrogram.raw.types import (
     UpdateNewScheduledMessage,
     UpdateUserStatus,
 )
+from hydrogram.routing import HandlerRouter
+from hydrogram.types import ListenerTypes
+from hydrogram.updates.stream import UpdatePublisher
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable
@@ -81,13 +86,47 @@ class Dispatcher:
     CHOSEN_INLINE_RESULT_UPDATES = (UpdateBotInlineSend,)
     CHAT_JOIN_REQUEST_UPDATES = (UpdateBotChatInviteRequester,)
 
+    LISTENER_TYPES: ClassVar[dict[type[Handler], ListenerTypes]] = {
+        MessageHandler: ListenerTypes.MESSAGE,
+        CallbackQueryHandler: ListenerTypes.CALLBACK_QUERY,
+    }
+
+    # Maximum amount of pending updates per lane in sharded mode
+    LANE_SIZE = 1000
+
     def __init__(self, client: hydrogram.Client):
         self.client = client
         self.handler_worker_tasks: list[asyncio.Task] = []
-        self.locks_list: list[asyncio.Lock] = []
         self.updates_queue = asyncio.Queue()
+
+        # Sharded mode: one FIFO lane per worker, updates of the same chat always go to the same lane
+        self.router_task: asyncio.Task | None = None
+        self.lanes: list[asyncio.Queue] = []
+        self.lane_processed: list[int] = []
+        self.lane_peak_sizes: list[int] = []
+
         self.groups: dict[int, list[Handler]] = OrderedDict()
         self.error_handlers: list[ErrorHandler] = []
+
+        # Every class (and base class) of the registered handlers, used to skip parsing updates that
+        # no handler is going to receive
+        self.handler_types: set[type[Handler]] = set()
+        self.skipped_updates = 0
+
+        self.router = HandlerRouter()
+
+        # Runs the callbacks marked with hydrogram.process_pool.run_in_process
+        self.process_pool = ProcessPool(client)
+
+        # Publishes the raw updates to other processes, see Client(update_stream=...)
+        self.publisher = (
+            UpdatePublisher(client.update_stream) if client.update_stream is not None else None
+        )
+
+        # Results of deterministic filters reused (hits) or computed (misses) while handling updates
+        self.filter_cache_hits = 0
+        self.filter_cache_misses = 0
+
         self._init_update_parsers()
 
     def _init_update_parsers(self):
@@ -120,6 +159,25 @@ class Dispatcher:
             for key in key_tuple:
                 self.update_parsers[key] = parser
 
+        update_handler_types = {
+            self.NEW_MESSAGE_UPDATES: MessageHandler,
+            self.EDIT_MESSAGE_UPDATES: EditedMessageHandler,
+            self.DELETE_MESSAGES_UPDATES: DeletedMessagesHandler,
+            self.CALLBACK_QUERY_UPDATES: CallbackQueryHandler,
+            self.USER_STATUS_UPDATES: UserStatusHandler,
+            self.BOT_INLINE_QUERY_UPDATES: InlineQueryHandler,
+            self.POLL_UPDATES: PollHandler,
+            self.CHOSEN_INLINE_RESULT_UPDATES: ChosenInlineResultHandler,
+            self.CHAT_MEMBER_UPDATES: ChatMemberUpdatedHandler,
+            self.CHAT_JOIN_REQUEST_UPDATES: ChatJoinRequestHandler,
+        }
+
+        self.update_handler_types: dict[type[raw.core.TLObject], type[Handler]] = {}
+
+        for key_tuple, handler_type in update_handler_types.items():
+            for key in key_tuple:
+                self.update_handler_types[key] = handler_type
+
     async def _message_parser(
         self,
         update: UpdateNewMessage,
@@ -220,23 +278,64 @@ class Dispatcher:
 
     async def start(self):
         if not self.client.no_updates:
-            self.locks_list = [asyncio.Lock() for _ in range(self.client.workers)]
-            self.handler_worker_tasks = [
-                self.client.loop.create_task(self.handler_worker(lock)) for lock in self.locks_list
-            ]
+            if self.publisher is not None:
+                await self.publisher.start()
+
+            if self.client.sharded_updates:
+                self.lanes = [
+                    asyncio.Queue(self.client.lane_size) for _ in range(self.client.workers)
+                ]
+                self.lane_processed = [0] * self.client.workers
+                self.lane_peak_sizes = [0] * self.client.workers
+                self.handler_worker_tasks = [
+                    self.client.loop.create_task(self.lane_worker(index))
+                    for index in range(self.client.workers)
+                ]
+                self.router_task = self.client.loop.create_task(self.lane_router())
+            else:
+                self.handler_worker_tasks = [
+                    self.client.loop.create_task(self.handler_worker())
+                    for _ in range(self.client.workers)
+                ]
             log.info("Started %s HandlerTasks", self.client.workers)
 
     async def stop(self):
         if not self.client.no_updates:
-            for _ in range(self.client.workers):
+            if self.router_task is not None:
+                # The router forwards the stop signal to every lane
                 self.updates_queue.put_nowait(None)
+                await self.router_task
+                self.router_task = None
+            else:
+                for _ in range(self.client.workers):
+                    self.updates_queue.put_nowait(None)
             await asyncio.gather(*self.handler_worker_tasks)
             self.handler_worker_tasks.clear()
+
+            await self._flush_batches()
+
             self.groups.clear()
             self.error_handlers.clear()
+            self._index_handlers()
+
+            await self.process_pool.stop()
+
+            if self.publisher is not None:
+                await self.publisher.stop()
 
             log.info("Stopped %s HandlerTasks", self.client.workers)
 
+    async def _flush_batches(self):
+        # Deliver the messages still waiting in batches
+        for group in self.groups.values():
+            for handler in group:
+                if isinstance(handler, MessageBatchHandler):
+                    try:
+                        await asyncio.gather(*handler.flush_tasks)
+                        await handler.flush(self.client)
+                    except Exception as e:
+                        log.exception(e)
+
     def add_handler(self, handler: Handler, group: int):
         if isinstance(handler, ErrorHandler):
             if handler not in self.error_handlers:
@@ -246,6 +345,7 @@ class Dispatcher:
                 self.groups[group] = []
                 self.groups = OrderedDict(sorted(self.groups.items()))
             self.groups[group].append(handler)
+            self._index_handlers()
 
     def remove_handler(self, handler: Handler, group: int):
         if isinstance(handler, ErrorHandler):
@@ -259,21 +359,131 @@ class Dispatcher:
             if group not in self.groups:
                 raise ValueError(f"Group {group} does not exist. Handler was not removed.")
             self.groups[group].remove(handler)
+            self._index_handlers()
+
+    def _index_handlers(self):
+        self.handler_types = {
+            handler_class
+            for group in self.groups.values()
+            for handler in group
+            for handler_class in type(handler).__mro__
+        }
+        self.router.build(self.groups.values())
+
+    def _can_be_handled(self, update: raw.core.TLObject) -> bool:
+        if RawUpdateHandler in self.handler_types:
+            return True
+
+        handler_type = self.update_handler_types.get(type(update))
 
-    async def handler_worker(self, lock: asyncio.Lock):
+        if handler_type is None:
+            return False
+
+        if handler_type in self.handler_types:
+            return True
+
+        # Listeners are fulfilled by the handlers of their kind, which must be registered
+        listener_type = self.LISTENER_TYPES.get(handler_type)
+
+        return listener_type is not None and bool(self.client.listeners[listener_type])
+
+    async def handler_worker(self):
         while True:
             packet = await self.updates_queue.get()
             if packet is None:
                 break
-            await self._process_packet(packet, lock)
+            await self._process_packet(packet)
+
+    async def lane_router(self):
+        while True:
+            packet = await self.updates_queue.get()
+
+            if packet is None:
+                for lane in self.lanes:
+                    await lane.put(None)
+                break
+
+            index = self._get_lane_index(packet[0])
+            lane = self.lanes[index]
+
+            # Blocks when the lane is full, so that a slow chat applies backpressure instead of
+            # growing its queue indefinitely
+            await lane.put(packet)
+
+            self.lane_peak_sizes[index] = max(self.lane_peak_sizes[index], lane.qsize())
+
+    async def lane_worker(self, index: int):
+        lane = self.lanes[index]
+
+        while True:
+            packet = await lane.get()
+            if packet is None:
+                break
+            await self._process_packet(packet)
+            self.lane_processed[index] += 1
+
+    @property
+    def lane_imbalance(self) -> float:
+        """Ratio between the busiest lane and the average lane in terms of processed updates.
+
+        ``1.0`` means updates are evenly spread across lanes.
+        """
+        total = sum(self.lane_processed)
+
+        if not total:
+            return 1.0
+
+        return max(self.lane_processed) * len(self.lane_processed) / total
+
+    @property
+    def filter_cache_hit_rate(self) -> float:
+        """Fraction of deterministic filter checks answered by the per-update filter cache."""
+        total = self.filter_cache_hits + self.filter_cache_misses
+
+        return self.filter_cache_hits / total if total else 0.0
+
+    def _get_lane_index(self, update: raw.core.TLObject) -> int:
+        chat_id = self._get_update_chat_id(update)
+
+        if chat_id is None:
+            # Updates not bound to a chat don't need ordering, pick the least busy lane
+            return min(range(len(self.lanes)), key=lambda i: self.lanes[i].qsize())
+
+        return chat_id % len(self.lanes)
+
+    @staticmethod
+    def _get_update_chat_id(update: raw.core.TLObject) -> int | None:
+        peer = getattr(getattr(update, "message", None), "peer_id", None) or getattr(
+            update, "peer", None
+        )
+
+        if isinstance(peer, (raw.types.PeerUser, raw.types.PeerChat, raw.types.PeerChannel)):
+            return utils.get_raw_peer_id(peer)
+
+        for attribute in ("channel_id", "chat_id", "user_id"):
+            chat_id = getattr(update, attribute, None)
+
+            if isinstance(chat_id, int):
+                return chat_id
+
+        return None
 
     async def _process_packet(
         self,
         packet: tuple[raw.core.TLObject, dict[int, types.Update], dict[int, types.Update]],
-        lock: asyncio.Lock,
     ):
+        cache = None
+
         try:
             update, users, chats = packet
+
+            if self.publisher is not None:
+                await self.publisher.publish(update, users, chats)
+
+            if not self._can_be_handled(update):
+                self.skipped_updates += 1
+                return
+
             parser = self.update_parsers.get(type(update))
 
             if parser is not None:
@@ -285,30 +495,47 @@ class Dispatcher:
             else:
                 parsed_update, handler_type = (None, type(None))
 
-            async with lock:
-                for group in self.groups.values():
-                    for handler in group:
-                        try:
-                            if parsed_update is not None:
-                                if isinstance(handler, handler_type) and await handler.check(
-                                    self.client, parsed_update
-                                ):
-                                    await self._execute_callback(handler, parsed_update)
-                                    break
-                            elif isinstance(handler, RawUpdateHandler):
-                                await self._execute_callback(handler, update, users, chats)
+            if hasattr(parsed_update, "__dict__"):
+                cache = parsed_update._filter_cache = filters.FilterCache()
+
+            if parsed_update is not None:
+                # A pending listener makes a handler match regardless of its filters
+                listener_type = self.LISTENER_TYPES.get(handler_type)
+                groups = self.router.route(
+                    parsed_update,
+                    handler_type,
+                    prune=not (listener_type and self.client.listeners[listener_type]),
+                )
+            else:
+                groups = self.router.route(None, RawUpdateHandler, prune=False)
+
+            for group in groups:
+                for handler in group:
+                    try:
+                        if parsed_update is not None:
+                            if isinstance(handler, handler_type) and await handler.check(
+                                self.client, parsed_update
+                            ):
+                                await self._execute_callback(handler, parsed_update)
                                 break
-                        except (hydrogram.StopPropagation, hydrogram.ContinuePropagation) as e:
-                            if isinstance(e, hydrogram.StopPropagation):
-                                raise
-                        except Exception as exception:
-                            if parsed_update is not None:
-                                await self._handle_exception(parsed_update, exception)
+                        elif isinstance(handler, RawUpdateHandler):
+                            await self._execute_callback(handler, update, users, chats)
+                            break
+                    except (hydrogram.StopPropagation, hydrogram.ContinuePropagation) as e:
+                        if isinstance(e, hydrogram.StopPropagation):
+                            raise
+                    except Exception as exception:
+                        if parsed_update is not None:
+                            await self._handle_exception(parsed_update, exception)
         except hydrogram.StopPropagation:
             pass
         except Exception as e:
             log.exception(e)
         finally:
+            if cache is not None:
+                self.filter_cache_hits += cache.hits
+                self.filter_cache_misses += cache.misses
+
             self.updates_queue.task_done()
 
     async def _handle_exception(self, parsed_update: types.Update, exception: Exception):
@@ -329,7 +556,9 @@ class Dispatcher:
             log.exception("Unhandled exception: %s", exception)
 
     async def _execute_callback(self, handler: Handler, *args):
-        if inspect.iscoroutinefunction(handler.callback):
+        if getattr(handler.callback, "run_in_process", False):
+            await self.process_pool.run(handler.callback, *args)
+        elif inspect.iscoroutinefunction(handler.callback):
             await handler.callback(self.client, *args)
         else:
             await self.client.loop.run_in_executor(
@@ -19,10 +19,14 @@
 
 from __future__ import annotations
 
+import builtins
+import functools
 import inspect
 import re
+import time
+import warnings
 from re import Pattern
-from typing import Callable
+from typing import Any, Callable
 
 import hydrogram
 from hydrogram import enums
@@ -37,6 +41,18 @@ from hydrogram.types import (
 
 
 class Filter:
+    # Pass True (e.g.: as keyword argument of :meth:`create`) for synchronous filters doing blocking
+    # work, so that they are run in the client's executor instead of inline in the event loop
+    blocking = False
+
+    # Pass True for filters whose result only depends on the update being checked, so that it's
+    # computed once per update no matter how many handlers use the filter (see :class:`FilterCache`)
+    deterministic = False
+
+    # Pass False for filters with side effects on the update, such as setting one of its fields, so
+    # that adaptive chains (see :meth:`adaptive`) never move them
+    reorderable = True
+
     async def __call__(self, client: hydrogram.Client, update: Update):
         raise NotImplementedError
 
@@ -49,64 +65,335 @@ class Filter:
     def __or__(self, other):
         return OrFilter(self, other)
 
+    def compile(self) -> Callable | None:
+        """Get a synchronous function equivalent to this filter.
+
+        Returns:
+            ``Callable``: A function accepting *(client, update)*, or None in case the filter is
+            asynchronous or blocking and can't be run inline.
+        """
+        if self.blocking or inspect.iscoroutinefunction(self.__call__):
+            return None
+
+        return memoize(self, self.__call__) if self.deterministic else self.__call__
+
+
+class FilterCache(dict):
+    """Results of the deterministic filters already checked against an update, keyed by filter id.
+
+    Filters are stored along with their results, so that their ids can't be reused while the cache
+    is alive.
+
+    The dispatcher attaches a new cache to every update it parses, as its ``_filter_cache`` attribute,
+    and counts its hits and misses once the update has been handled.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.hits = 0
+        self.misses = 0
+
+
+def memoize(flt: Callable, function: Callable) -> Callable:
+    """Wrap the synchronous *function* of a filter so that its result is stored in the update cache."""
+    key = id(flt)
+
+    def memoized(client: hydrogram.Client, update: Update):
+        cache = getattr(update, "_filter_cache", None)
+
+        if cache is None:
+            return function(client, update)
+
+        if key in cache:
+            cache.hits += 1
+            return cache[key][1]
+
+        cache.misses += 1
+        result = function(client, update)
+        cache[key] = (flt, result)
+
+        return result
+
+    return memoized
+
+
+def compile_filter(flt: Callable) -> Callable | None:
+    if isinstance(flt, Filter):
+        return flt.compile()
+
+    if getattr(flt, "blocking", False) or inspect.iscoroutinefunction(flt.__call__):
+        return None
+
+    return memoize(flt, flt) if getattr(flt, "deterministic", False) else flt
+
+
+async def run_filter(flt: Callable, client: hydrogram.Client, update: Update):
+    """Run a filter inline, in the client's executor when marked as blocking, or await it.
 
-class InvertFilter(Filter):
+    The result of deterministic filters is looked up in and stored to the cache of the update, if any.
+    """
+    cache = (
+        getattr(update, "_filter_cache", None) if getattr(flt, "deterministic", False) else None
+    )
+    key = id(flt)
+
+    if cache is not None:
+        if key in cache:
+            cache.hits += 1
+            return cache[key][1]
+
+        cache.misses += 1
+
+    if inspect.iscoroutinefunction(flt.__call__):
+        result = await flt(client, update)
+    elif getattr(flt, "blocking", False):
+        result = await client.loop.run_in_executor(client.executor, flt, client, update)
+    else:
+        result = flt(client, update)
+
+    if cache is not None:
+        cache[key] = (flt, result)
+
+    return result
+
+
+class _CompositeFilter(Filter):
+    # Compiled function, computed on first use
+    function: Callable | None = None
+    is_compiled = False
+
+    @functools.cached_property
+    def deterministic(self) -> bool:
+        return builtins.all(getattr(flt, "deterministic", False) for flt in self.flatten())
+
+    @functools.cached_property
+    def reorderable(self) -> bool:
+        return builtins.all(getattr(flt, "reorderable", True) for flt in self.flatten())
+
+    def flatten(self) -> list[Callable]:
+        raise NotImplementedError
+
+    def get_function(self) -> Callable | None:
+        if not self.is_compiled:
+            self.function = self._compile()
+            self.is_compiled = True
+
+        return self.function
+
+    def compile(self) -> Callable | None:
+        function = self.get_function()
+
+        if function is None or not self.deterministic:
+            return function
+
+        return memoize(self, function)
+
+    def _compile(self) -> Callable | None:
+        raise NotImplementedError
+
+
+class InvertFilter(_CompositeFilter):
     def __init__(self, base):
         self.base = base
 
-    async def __call__(self, client: hydrogram.Client, update: Update):
-        if inspect.iscoroutinefunction(self.base.__call__):
-            x = await self.base(client, update)
-        else:
-            x = await client.loop.run_in_executor(client.executor, self.base, client, update)
+    def flatten(self) -> list[Callable]:
+        return [self.base]
 
-        return not x
+    def _compile(self) -> Callable | None:
+        base = compile_filter(self.base)
 
+        if base is None:
+            return None
 
-class AndFilter(Filter):
-    def __init__(self, base, other):
-        self.base = base
-        self.other = other
+        return lambda client, update: not base(client, update)
 
     async def __call__(self, client: hydrogram.Client, update: Update):
-        if inspect.iscoroutinefunction(self.base.__call__):
-            x = await self.base(client, update)
-        else:
-            x = await client.loop.run_in_executor(client.executor, self.base, client, update)
+        if function := self.get_function():
+            return function(client, update)
 
-        # short circuit
-        if not x:
-            return False
+        return not await run_filter(self.base, client, update)
 
-        if inspect.iscoroutinefunction(self.other.__call__):
-            y = await self.other(client, update)
-        else:
-            y = await client.loop.run_in_executor(client.executor, self.other, client, update)
 
-        return x and y
+class FilterStats:
+    """Runtime cost and selectivity of a filter, as measured by the adaptive chain running it."""
+
+    __slots__ = ("calls", "passes", "time")
+
+    def __init__(self):
+        self.calls = 0
+        self.passes = 0
+        self.time = 0.0
+
+    @property
+    def cost(self) -> float:
+        """Average seconds spent in the filter."""
+        return self.time / self.calls if self.calls else 0.0
+
+    @property
+    def selectivity(self) -> float:
+        """Estimated probability of the filter passing, smoothed so that it's never 0 or 1."""
+        return (self.passes + 1) / (self.calls + 2)
+
+
+class _ChainFilter(_CompositeFilter):
+    # Evaluations of an adaptive chain between two reorderings of its filters
+    REORDER_INTERVAL = 100
+
+    # Result of a filter which stops the evaluation of the chain
+    short_circuit: bool
 
+    adaptive = False
 
-class OrFilter(Filter):
     def __init__(self, base, other):
         self.base = base
         self.other = other
 
+    def flatten(self) -> list[Callable]:
+        """Get the filters of a chain of ``&`` or ``|`` filters, in evaluation order."""
+        return [
+            flt
+            for child in (self.base, self.other)
+            for flt in (child.flatten() if isinstance(child, type(self)) else [child])
+        ]
+
+    def _compile(self) -> Callable | None:
+        if self.adaptive:
+            return None
+
+        compiled = [compile_filter(flt) for flt in self.flatten()]
+
+        if None in compiled:
+            return None
+
+        return self._compile_chain(compiled)
+
+    @staticmethod
+    def _compile_chain(compiled: list[Callable]) -> Callable:
+        raise NotImplementedError
+
     async def __call__(self, client: hydrogram.Client, update: Update):
-        if inspect.iscoroutinefunction(self.base.__call__):
-            x = await self.base(client, update)
-        else:
-            x = await client.loop.run_in_executor(client.executor, self.base, client, update)
+        if function := self.get_function():
+            return function(client, update)
+
+        if self.adaptive:
+            return await self._run_adaptive(client, update)
 
         # short circuit
-        if x:
-            return True
+        for flt in self.flatten():
+            if bool(await run_filter(flt, client, update)) is self.short_circuit:
+                return self.short_circuit
 
-        if inspect.iscoroutinefunction(self.other.__call__):
-            y = await self.other(client, update)
-        else:
-            y = await client.loop.run_in_executor(client.executor, self.other, client, update)
+        return not self.short_circuit
+
+    def enable_adaptive(self):
+        """Let the chain measure its filters and reorder them to minimize the expected cost.
+
+        Filters are sorted by their average cost divided by their probability of stopping the
+        chain. Filters that aren't reorderable, such as the ones storing data in the update, keep
+        their position and only the ones between them are reordered.
+        """
+        self.chain = self.flatten()
+        self.stats = [FilterStats() for _ in self.chain]
+        self.order = list(range(len(self.chain)))
+        self.evaluations = 0
+
+        self.adaptive = True
+        self.function = None
+        self.is_compiled = False
+
+    def reorder(self):
+        order = []
+        segment = []
+
+        for i, flt in enumerate(self.chain):
+            if getattr(flt, "reorderable", True):
+                segment.append(i)
+            else:
+                order.extend(sorted(segment, key=self._rank))
+                order.append(i)
+                segment = []
+
+        order.extend(sorted(segment, key=self._rank))
+
+        self.order = order
+
+    def _rank(self, i: int) -> float:
+        stats = self.stats[i]
+        selectivity = stats.selectivity
+
+        return stats.cost / (selectivity if self.short_circuit else 1 - selectivity)
+
+    async def _run_adaptive(self, client: hydrogram.Client, update: Update):
+        result = not self.short_circuit
+
+        for i in self.order:
+            stats = self.stats[i]
+
+            start = time.perf_counter()
+            passed = bool(await run_filter(self.chain[i], client, update))
+            stats.time += time.perf_counter() - start
+
+            stats.calls += 1
+            stats.passes += passed
+
+            if passed is self.short_circuit:
+                result = self.short_circuit
+                break
+
+        self.evaluations += 1
+
+        if not self.evaluations % self.REORDER_INTERVAL:
+            self.reorder()
+
+        return result
+
+
+class AndFilter(_ChainFilter):
+    short_circuit = False
+
+    @staticmethod
+    def _compile_chain(compiled: list[Callable]) -> Callable:
+        # "all" and "any" are shadowed by the filters of the same name in this module
+        return lambda client, update: builtins.all(flt(client, update) for flt in compiled)
+
+
+class OrFilter(_ChainFilter):
+    short_circuit = True
+
+    @staticmethod
+    def _compile_chain(compiled: list[Callable]) -> Callable:
+        return lambda client, update: builtins.any(flt(client, update) for flt in compiled)
+
+
+def adaptive(flt: Filter) -> Filter:
+    """Enable the adaptive ordering of all the ``&`` and ``|`` chains of a filter.
+
+    Filters of adaptive chains are timed while running and periodically reordered, so that the ones
+    most likely to decide the result at the lowest cost run first. Use it on the filter passed to the
+    handler, before the handler receives any update.
+
+    Parameters:
+        flt (:obj:`Filter`):
+            The filter to make adaptive.
+
+    Returns:
+        :obj:`Filter`: The same filter.
 
-        return x or y
+    Example:
+        .. code-block:: python
+
+            @app.on_message(filters.adaptive(is_admin & filters.text & filters.group))
+            async def handler(client, message): ...
+    """
+    if isinstance(flt, _ChainFilter):
+        flt.enable_adaptive()
+
+    if isinstance(flt, _CompositeFilter):
+        for child in flt.flatten():
+            adaptive(child)
+
+    return flt
 
 
 CUSTOM_FILTER_NAME = "CustomFilter"
@@ -134,6 +421,12 @@ def create(func: Callable, name: str | None = None, **kwargs) -> Filter:
         **kwargs (``any``, *optional*):
             Any keyword argument you would like to pass. Useful when creating parameterized custom filters, such as
             :meth:`~hydrogram.filters.command` or :meth:`~hydrogram.filters.regex`.
+            Pass ``blocking=True`` in case your function is synchronous and does blocking work: it will be run in
+            the client's executor instead of inline in the event loop.
+            Pass ``deterministic=True`` in case the result of your function only depends on the update: it will be
+            computed once per update, no matter how many handlers use the filter.
+            Pass ``reorderable=False`` in case your function has side effects on the update, so that
+            :meth:`~hydrogram.filters.adaptive` chains always run it in the position it was written.
     """
     return type(
         name or func.__name__ or CUSTOM_FILTER_NAME,
@@ -147,7 +440,7 @@ def all_filter(_, __, ___):
     return True
 
 
-all = create(all_filter)
+all = create(all_filter, deterministic=True)
 """Filter all messages."""
 
 
@@ -159,7 +452,7 @@ def me_filter(_, __, m: Message):
     return bool(m.from_user.is_self if m.from_user else getattr(m, "outgoing", False))
 
 
-me = create(me_filter)
+me = create(me_filter, deterministic=True)
 """Filter messages generated by you yourself."""
 
 
@@ -171,7 +464,7 @@ def bot_filter(_, __, m: Message):
     return bool(m.from_user and m.from_user.is_bot)
 
 
-bot = create(bot_filter)
+bot = create(bot_filter, deterministic=True)
 """Filter messages coming from bots."""
 
 
@@ -183,7 +476,7 @@ def incoming_filter(_, __, m: Message):
     return not m.outgoing
 
 
-incoming = create(incoming_filter)
+incoming = create(incoming_filter, deterministic=True)
 """Filter incoming messages. Messages sent to your own chat (Saved Messages) are also recognised as incoming."""
 
 
@@ -195,7 +488,7 @@ def outgoing_filter(_, __, m: Message):
     return m.outgoing
 
 
-outgoing = create(outgoing_filter)
+outgoing = create(outgoing_filter, deterministic=True)
 """Filter outgoing messages. Messages sent to your own chat (Saved Messages) are not recognized as outgoing."""
 
 
@@ -207,7 +500,7 @@ def text_filter(_, __, m: Message):
     return bool(m.text)
 
 
-text = create(text_filter)
+text = create(text_filter, deterministic=True)
 """Filter text messages."""
 
 
@@ -219,7 +512,7 @@ def reply_filter(_, __, m: Message):
     return bool(m.reply_to_message_id)
 
 
-reply = create(reply_filter)
+reply = create(reply_filter, deterministic=True)
 """Filter messages that are replies to other messages."""
 
 
@@ -231,7 +524,7 @@ def forwarded_filter(_, __, m: Message):
     return bool(m.forward_date)
 
 
-forwarded = create(forwarded_filter)
+forwarded = create(forwarded_filter, deterministic=True)
 """Filter messages that are forwarded."""
 
 
@@ -243,7 +536,7 @@ def caption_filter(_, __, m: Message):
     return bool(m.caption)
 
 
-caption = create(caption_filter)
+caption = create(caption_filter, deterministic=True)
 """Filter media messages that contain captions."""
 
 
@@ -255,7 +548,7 @@ def audio_filter(_, __, m: Message):
     return bool(m.audio)
 
 
-audio = create(audio_filter)
+audio = create(audio_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Audio` objects."""
 
 
@@ -267,7 +560,7 @@ def document_filter(_, __, m: Message):
     return bool(m.document)
 
 
-document = create(document_filter)
+document = create(document_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Document` objects."""
 
 
@@ -279,7 +572,7 @@ def photo_filter(_, __, m: Message):
     return bool(m.photo)
 
 
-photo = create(photo_filter)
+photo = create(photo_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Photo` objects."""
 
 
@@ -291,7 +584,7 @@ def sticker_filter(_, __, m: Message):
     return bool(m.sticker)
 
 
-sticker = create(sticker_filter)
+sticker = create(sticker_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Sticker` objects."""
 
 
@@ -303,7 +596,7 @@ def animation_filter(_, __, m: Message):
     return bool(m.animation)
 
 
-animation = create(animation_filter)
+animation = create(animation_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Animation` objects."""
 
 
@@ -315,7 +608,7 @@ def game_filter(_, __, m: Message):
     return bool(m.game)
 
 
-game = create(game_filter)
+game = create(game_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Game` objects."""
 
 
@@ -327,7 +620,7 @@ def video_filter(_, __, m: Message):
     return bool(m.video)
 
 
-video = create(video_filter)
+video = create(video_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Video` objects."""
 
 
@@ -339,7 +632,7 @@ def media_group_filter(_, __, m: Message):
     return bool(m.media_group_id)
 
 
-media_group = create(media_group_filter)
+media_group = create(media_group_filter, deterministic=True)
 """Filter messages containing photos or videos being part of an album."""
 
 
@@ -351,7 +644,7 @@ def voice_filter(_, __, m: Message):
     return bool(m.voice)
 
 
-voice = create(voice_filter)
+voice = create(voice_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Voice` note objects."""
 
 
@@ -363,7 +656,7 @@ def video_note_filter(_, __, m: Message):
     return bool(m.video_note)
 
 
-video_note = create(video_note_filter)
+video_note = create(video_note_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.VideoNote` objects."""
 
 
@@ -375,7 +668,7 @@ def contact_filter(_, __, m: Message):
     return bool(m.contact)
 
 
-contact = create(contact_filter)
+contact = create(contact_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Contact` objects."""
 
 
@@ -387,7 +680,7 @@ def location_filter(_, __, m: Message):
     return bool(m.location)
 
 
-location = create(location_filter)
+location = create(location_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Location` objects."""
 
 
@@ -399,7 +692,7 @@ def venue_filter(_, __, m: Message):
     return bool(m.venue)
 
 
-venue = create(venue_filter)
+venue = create(venue_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Venue` objects."""
 
 
@@ -411,7 +704,7 @@ def web_page_filter(_, __, m: Message):
     return bool(m.web_page)
 
 
-web_page = create(web_page_filter)
+web_page = create(web_page_filter, deterministic=True)
 """Filter messages sent with a webpage preview."""
 
 
@@ -423,7 +716,7 @@ def poll_filter(_, __, m: Message):
     return bool(m.poll)
 
 
-poll = create(poll_filter)
+poll = create(poll_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Poll` objects."""
 
 
@@ -435,7 +728,7 @@ def dice_filter(_, __, m: Message):
     return bool(m.dice)
 
 
-dice = create(dice_filter)
+dice = create(dice_filter, deterministic=True)
 """Filter messages that contain :obj:`~hydrogram.types.Dice` objects."""
 
 
@@ -447,7 +740,7 @@ def media_spoiler_filter(_, __, m: Message):
     return bool(m.has_media_spoiler)
 
 
-media_spoiler = create(media_spoiler_filter)
+media_spoiler = create(media_spoiler_filter, deterministic=True)
 """Filter media messages that contain a spoiler."""
 
 
@@ -465,7 +758,7 @@ def private_filter(_, __, m: CallbackQuery | Message):
     return bool(value and value.type in {enums.ChatType.PRIVATE, enums.ChatType.BOT})
 
 
-private = create(private_filter)
+private = create(private_filter, deterministic=True)
 """Filter messages sent in private chats."""
 
 
@@ -483,7 +776,7 @@ def group_filter(_, __, m: CallbackQuery | Message):
     return bool(value and value.type in {enums.ChatType.GROUP, enums.ChatType.SUPERGROUP})
 
 
-group = create(group_filter)
+group = create(group_filter, deterministic=True)
 """Filter messages sent in group or supergroup chats."""
 
 
@@ -501,7 +794,7 @@ def channel_filter(_, __, m: CallbackQuery | Message):
     return bool(value and value.type == enums.ChatType.CHANNEL)
 
 
-channel = create(channel_filter)
+channel = create(channel_filter, deterministic=True)
 """Filter messages sent in channels."""
 
 
@@ -513,7 +806,7 @@ def new_chat_members_filter(_, __, m: Message):
     return bool(m.new_chat_members)
 
 
-new_chat_members = create(new_chat_members_filter)
+new_chat_members = create(new_chat_members_filter, deterministic=True)
 """Filter service messages for new chat members."""
 
 
@@ -525,7 +818,7 @@ def left_chat_member_filter(_, __, m: Message):
     return bool(m.left_chat_member)
 
 
-left_chat_member = create(left_chat_member_filter)
+left_chat_member = create(left_chat_member_filter, deterministic=True)
 """Filter service messages for members that left the chat."""
 
 
@@ -537,7 +830,7 @@ def new_chat_title_filter(_, __, m: Message):
     return bool(m.new_chat_title)
 
 
-new_chat_title = create(new_chat_title_filter)
+new_chat_title = create(new_chat_title_filter, deterministic=True)
 """Filter service messages for new chat titles."""
 
 
@@ -549,7 +842,7 @@ def new_chat_photo_filter(_, __, m: Message):
     return bool(m.new_chat_photo)
 
 
-new_chat_photo = create(new_chat_photo_filter)
+new_chat_photo = create(new_chat_photo_filter, deterministic=True)
 """Filter service messages for new chat photos."""
 
 
@@ -561,7 +854,7 @@ def delete_chat_photo_filter(_, __, m: Message):
     return bool(m.delete_chat_photo)
 
 
-delete_chat_photo = create(delete_chat_photo_filter)
+delete_chat_photo = create(delete_chat_photo_filter, deterministic=True)
 """Filter service messages for deleted photos."""
 
 
@@ -573,7 +866,7 @@ def group_chat_created_filter(_, __, m: Message):
     return bool(m.group_chat_created)
 
 
-group_chat_created = create(group_chat_created_filter)
+group_chat_created = create(group_chat_created_filter, deterministic=True)
 """Filter service messages for group chat creations."""
 
 
@@ -585,7 +878,7 @@ def supergroup_chat_created_filter(_, __, m: Message):
     return bool(m.supergroup_chat_created)
 
 
-supergroup_chat_created = create(supergroup_chat_created_filter)
+supergroup_chat_created = create(supergroup_chat_created_filter, deterministic=True)
 """Filter service messages for supergroup chat creations."""
 
 
@@ -597,7 +890,7 @@ def channel_chat_created_filter(_, __, m: Message):
     return bool(m.channel_chat_created)
 
 
-channel_chat_created = create(channel_chat_created_filter)
+channel_chat_created = create(channel_chat_created_filter, deterministic=True)
 """Filter service messages for channel chat creations."""
 
 
@@ -609,7 +902,7 @@ def migrate_to_chat_id_filter(_, __, m: Message):
     return bool(m.migrate_to_chat_id)
 
 
-migrate_to_chat_id = create(migrate_to_chat_id_filter)
+migrate_to_chat_id = create(migrate_to_chat_id_filter, deterministic=True)
 """Filter service messages that contain migrate_to_chat_id."""
 
 
@@ -621,7 +914,7 @@ def migrate_from_chat_id_filter(_, __, m: Message):
     return bool(m.migrate_from_chat_id)
 
 
-migrate_from_chat_id = create(migrate_from_chat_id_filter)
+migrate_from_chat_id = create(migrate_from_chat_id_filter, deterministic=True)
 """Filter service messages that contain migrate_from_chat_id."""
 
 
@@ -633,7 +926,7 @@ def pinned_message_filter(_, __, m: Message):
     return bool(m.pinned_message)
 
 
-pinned_message = create(pinned_message_filter)
+pinned_message = create(pinned_message_filter, deterministic=True)
 """Filter service messages for pinned messages."""
 
 
@@ -645,7 +938,7 @@ def game_high_score_filter(_, __, m: Message):
     return bool(m.game_high_score)
 
 
-game_high_score = create(game_high_score_filter)
+game_high_score = create(game_high_score_filter, deterministic=True)
 """Filter service messages for game high scores."""
 
 
@@ -657,7 +950,7 @@ def reply_keyboard_filter(_, __, m: Message):
     return isinstance(m.reply_markup, ReplyKeyboardMarkup)
 
 
-reply_keyboard = create(reply_keyboard_filter)
+reply_keyboard = create(reply_keyboard_filter, deterministic=True)
 """Filter messages containing reply keyboard markups"""
 
 
@@ -669,7 +962,7 @@ def inline_keyboard_filter(_, __, m: Message):
     return isinstance(m.reply_markup, InlineKeyboardMarkup)
 
 
-inline_keyboard = create(inline_keyboard_filter)
+inline_keyboard = create(inline_keyboard_filter, deterministic=True)
 """Filter messages containing inline keyboard markups"""
 
 
@@ -681,7 +974,7 @@ def mentioned_filter(_, __, m: Message):
     return bool(m.mentioned)
 
 
-mentioned = create(mentioned_filter)
+mentioned = create(mentioned_filter, deterministic=True)
 """Filter messages containing mentions"""
 
 
@@ -693,7 +986,7 @@ def via_bot_filter(_, __, m: Message):
     return bool(m.via_bot)
 
 
-via_bot = create(via_bot_filter)
+via_bot = create(via_bot_filter, deterministic=True)
 """Filter messages sent via inline bots"""
 
 
@@ -705,7 +998,7 @@ def video_chat_started_filter(_, __, m: Message):
     return bool(m.video_chat_started)
 
 
-video_chat_started = create(video_chat_started_filter)
+video_chat_started = create(video_chat_started_filter, deterministic=True)
 """Filter messages for started video chats"""
 
 
@@ -717,7 +1010,7 @@ def video_chat_ended_filter(_, __, m: Message):
     return bool(m.video_chat_ended)
 
 
-video_chat_ended = create(video_chat_ended_filter)
+video_chat_ended = create(video_chat_ended_filter, deterministic=True)
 """Filter messages for ended video chats"""
 
 
@@ -729,7 +1022,7 @@ def video_chat_members_invited_filter(_, __, m: Message):
     return bool(m.video_chat_members_invited)
 
 
-video_chat_members_invited = create(video_chat_members_invited_filter)
+video_chat_members_invited = create(video_chat_members_invited_filter, deterministic=True)
 """Filter messages for voice chat invited members"""
 
 
@@ -741,7 +1034,7 @@ def service_filter(_, __, m: Message):
     return bool(m.service)
 
 
-service = create(service_filter)
+service = create(service_filter, deterministic=True)
 """Filter service messages.
 
 A service message contains any of the following fields set: *left_chat_member*,
@@ -759,7 +1052,7 @@ def media_filter(_, __, m: Message):
     return bool(m.media)
 
 
-media = create(media_filter)
+media = create(media_filter, deterministic=True)
 """Filter media messages.
 
 A media message contains any of the following fields set: *audio*, *document*, *photo*, *sticker*, *video*,
@@ -775,7 +1068,7 @@ def scheduled_filter(_, __, m: Message):
     return bool(m.scheduled)
 
 
-scheduled = create(scheduled_filter)
+scheduled = create(scheduled_filter, deterministic=True)
 """Filter messages that have been scheduled (not yet sent)."""
 
 
@@ -787,7 +1080,7 @@ def from_scheduled_filter(_, __, m: Message):
     return bool(m.from_scheduled)
 
 
-from_scheduled = create(from_scheduled_filter)
+from_scheduled = create(from_scheduled_filter, deterministic=True)
 """Filter new automatically sent messages that were previously scheduled."""
 
 
@@ -799,7 +1092,7 @@ def linked_channel_filter(_, __, m: Message):
     return bool(m.forward_from_chat and not m.from_user)
 
 
-linked_channel = create(linked_channel_filter)
+linked_channel = create(linked_channel_filter, deterministic=True)
 """Filter messages that are automatically forwarded from the linked channel to the group chat."""
 
 
@@ -807,6 +1100,59 @@ linked_channel = create(linked_channel_filter)
 
 
 # region command_filter
+COMMAND_ARGUMENTS_RE = re.compile(r"([\"'])(.*?)(?<!\\)\1|(\S+)")
+WHITESPACE_RE = re.compile(r"\s")
+
+
+def parse_command(
+    message: Message, prefix: str, username: str, case_sensitive: bool
+) -> tuple[list[str], str] | None:
+    """Split the text of a message into the names the command could have and its arguments.
+
+    The command is the first word after the prefix, optionally followed by the bot username (with or
+    without "@"). Results are cached in the message, so that the text is only parsed once no matter how
+    many command filters check it.
+
+    Returns:
+        ``tuple``: The possible command names, lowercased unless *case_sensitive*, and the text of the
+        arguments; None in case the text doesn't start with the prefix.
+    """
+    cache = message.__dict__.setdefault("_commands", {})
+    key = (prefix, username, case_sensitive)
+
+    if key in cache:
+        return cache[key]
+
+    text = message.text or message.caption
+    result = None
+
+    if text and text.startswith(prefix):
+        without_prefix = text[len(prefix) :]
+        whitespace = WHITESPACE_RE.search(without_prefix)
+
+        if whitespace:
+            word = without_prefix[: whitespace.start()]
+            arguments = without_prefix[whitespace.end() :]
+        else:
+            word, arguments = without_prefix, ""
+
+        if not case_sensitive:
+            word, username = word.lower(), username.lower()
+
+        mentions = (f"@{username}", username) if username else ("@",)
+        names = [word] + [
+            word[: -len(mention)]
+            for mention in mentions
+            if word.endswith(mention) and len(word) > len(mention)
+        ]
+
+        result = names, arguments
+
+    cache[key] = result
+
+    return result
+
+
 def command(
     commands: str | list[str],
     prefixes: str | list[str] = "/",
@@ -830,45 +1176,30 @@ def command(
             Pass True if you want your command(s) to be case sensitive. Defaults to False.
             Examples: when True, command="Start" would trigger /Start but not /start.
     """
-    command_re = re.compile(r"([\"'])(.*?)(?<!\\)\1|(\S+)")
 
     def func(flt, client: hydrogram.Client, message: Message):
         username = client.me.username or ""
-        text = message.text or message.caption
         message.command = None
 
-        if not text:
-            return False
-
         for prefix in flt.prefixes:
-            if not text.startswith(prefix):
+            parsed = parse_command(message, prefix, username, flt.case_sensitive)
+
+            if parsed is None:
                 continue
 
-            without_prefix = text[len(prefix) :]
+            names, arguments = parsed
 
-            for cmd in flt.commands:
-                if not re.match(
-                    rf"^(?:{cmd}(?:@?{username})?)(?:\s|$)",
-                    without_prefix,
-                    flags=0 if flt.case_sensitive else re.IGNORECASE,
-                ):
+            for cmd in names:
+                if cmd not in flt.commands:
                     continue
 
-                without_command = re.sub(
-                    rf"{cmd}(?:@?{username})?\s?",
-                    "",
-                    without_prefix,
-                    count=1,
-                    flags=0 if flt.case_sensitive else re.IGNORECASE,
-                )
-
                 # match.groups are 1-indexed, group(1) is the quote, group(2) is the text
                 # between the quotes, group(3) is unquoted, whitespace-split text
 
                 # Remove the escape character from the arguments
                 message.command = [cmd] + [
                     re.sub(r"\\([\"'])", r"\1", m.group(2) or m.group(3) or "")
-                    for m in command_re.finditer(without_command)
+                    for m in COMMAND_ARGUMENTS_RE.finditer(arguments)
                 ]
 
                 return True
@@ -885,6 +1216,7 @@ def command(
     return create(
         func,
         "CommandFilter",
+        reorderable=False,
         commands=commands,
         prefixes=prefixes,
         case_sensitive=case_sensitive,
@@ -915,14 +1247,7 @@ def regex(pattern: str | Pattern, flags: int = 0):
     """
 
     def func(flt, _, update: Update):
-        if isinstance(update, Message):
-            value = update.text or update.caption
-        elif isinstance(update, CallbackQuery):
-            value = update.data
-        elif isinstance(update, InlineQuery):
-            value = update.query
-        else:
-            raise ValueError(f"Regex filter doesn't work with {type(update)}")
+        value = get_regex_value(update)
 
         if value:
             update.matches = list(flt.p.finditer(value)) or None
@@ -932,11 +1257,236 @@ def regex(pattern: str | Pattern, flags: int = 0):
     return create(
         func,
         "RegexFilter",
+        reorderable=False,
         p=pattern if isinstance(pattern, Pattern) else re.compile(pattern, flags),
     )
 
 
-class user(Filter, set):  # noqa: N801
+def get_regex_value(update: Update) -> str | None:
+    if isinstance(update, Message):
+        return update.text or update.caption
+
+    if isinstance(update, CallbackQuery):
+        return update.data
+
+    if isinstance(update, InlineQuery):
+        return update.query
+
+    raise ValueError(f"Regex filter doesn't work with {type(update)}")
+
+
+def get_pattern_literals(pattern: Pattern) -> set[str] | None:
+    """Get strings one of which is contained in any text the pattern matches.
+
+    Returns None when no such strings can be found, in which case the pattern must always be run.
+    """
+    if not isinstance(pattern.pattern, str):
+        return None
+
+    try:
+        # The parser of the re module is private: imported only when needed, and any failure just
+        # disables the prefiltering of the pattern
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+
+            try:
+                from re import _parser as sre_parse  # noqa: PLC0415 (Python 3.11+)
+            except ImportError:
+                import sre_parse  # noqa: PLC0415
+
+        return get_required_literals(sre_parse.parse(pattern.pattern, pattern.flags), sre_parse)
+    except Exception:
+        return None
+
+
+def get_required_literals(items: Any, sre_parse: Any) -> set[str] | None:
+    """Get strings one of which is contained in any text the parsed pattern matches.
+
+    Only ASCII literals are considered, so that they can be looked for case-insensitively by
+    casefolding the text. Returns None when no such strings can be found.
+    """
+    best = None
+    run = []
+
+    def consider(literals: set[str] | None):
+        nonlocal best
+
+        if literals and (best is None or min(map(len, literals)) > min(map(len, best))):
+            best = literals
+
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).casefold())
+            continue
+
+        consider({"".join(run)} if run else None)
+        run = []
+
+        if op is sre_parse.SUBPATTERN:
+            consider(get_required_literals(av[-1], sre_parse))
+        elif op is sre_parse.BRANCH:
+            branches = [get_required_literals(branch, sre_parse) for branch in av[1]]
+
+            if builtins.all(branches):
+                consider(set().union(*branches))
+        elif op in {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT} and av[0] >= 1:
+            consider(get_required_literals(av[2], sre_parse))
+
+    consider({"".join(run)} if run else None)
+
+    return best
+
+
+class regex_set(Filter):  # noqa: N801
+    """Filter updates that match any of many regular expression patterns, scanning their text once.
+
+    Instead of running every pattern on the text of each update, the literal strings the patterns
+    require are looked for first in a single pass over the (casefolded) text: only the patterns whose
+    required strings are found, and those without any, are then run to collect their
+    `Match Objects <https://docs.python.org/3/library/re.html#match-objects>`_.
+
+    Works with the same updates as :meth:`regex`. When the set itself is used as filter, the matches
+    of all the matching patterns are stored in the ``matches`` field of the update. Use
+    ``regex_set[i]`` (or ``regex_set[pattern]``) to get a filter matching a single pattern of the set:
+    filters of the same set share the scan of each update, allowing to route updates to different
+    handlers at the cost of a single scan.
+
+    Parameters:
+        patterns (``list``):
+            The regex patterns as strings or as pre-compiled patterns.
+
+        flags (``int``, *optional*):
+            Regex flags for the patterns given as strings.
+
+    Example:
+        .. code-block:: python
+
+            words = filters.regex_set(["spam", "sc[a4]m"])
+
+
+            @app.on_message(words[0])
+            async def spam(client, message): ...
+    """
+
+    reorderable = False
+
+    def __init__(self, patterns: list[str | Pattern], flags: int = 0):
+        self.patterns = [
+            pattern if isinstance(pattern, Pattern) else re.compile(pattern, flags)
+            for pattern in patterns
+        ]
+
+        # Patterns by required literal, and patterns that must always be run
+        self.literals: dict[str, list[int]] = {}
+        self.unfiltered: list[int] = []
+
+        for index, pattern in enumerate(self.patterns):
+            literals = get_pattern_literals(pattern)
+
+            if literals is None:
+                self.unfiltered.append(index)
+            else:
+                for literal in literals:
+                    self.literals.setdefault(literal, []).append(index)
+
+    def scan(self, value: str) -> dict[int, list[re.Match]]:
+        """Find the matches of every pattern in a text.
+
+        Parameters:
+            value (``str``):
+                The text to scan.
+
+        Returns:
+            ``dict``: The matches of the matching patterns, by pattern index.
+        """
+        folded = value.casefold()
+        candidates = set(self.unfiltered)
+
+        for literal, indexes in self.literals.items():
+            if literal in folded:
+                candidates.update(indexes)
+
+        result = {}
+
+        for index in sorted(candidates):
+            if matches := list(self.patterns[index].finditer(value)):
+                result[index] = matches
+
+        return result
+
+    def get_matches(self, update: Update) -> dict[int, list[re.Match]]:
+        """Get the matches of the patterns in an update, scanning its text only the first time."""
+        value = get_regex_value(update)
+        cache = update.__dict__.setdefault("_regex_sets", {})
+
+        if self not in cache:
+            cache[self] = self.scan(value) if value else {}
+
+        return cache[self]
+
+    def __call__(self, _, update: Update):
+        matches = [match for found in self.get_matches(update).values() for match in found]
+        update.matches = matches or None
+
+        return bool(matches)
+
+    def __getitem__(self, key: int | str | Pattern) -> Filter:
+        if isinstance(key, int):
+            index = key
+        else:
+            sources = [pattern.pattern for pattern in self.patterns]
+            index = sources.index(key.pattern if isinstance(key, Pattern) else key)
+
+        def func(flt, _, update: Update):
+            update.matches = flt.regex_set.get_matches(update).get(flt.index) or None
+
+            return bool(update.matches)
+
+        return create(func, "RegexSetFilter", reorderable=False, regex_set=self, index=index)
+
+
+class _ObservedSet(set):
+    """A set counting the in-place changes made to any of its instances.
+
+    Used by the containers of :class:`user` and :class:`chat`, so that indexes built on their
+    content (see :class:`~hydrogram.routing.HandlerRouter`) can tell when they must be rebuilt.
+    """
+
+    changes = 0
+
+
+def _observed(name: str) -> Callable:
+    method = getattr(set, name)
+
+    def wrapper(self, *args):
+        _ObservedSet.changes += 1
+        return method(self, *args)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in (
+    "add",
+    "clear",
+    "difference_update",
+    "discard",
+    "intersection_update",
+    "pop",
+    "remove",
+    "symmetric_difference_update",
+    "update",
+    "__iand__",
+    "__ior__",
+    "__isub__",
+    "__ixor__",
+):
+    setattr(_ObservedSet, _name, _observed(_name))
+
+del _name
+
+
+class user(Filter, _ObservedSet):  # noqa: N801
     """Filter messages coming from one or more users.
 
     You can use `set bound methods <https://docs.python.org/3/library/stdtypes.html#set>`_ to manipulate the
@@ -949,6 +1499,8 @@ class user(Filter, set):  # noqa: N801
             Defaults to None (no users).
     """
 
+    deterministic = True
+
     def __init__(self, users: int | str | list[int | str] | None = None):
         users = [] if users is None else users if isinstance(users, list) else [users]
 
@@ -957,7 +1509,7 @@ class user(Filter, set):  # noqa: N801
             for u in users
         )
 
-    async def __call__(self, _, message: Message):
+    def __call__(self, _, message: Message):
         return message.from_user and (
             message.from_user.id in self
             or (message.from_user.username and message.from_user.username.lower() in self)
@@ -965,7 +1517,7 @@ class user(Filter, set):  # noqa: N801
         )
 
 
-class chat(Filter, set):  # noqa: N801
+class chat(Filter, _ObservedSet):  # noqa: N801
     """Filter messages coming from one or more chats.
 
     You can use `set bound methods <https://docs.python.org/3/library/stdtypes.html#set>`_ to manipulate the
@@ -978,6 +1530,8 @@ class chat(Filter, set):  # noqa: N801
             Defaults to None (no chats).
     """
 
+    deterministic = True
+
     def __init__(self, chats: int | str | list[int | str] | None = None):
         chats = [] if chats is None else chats if isinstance(chats, list) else [chats]
 
@@ -986,7 +1540,7 @@ class chat(Filter, set):  # noqa: N801
             for c in chats
         )
 
-    async def __call__(self, _, message: Message):
+    def __call__(self, _, message: Message):
         return message.chat and (
             message.chat.id in self
             or (message.chat.username and message.chat.username.lower() in self)
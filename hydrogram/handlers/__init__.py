@@ -26,6 +26,7 @@ from .disconnect_handler import DisconnectHandler
 from .edited_message_handler import EditedMessageHandler
 from .error_handler import ErrorHandler
 from .inline_query_handler import InlineQueryHandler
+from .message_batch_handler import MessageBatchHandler
 from .message_handler import MessageHandler
 from .poll_handler import PollHandler
 from .raw_update_handler import RawUpdateHandler
@@ -41,6 +42,7 @@ __all__ = [
     "EditedMessageHandler",
     "ErrorHandler",
     "InlineQueryHandler",
+    "MessageBatchHandler",
     "MessageHandler",
     "PollHandler",
     "RawUpdateHandler",
@@ -23,6 +23,7 @@ from asyncio import iscoroutinefunction
 from typing import Callable
 
 import hydrogram
+from hydrogram.filters import run_filter
 from hydrogram.types import CallbackQuery, Identifier, Listener, ListenerTypes
 from hydrogram.utils import PyromodConfig
 
@@ -115,12 +116,7 @@ class CallbackQueryHandler(Handler):
         if listener:
             filters = listener.filters
             if callable(filters):
-                if iscoroutinefunction(filters.__call__):
-                    listener_does_match = await filters(client, query)
-                else:
-                    listener_does_match = await client.loop.run_in_executor(
-                        None, filters, client, query
-                    )
+                listener_does_match = await run_filter(filters, client, query)
             else:
                 listener_does_match = True
 
@@ -143,12 +139,7 @@ class CallbackQueryHandler(Handler):
         listener_does_match, listener = await self.check_if_has_matching_listener(client, query)
 
         if callable(self.filters):
-            if iscoroutinefunction(self.filters.__call__):
-                handler_does_match = await self.filters(client, query)
-            else:
-                handler_does_match = await client.loop.run_in_executor(
-                    None, self.filters, client, query
-                )
+            handler_does_match = await run_filter(self.filters, client, query)
         else:
             handler_does_match = True
 
@@ -220,4 +211,7 @@ class CallbackQueryHandler(Handler):
 
             raise ValueError("Listener must have either a future or a callback")
 
-        await self.original_callback(client, query, *args)
+        if getattr(self.original_callback, "run_in_process", False):
+            await client.dispatcher.process_pool.run(self.original_callback, query, *args)
+        else:
+            await self.original_callback(client, query, *args)
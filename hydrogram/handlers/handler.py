@@ -17,10 +17,9 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-import inspect
 from typing import TYPE_CHECKING, Callable
 
-from hydrogram.filters import Filter
+from hydrogram.filters import Filter, run_filter
 from hydrogram.types import Update
 
 if TYPE_CHECKING:
@@ -34,8 +33,6 @@ class Handler:
 
     async def check(self, client: "hydrogram.Client", update: Update):
         if callable(self.filters):
-            if inspect.iscoroutinefunction(self.filters.__call__):
-                return await self.filters(client, update)
-            return await client.loop.run_in_executor(client.executor, self.filters, client, update)
+            return await run_filter(self.filters, client, update)
 
         return True
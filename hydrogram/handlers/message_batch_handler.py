@@ -0,0 +1,168 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import collections
+import inspect
+import logging
+import time
+from typing import TYPE_CHECKING, Callable
+
+from .handler import Handler
+from .message_handler import MessageHandler
+
+if TYPE_CHECKING:
+    import asyncio
+
+    import hydrogram
+    from hydrogram.types import Message
+
+log = logging.getLogger(__name__)
+
+
+class MessageBatchHandler(MessageHandler):
+    """The MessageBatch handler class. Used to handle new messages in batches.
+    It is intended to be used with :meth:`~hydrogram.Client.add_handler`
+
+    Messages passing the filters are collected and the callback receives them as a list, once
+    *max_size* messages are collected or *max_latency* seconds after the first of them arrived,
+    whichever comes first. Pending messages are also delivered when the client stops.
+    Useful for callbacks doing bulk work, such as inserting messages into a database.
+
+    For a nicer way to register this handler, have a look at the
+    :meth:`~hydrogram.Client.on_message_batch` decorator.
+
+    Parameters:
+        callback (``Callable``):
+            Pass a function that will be called with a batch of new messages. It takes *(client, messages)*
+            as positional arguments (look at the section below for a detailed description).
+
+        filters (:obj:`Filters`):
+            Pass one or more filters to allow only a subset of messages to be passed
+            in your callback function.
+
+        max_size (``int``, *optional*):
+            Maximum amount of messages per batch.
+            Defaults to 100.
+
+        max_latency (``float``, *optional*):
+            Maximum amount of seconds a message waits for its batch to be delivered.
+            Defaults to 1.
+
+    Other parameters:
+        client (:obj:`~hydrogram.Client`):
+            The Client itself, useful when you want to call other API methods inside the message handler.
+
+        messages (List of :obj:`~hydrogram.types.Message`):
+            The received messages, in the order they were handled.
+
+    Attributes:
+        flush_sizes (``deque``):
+            Sizes of the most recent batches.
+
+        flush_latencies (``deque``):
+            Seconds waited by the first message of the most recent batches.
+
+        size_flushes (``int``):
+            Amount of batches delivered because they were full.
+
+        latency_flushes (``int``):
+            Amount of batches delivered because their first message waited *max_latency* seconds.
+    """
+
+    MAX_SIZE = 100
+    MAX_LATENCY = 1
+
+    # Amount of the most recent batches whose size and latency are kept
+    HISTORY_SIZE = 1000
+
+    def __init__(
+        self,
+        callback: Callable,
+        filters=None,
+        max_size: int = MAX_SIZE,
+        max_latency: float = MAX_LATENCY,
+    ):
+        self.original_callback = callback
+        Handler.__init__(self, self.collect, filters)
+
+        self.max_size = max_size
+        self.max_latency = max_latency
+
+        self.batch: list[Message] = []
+        self.batch_started_on = 0.0
+        self.deadline: asyncio.TimerHandle | None = None
+        self.flush_tasks: set[asyncio.Task] = set()
+
+        self.flush_sizes = collections.deque(maxlen=self.HISTORY_SIZE)
+        self.flush_latencies = collections.deque(maxlen=self.HISTORY_SIZE)
+        self.size_flushes = 0
+        self.latency_flushes = 0
+
+    # Listeners are resolved by the regular message handlers, batches only depend on the filters
+    check = Handler.check
+
+    async def collect(self, client: hydrogram.Client, message: Message):
+        if not self.batch:
+            self.batch_started_on = time.monotonic()
+            self.deadline = client.loop.call_later(self.max_latency, self._on_deadline, client)
+
+        self.batch.append(message)
+
+        if len(self.batch) >= self.max_size:
+            self.size_flushes += 1
+            await self.flush(client)
+
+    async def flush(self, client: hydrogram.Client):
+        """Deliver the pending messages, if any, to the callback."""
+        if self.deadline is not None:
+            self.deadline.cancel()
+            self.deadline = None
+
+        if not self.batch:
+            return
+
+        batch, self.batch = self.batch, []
+
+        self.flush_sizes.append(len(batch))
+        self.flush_latencies.append(time.monotonic() - self.batch_started_on)
+
+        if getattr(self.original_callback, "run_in_process", False):
+            await client.dispatcher.process_pool.run(self.original_callback, batch)
+        elif inspect.iscoroutinefunction(self.original_callback):
+            await self.original_callback(client, batch)
+        else:
+            await client.loop.run_in_executor(
+                client.executor, self.original_callback, client, batch
+            )
+
+    def _on_deadline(self, client: hydrogram.Client):
+        self.deadline = None
+        self.latency_flushes += 1
+
+        task = client.loop.create_task(self._flush_on_deadline(client))
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def _flush_on_deadline(self, client: hydrogram.Client):
+        try:
+            await self.flush(client)
+        except Exception as e:
+            log.exception(e)
@@ -23,6 +23,7 @@ from inspect import iscoroutinefunction
 from typing import Callable
 
 import hydrogram
+from hydrogram.filters import run_filter
 from hydrogram.types import Identifier, Listener, ListenerTypes, Message
 
 from .handler import Handler
@@ -93,12 +94,7 @@ class MessageHandler(Handler):
         if listener:
             filters = listener.filters
             if callable(filters):
-                if iscoroutinefunction(filters.__call__):
-                    listener_does_match = await filters(client, message)
-                else:
-                    listener_does_match = await client.loop.run_in_executor(
-                        None, filters, client, message
-                    )
+                listener_does_match = await run_filter(filters, client, message)
             else:
                 listener_does_match = True
 
@@ -121,12 +117,7 @@ class MessageHandler(Handler):
         listener_does_match = (await self.check_if_has_matching_listener(client, message))[0]
 
         if callable(self.filters):
-            if iscoroutinefunction(self.filters.__call__):
-                handler_does_match = await self.filters(client, message)
-            else:
-                handler_does_match = await client.loop.run_in_executor(
-                    None, self.filters, client, message
-                )
+            handler_does_match = await run_filter(self.filters, client, message)
         else:
             handler_does_match = True
 
@@ -167,4 +158,7 @@ class MessageHandler(Handler):
 
             raise ValueError("Listener must have either a future or a callback")
 
-        await self.original_callback(client, message, *args)
+        if getattr(self.original_callback, "run_in_process", False):
+            await client.dispatcher.process_pool.run(self.original_callback, message, *args)
+        else:
+            await self.original_callback(client, message, *args)
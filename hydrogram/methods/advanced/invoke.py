@@ -92,4 +92,7 @@ class Invoke:
         await self.fetch_peers(getattr(r, "users", []))
         await self.fetch_peers(getattr(r, "chats", []))
 
+        if not self.no_updates:
+            self.updates_manager.process_rpc_result(r)
+
         return r
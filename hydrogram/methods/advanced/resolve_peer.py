@@ -19,11 +19,12 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import re
 
 import hydrogram
-from hydrogram import raw, utils
+from hydrogram import raw
 from hydrogram.errors import PeerIdInvalid
 
 log = logging.getLogger(__name__)
@@ -36,6 +37,9 @@ class ResolvePeer:
         """Get the InputPeer of a known peer id.
         Useful whenever an InputPeer type is required.
 
+        Peers missing from the internal database are asked to the server once at a time, together with the
+        peer ids other calls are resolving, and the ones that don't exist aren't asked again for a few minutes.
+
         .. note::
 
             This is a utility method intended to be used **only** when working with raw
@@ -59,7 +63,7 @@ class ResolvePeer:
             raise ConnectionError("Client has not been started yet")
 
         try:
-            return await self.storage.get_peer_by_id(peer_id)
+            return await self.peer_cache.get_peer_by_id(peer_id)
         except KeyError:
             if isinstance(peer_id, str):
                 if peer_id in {"self", "me"}:
@@ -71,41 +75,23 @@ class ResolvePeer:
                     int(peer_id)
                 except ValueError:
                     try:
-                        return await self.storage.get_peer_by_username(peer_id)
+                        return await self.peer_cache.get_peer_by_username(peer_id)
                     except KeyError:
-                        await self.invoke(raw.functions.contacts.ResolveUsername(username=peer_id))
 
-                        return await self.storage.get_peer_by_username(peer_id)
+                        async def resolve_username():
+                            await self.invoke(
+                                raw.functions.contacts.ResolveUsername(username=peer_id)
+                            )
+
+                            return await self.peer_cache.get_peer_by_username(peer_id)
+
+                        return await self.peer_resolver.resolve(peer_id, resolve_username)
                 else:
                     try:
-                        return await self.storage.get_peer_by_phone_number(peer_id)
+                        return await self.peer_cache.get_peer_by_phone_number(peer_id)
                     except KeyError as e:
                         raise PeerIdInvalid from e
 
-            peer_type = utils.get_peer_type(peer_id)
-
-            if peer_type == "user":
-                await self.fetch_peers(
-                    await self.invoke(
-                        raw.functions.users.GetUsers(
-                            id=[raw.types.InputUser(user_id=peer_id, access_hash=0)]
-                        )
-                    )
-                )
-            elif peer_type == "chat":
-                await self.invoke(raw.functions.messages.GetChats(id=[-peer_id]))
-            else:
-                await self.invoke(
-                    raw.functions.channels.GetChannels(
-                        id=[
-                            raw.types.InputChannel(
-                                channel_id=utils.get_channel_id(peer_id), access_hash=0
-                            )
-                        ]
-                    )
-                )
-
-            try:
-                return await self.storage.get_peer_by_id(peer_id)
-            except KeyError:
-                raise PeerIdInvalid
+            return await self.peer_resolver.resolve(
+                peer_id, functools.partial(self.peer_resolver.fetch_id, peer_id)
+            )
@@ -0,0 +1,58 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import hydrogram
+    from hydrogram import raw
+
+
+class ResolvePeers:
+    async def resolve_peers(
+        self: hydrogram.Client, peer_ids: list[int | str]
+    ) -> list[raw.base.InputPeer | raw.base.InputUser | raw.base.InputChannel]:
+        """Get the InputPeers of many peer ids at once.
+
+        Works like :meth:`~hydrogram.Client.resolve_peer`, but the ids missing from the internal database
+        are asked to the server in a single request per peer type, instead of one request each.
+
+        .. include:: /_includes/usable-by/users-bots.rst
+
+        Parameters:
+            peer_ids (``list``):
+                The peer ids you want to extract the InputPeers from.
+                Each can be a direct id (int), a username (str) or a phone number (str).
+
+        Returns:
+            ``list``: On success, the resolved peers are returned in form of InputPeer objects, in the same
+            order as the given ids.
+
+        Raises:
+            PeerIdInvalid: In case any of the peers doesn't exist.
+
+        Example:
+            .. code-block:: python
+
+                peers = await app.resolve_peers([12345678, "username", -1001234567890])
+        """
+        return list(await asyncio.gather(*(self.resolve_peer(peer_id) for peer_id in peer_ids)))
@@ -19,6 +19,7 @@
 
 from typing import TYPE_CHECKING
 
+from hydrogram.process_pool import check_not_importing_main
 from hydrogram.session import Session
 
 if TYPE_CHECKING:
@@ -42,6 +43,8 @@ class Connect:
         if self.is_connected:
             raise ConnectionError("Client is already connected")
 
+        check_not_importing_main()
+
         await self.load_session()
 
         self.session = Session(
@@ -40,5 +40,6 @@ class Disconnect:
             raise ConnectionError("Can't disconnect an initialized client")
 
         await self.session.stop()
+        await self.peer_cache.flush()
         await self.storage.close()
         self.is_connected = False
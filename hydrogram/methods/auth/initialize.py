@@ -49,6 +49,10 @@ class Initialize:
         self.load_plugins()
 
         await self.dispatcher.start()
+        await self.peer_cache.start()
+
+        if not self.no_updates:
+            await self.updates_manager.start()
 
         self.updates_watchdog_task = asyncio.create_task(self.updates_watchdog())
 
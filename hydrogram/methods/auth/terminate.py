@@ -44,9 +44,16 @@ class Terminate:
             await self.invoke(raw.functions.account.FinishTakeoutSession())
             log.info("Takeout session %s finished", self.takeout_id)
 
+        if not self.no_updates:
+            await self.updates_manager.stop()
+
+        await self.peer_cache.stop()
         await self.storage.save()
         await self.dispatcher.stop()
 
+        if self.update_recorder is not None:
+            self.update_recorder.close()
+
         for media_session in self.media_sessions.values():
             await media_session.stop()
 
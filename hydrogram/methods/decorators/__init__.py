@@ -27,6 +27,7 @@ from .on_edited_message import OnEditedMessage
 from .on_error import OnError
 from .on_inline_query import OnInlineQuery
 from .on_message import OnMessage
+from .on_message_batch import OnMessageBatch
 from .on_poll import OnPoll
 from .on_raw_update import OnRawUpdate
 from .on_user_status import OnUserStatus
@@ -34,6 +35,7 @@ from .on_user_status import OnUserStatus
 
 class Decorators(  # noqa: N818 false-positive
     OnMessage,
+    OnMessageBatch,
     OnEditedMessage,
     OnDeletedMessages,
     OnCallbackQuery,
@@ -0,0 +1,72 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Callable
+
+import hydrogram
+from hydrogram.filters import Filter
+from hydrogram.handlers import MessageBatchHandler
+
+
+class OnMessageBatch:
+    def on_message_batch(
+        self=None,
+        filters=None,
+        group: int = 0,
+        max_size: int = MessageBatchHandler.MAX_SIZE,
+        max_latency: float = MessageBatchHandler.MAX_LATENCY,
+    ) -> Callable:
+        """Decorator for handling new messages in batches.
+
+        This does the same thing as :meth:`~hydrogram.Client.add_handler` using the
+        :obj:`~hydrogram.handlers.MessageBatchHandler`.
+
+        Parameters:
+            filters (:obj:`~hydrogram.filters`, *optional*):
+                Pass one or more filters to allow only a subset of messages to be passed
+                in your function.
+
+            group (``int``, *optional*):
+                The group identifier, defaults to 0.
+
+            max_size (``int``, *optional*):
+                Maximum amount of messages per batch, defaults to 100.
+
+            max_latency (``float``, *optional*):
+                Maximum amount of seconds a message waits for its batch to be delivered, defaults to 1.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            if isinstance(self, hydrogram.Client):
+                self.add_handler(
+                    MessageBatchHandler(func, filters, max_size, max_latency),
+                    group,
+                )
+            elif isinstance(self, Filter) or self is None:
+                if not hasattr(func, "handlers"):
+                    func.handlers = []
+
+                func.handlers.append((
+                    MessageBatchHandler(func, self, max_size, max_latency),
+                    group if filters is None else filters,
+                ))
+
+            return func
+
+        return decorator
@@ -43,14 +43,4 @@ class GetListenerMatchingWithData:
         Returns:
             :obj:`~hydrogram.types.Listener`: The listener that matches the given data or ``None`` if no listener matches.
         """
-        matching = [
-            listener
-            for listener in self.listeners[listener_type]
-            if listener.identifier.matches(data)
-        ]
-
-        # in case of multiple matching listeners, the most specific should be returned
-        def count_populated_attributes(listener_item: Listener):
-            return listener_item.identifier.count_populated()
-
-        return max(matching, key=count_populated_attributes, default=None)
+        return self.listeners[listener_type].get_most_specific(data)
@@ -45,8 +45,4 @@ class GetManyListenersMatchingWithData:
         Returns:
             List[:obj:`~hydrogram.types.Listener`]: A list of listeners that match the given data.
         """
-        return [
-            listener
-            for listener in self.listeners[listener_type]
-            if listener.identifier.matches(data)
-        ]
+        return self.listeners[listener_type].get_matching(data)
@@ -0,0 +1,275 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Callable
+
+from hydrogram import raw, utils
+from hydrogram.errors import (
+    ChannelInvalid,
+    PeerIdInvalid,
+    RPCError,
+    UsernameInvalid,
+    UsernameNotOccupied,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    import hydrogram
+
+log = logging.getLogger(__name__)
+
+
+def copy_error(error: Exception) -> Exception:
+    # A new instance without traceback, so that raising a remembered error many times doesn't chain
+    # its tracebacks together
+    copy = type(error).__new__(type(error), *error.args)
+    copy.__dict__.update(error.__dict__)
+    return copy
+
+
+def retrieve_exception(task: asyncio.Task):
+    # Nobody may be waiting for it anymore
+    if not task.cancelled():
+        task.exception()
+
+
+class PeerResolver:
+    """Coalesce the concurrent remote resolutions of a peer and remember the ones that failed.
+
+    Peers missing from the storage are resolved by asking the server. Callers resolving a peer
+    already being resolved wait for the same request instead of sending their own, and peers that
+    don't exist are answered with the same error for :attr:`NEGATIVE_TTL` seconds without asking the
+    server again.
+
+    Peer ids are collected for :attr:`WINDOW` seconds, then fetched with a single ``users.GetUsers``,
+    ``messages.GetChats`` or ``channels.GetChannels`` call per peer type.
+    """
+
+    # Seconds to wait for more peer ids before fetching them
+    WINDOW = 0.01
+
+    # Maximum amount of peer ids per call
+    MAX_IDS = 100
+
+    # Seconds in which a peer that failed to resolve isn't asked again
+    NEGATIVE_TTL = 5 * 60
+
+    # Maximum amount of failed peers remembered
+    NEGATIVE_CAPACITY = 10000
+
+    # Errors meaning the peer doesn't exist, as opposed to temporary ones
+    NEGATIVE_ERRORS = (UsernameNotOccupied, UsernameInvalid, PeerIdInvalid, ChannelInvalid)
+
+    # Errors a single invalid peer can fail a whole batch with, in which case each peer is asked
+    # alone. Other errors, such as flood waits, fail every peer of the batch
+    INVALID_PEER_ERRORS = frozenset({
+        "CHANNEL_INVALID",
+        "CHANNEL_PRIVATE",
+        "CHANNEL_PUBLIC_GROUP_NA",
+        "CHAT_ID_INVALID",
+        "INPUT_USER_DEACTIVATED",
+        "PEER_ID_INVALID",
+        "USER_ID_INVALID",
+        "USER_INVALID",
+    })
+
+    def __init__(self, client: hydrogram.Client):
+        self.client = client
+
+        self.pending: dict[int | str, asyncio.Task] = {}
+        self.failures: dict[int | str, tuple[float, Exception]] = {}
+
+        # Peers answered with a remembered error, resolved remotely and waiting for another request
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        # Peer ids waiting to be fetched, by peer type
+        self.batches: dict[str, dict[int, asyncio.Future]] = {}
+        self.flush_handle: asyncio.TimerHandle | None = None
+
+        self.requests = 0
+
+    async def resolve(
+        self,
+        key: int | str,
+        fetch: Callable[[], Awaitable[raw.base.InputPeer]],
+    ) -> raw.base.InputPeer:
+        """Resolve a peer remotely, at most once at a time.
+
+        Parameters:
+            key (``int`` | ``str``):
+                The peer id or the normalized username of the peer.
+
+            fetch (``Callable``):
+                Coroutine function asking the server for the peer and returning it.
+
+        Returns:
+            ``InputPeer``: The resolved peer.
+        """
+        failure = self.failures.get(key)
+
+        if failure is not None:
+            expires_on, error = failure
+
+            if expires_on > time.monotonic():
+                self.hits += 1
+                raise copy_error(error)
+
+            del self.failures[key]
+
+        task = self.pending.get(key)
+
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+
+            # Run apart from the caller, so that cancelling it doesn't cancel the other waiters
+            task = asyncio.get_running_loop().create_task(self._resolve(key, fetch))
+            task.add_done_callback(retrieve_exception)
+            self.pending[key] = task
+
+        return await asyncio.shield(task)
+
+    async def _resolve(
+        self,
+        key: int | str,
+        fetch: Callable[[], Awaitable[raw.base.InputPeer]],
+    ) -> raw.base.InputPeer:
+        try:
+            return await fetch()
+        except Exception as e:
+            if isinstance(e, self.NEGATIVE_ERRORS):
+                self.remember(key, e)
+
+            raise
+        finally:
+            del self.pending[key]
+
+    def remember(self, key: int | str, error: Exception):
+        if len(self.failures) >= self.NEGATIVE_CAPACITY:
+            now = time.monotonic()
+            self.failures = {k: v for k, v in self.failures.items() if v[0] > now}
+
+            # Drop the oldest ones in case none expired
+            for k in list(self.failures)[: len(self.failures) - self.NEGATIVE_CAPACITY + 1]:
+                del self.failures[k]
+
+        self.failures[key] = (time.monotonic() + self.NEGATIVE_TTL, copy_error(error))
+
+    async def fetch_id(self, peer_id: int) -> raw.base.InputPeer:
+        """Ask the server for a peer id, together with the other ids asked in the meantime.
+
+        Parameters:
+            peer_id (``int``):
+                The peer id, as in the storage.
+
+        Returns:
+            ``InputPeer``: The resolved peer.
+        """
+        batch = self.batches.setdefault(utils.get_peer_type(peer_id), {})
+
+        if peer_id not in batch:
+            batch[peer_id] = self.client.loop.create_future()
+
+        future = batch[peer_id]
+
+        if self.flush_handle is None:
+            self.flush_handle = self.client.loop.call_later(self.WINDOW, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        self.flush_handle = None
+        batches, self.batches = self.batches, {}
+
+        for peer_type, batch in batches.items():
+            peer_ids = list(batch)
+
+            for i in range(0, len(peer_ids), self.MAX_IDS):
+                chunk = {peer_id: batch[peer_id] for peer_id in peer_ids[i : i + self.MAX_IDS]}
+                self.client.loop.create_task(self._fetch(peer_type, chunk))
+
+    async def _fetch(self, peer_type: str, batch: dict[int, asyncio.Future]):
+        try:
+            await self._request(peer_type, list(batch))
+        except Exception as e:
+            if len(batch) > 1 and isinstance(e, RPCError) and e.ID in self.INVALID_PEER_ERRORS:
+                await asyncio.gather(
+                    *(
+                        self._fetch(peer_type, {peer_id: future})
+                        for peer_id, future in batch.items()
+                    )
+                )
+                return
+
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()
+
+            return
+
+        for peer_id, future in batch.items():
+            if future.done():
+                continue
+
+            try:
+                future.set_result(await self.client.peer_cache.get_peer_by_id(peer_id))
+            except KeyError:
+                future.set_exception(PeerIdInvalid())
+                future.exception()
+
+    async def _request(self, peer_type: str, peer_ids: list[int]):
+        self.requests += 1
+
+        if peer_type == "user":
+            # The users are returned as a plain vector, which invoke doesn't store
+            await self.client.fetch_peers(
+                await self.client.invoke(
+                    raw.functions.users.GetUsers(
+                        id=[
+                            raw.types.InputUser(user_id=peer_id, access_hash=0)
+                            for peer_id in peer_ids
+                        ]
+                    )
+                )
+            )
+        elif peer_type == "chat":
+            await self.client.invoke(
+                raw.functions.messages.GetChats(id=[-peer_id for peer_id in peer_ids])
+            )
+        else:
+            await self.client.invoke(
+                raw.functions.channels.GetChannels(
+                    id=[
+                        raw.types.InputChannel(
+                            channel_id=utils.get_channel_id(peer_id), access_hash=0
+                        )
+                        for peer_id in peer_ids
+                    ]
+                )
+            )
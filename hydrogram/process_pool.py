@@ -0,0 +1,258 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Client as Connect
+from multiprocessing.connection import Connection, Listener
+from typing import TYPE_CHECKING, Any, Callable
+
+from hydrogram import types
+
+if TYPE_CHECKING:
+    import hydrogram
+
+log = logging.getLogger(__name__)
+
+
+def run_in_process(func: Callable) -> Callable:
+    """Mark a handler callback to be run in a worker process instead of the client's executor.
+
+    Use it for CPU-heavy callbacks, which would otherwise hold the GIL and slow down the event loop.
+    The update is pickled and sent to one of the workers of the process pool, where the callback
+    receives a :obj:`ClientProxy` in place of the client: its methods, and so the bound methods of the
+    update, such as :meth:`~hydrogram.types.Message.reply_text`, are run by the client in the main
+    process.
+
+    The callback must be importable by the workers, that is, defined at module level, and any
+    argument or result of the methods it calls must be picklable.
+
+    Workers are spawned, so each of them imports the main script again: the code starting the client
+    must be guarded by ``if __name__ == "__main__":``, otherwise every worker would start another
+    client with the same session. Starting a client while a worker imports the script raises
+    :obj:`RuntimeError`.
+
+    Example:
+        .. code-block:: python
+
+            from hydrogram.process_pool import run_in_process
+
+
+            @app.on_message(filters.photo)
+            @run_in_process
+            async def classify(client, message):
+                label = model.predict(await message.download(in_memory=True))
+                await message.reply_text(label)
+
+
+            if __name__ == "__main__":
+                app.run()
+    """
+    func.run_in_process = True
+    return func
+
+
+def check_not_importing_main():
+    # Set by multiprocessing while a spawned process imports the main script of its parent
+    if getattr(multiprocessing.current_process(), "_inheriting", False):
+        raise RuntimeError(
+            "A client was started while a worker process imported the main script. "
+            'Start it inside an `if __name__ == "__main__":` block when using run_in_process'
+        )
+
+
+def bind(obj: Any, client: Any):
+    if isinstance(obj, types.Object):
+        obj.bind(client)
+    elif isinstance(obj, list):
+        for item in obj:
+            bind(item, client)
+
+
+class ClientProxy:
+    """Stand-in for the client in worker processes.
+
+    Methods are called by the client in the main process and their results are sent back. The
+    *name* and *me* attributes are copied when the worker starts.
+    """
+
+    def __init__(self, connection: Connection, name: str, me: types.User | None):
+        self._connection = connection
+        self.name = name
+        self.me = me
+
+        bind(me, self)
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        # Asynchronous like the methods of the client, so that bound methods can await it. The call
+        # blocks: the event loop of a worker only runs the current callback, and blocking keeps each
+        # request and its reply together on the connection when the callback makes concurrent calls
+        async def method(*args, **kwargs):  # noqa: RUF029
+            return self._call(name, args, kwargs)
+
+        method.__name__ = name
+
+        return method
+
+    def _call(self, name: str, args: tuple, kwargs: dict) -> Any:
+        # Workers run one callback at a time, requests never interleave on the connection
+        self._connection.send((name, args, kwargs))
+        ok, result = self._connection.recv()
+
+        if not ok:
+            raise result
+
+        bind(result, self)
+
+        return result
+
+
+# The proxy of the worker process this module is loaded in
+proxy: ClientProxy | None = None
+
+
+def init_worker(address: str, authkey: bytes, name: str, me: types.User | None):
+    global proxy
+    proxy = ClientProxy(Connect(address, authkey=authkey), name, me)
+
+
+def run_callback(callback: Callable, *args):
+    for arg in args:
+        bind(arg, proxy)
+
+    if inspect.iscoroutinefunction(callback):
+        asyncio.run(callback(proxy, *args))
+    else:
+        callback(proxy, *args)
+
+
+class ProcessPool:
+    """Pool of worker processes running the callbacks marked with :func:`run_in_process`.
+
+    Workers are started on the first callback. Each of them connects back to the main process, where
+    a thread per worker waits for the method calls of its :obj:`ClientProxy` and runs them in the
+    event loop the pool was started from.
+
+    Parameters:
+        client (:obj:`~hydrogram.Client`):
+            The client the method calls of the workers are forwarded to.
+    """
+
+    def __init__(self, client: hydrogram.Client):
+        self.client = client
+
+        self.executor: ProcessPoolExecutor | None = None
+        self.listener: Listener | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+        self.callbacks = 0
+        self.calls = 0
+
+    def start(self):
+        authkey = os.urandom(32)
+
+        self.loop = asyncio.get_running_loop()
+
+        self.listener = Listener(authkey=authkey)
+        threading.Thread(target=self.accept, name="ProcessPoolListener", daemon=True).start()
+
+        self.executor = ProcessPoolExecutor(
+            self.client.process_workers,
+            # Forking a process with a running event loop and threads isn't safe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.listener.address, authkey, self.client.name, self.client.me),
+        )
+
+    async def stop(self):
+        if self.executor is not None:
+            # Workers may still be waiting for the client, don't block the event loop meanwhile
+            await self.loop.run_in_executor(None, self.executor.shutdown)
+            self.executor = None
+
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+
+    async def run(self, callback: Callable, *args):
+        if self.executor is None:
+            self.start()
+
+        self.callbacks += 1
+
+        await self.loop.run_in_executor(self.executor, run_callback, callback, *args)
+
+    def accept(self):
+        listener = self.listener
+
+        while True:
+            try:
+                connection = listener.accept()
+            except OSError:
+                break
+
+            threading.Thread(
+                target=self.serve, args=(connection,), name="ProcessPoolWorker", daemon=True
+            ).start()
+
+    async def call(self, name: str, args: tuple, kwargs: dict) -> Any:
+        # Run in the event loop, the client isn't thread-safe even for its synchronous methods
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        result = getattr(self.client, name)(*args, **kwargs)
+
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result
+
+    def serve(self, connection: Connection):
+        with connection:
+            while True:
+                try:
+                    name, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    break
+
+                try:
+                    result = asyncio.run_coroutine_threadsafe(
+                        self.call(name, args, kwargs), self.loop
+                    ).result()
+
+                    self.calls += 1
+                    reply = (True, result)
+                except Exception as e:
+                    reply = (False, e)
+
+                try:
+                    connection.send(reply)
+                except Exception as e:
+                    # The result or the exception can't be pickled
+                    connection.send((False, RuntimeError(f"{name}: {type(e).__name__}: {e}")))
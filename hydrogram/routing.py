@@ -0,0 +1,180 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from hydrogram import filters
+from hydrogram.filters import AndFilter
+from hydrogram.handlers import EditedMessageHandler, MessageHandler
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from hydrogram.handlers.handler import Handler
+    from hydrogram.types import Update
+
+# Handlers receiving messages, the only ones whose filters are indexed
+MESSAGE_HANDLERS = (MessageHandler, EditedMessageHandler)
+
+
+def get_conjuncts(flt: filters.Filter | None) -> list[filters.Filter]:
+    """Flatten a chain of ``&`` filters into the list of filters that must all match."""
+    if isinstance(flt, AndFilter):
+        return get_conjuncts(flt.base) + get_conjuncts(flt.other)
+
+    return [] if flt is None else [flt]
+
+
+def is_command_filter(flt: filters.Filter) -> bool:
+    return type(flt).__name__ == "CommandFilter" and isinstance(
+        getattr(flt, "commands", None), set
+    )
+
+
+class HandlerRouter:
+    """Narrow down the handlers an update has to be checked against.
+
+    Handlers are grouped by type and, for message handlers, indexed by the keys of their top-level
+    :meth:`~hydrogram.filters.command`, :obj:`~hydrogram.filters.chat` or
+    :obj:`~hydrogram.filters.user` filter. For every group, only the handlers of the right type whose
+    indexed filter could match the update are returned, in their registration order; handlers that
+    can't be indexed are always returned. Candidates still have to be checked as usual, so groups,
+    :obj:`~hydrogram.StopPropagation` and :obj:`~hydrogram.ContinuePropagation` behave exactly the
+    same.
+    """
+
+    def __init__(self):
+        self.groups: list[list[Handler]] = []
+        self.indexes: list[dict[type[Handler], HandlerIndex]] = []
+        self.changes = -1
+
+    def build(self, groups: Iterable[list[Handler]]):
+        self.groups = [list(group) for group in groups]
+        self.indexes = [{} for _ in self.groups]
+        self.changes = filters._ObservedSet.changes
+
+    def route(
+        self, update: Update | None, handler_type: type[Handler], prune: bool = True
+    ) -> Iterator[list[Handler]]:
+        """Yield the candidate handlers of every group, in group order.
+
+        Parameters:
+            update (:obj:`~hydrogram.types.Update`):
+                The parsed update.
+
+            handler_type (``type``):
+                The type of handlers the update is meant for.
+
+            prune (``bool``, *optional*):
+                Pass False to get every handler of the given type, regardless of their filters.
+                Defaults to True.
+        """
+        # The chat and user filters can be changed in place, indexes built on them are stale
+        if filters._ObservedSet.changes != self.changes:
+            self.build(self.groups)
+
+        for group, indexes in zip(self.groups, self.indexes):
+            index = indexes.get(handler_type)
+
+            if index is None:
+                index = indexes[handler_type] = HandlerIndex(
+                    handler for handler in group if isinstance(handler, handler_type)
+                )
+
+            yield index.get_candidates(update) if prune else index.handlers
+
+
+class HandlerIndex:
+    """The handlers of a single type within a group, indexed by their filters."""
+
+    def __init__(self, handlers: Iterable[Handler]):
+        self.handlers = list(handlers)
+
+        self.unindexed: list[int] = []
+        self.prefixes: set[str] = set()
+        self.commands: dict[tuple[str, str], list[int]] = {}
+        self.chats: dict[int | str, list[int]] = {}
+        self.users: dict[int | str, list[int]] = {}
+
+        for position, handler in enumerate(self.handlers):
+            if not (isinstance(handler, MESSAGE_HANDLERS) and self.add(position, handler.filters)):
+                self.unindexed.append(position)
+
+    def add(self, position: int, flt: filters.Filter | None) -> bool:
+        conjuncts = get_conjuncts(flt)
+
+        # Commands are the most selective, then chats and users
+        for conjunct in conjuncts:
+            if is_command_filter(conjunct):
+                self.prefixes.update(conjunct.prefixes)
+
+                for prefix in conjunct.prefixes:
+                    for command in conjunct.commands:
+                        self.commands.setdefault((prefix, command.lower()), []).append(position)
+
+                return True
+
+        for conjunct in conjuncts:
+            for cls, table in ((filters.chat, self.chats), (filters.user, self.users)):
+                if isinstance(conjunct, cls) and "me" not in conjunct:
+                    for key in conjunct:
+                        table.setdefault(key, []).append(position)
+
+                    return True
+
+        return False
+
+    def get_candidates(self, update: Update | None) -> list[Handler]:
+        if len(self.unindexed) == len(self.handlers):
+            return self.handlers
+
+        positions = set(self.unindexed)
+
+        if self.commands:
+            text = getattr(update, "text", None) or getattr(update, "caption", None)
+
+            if text:
+                for prefix in self.prefixes:
+                    if not text.startswith(prefix):
+                        continue
+
+                    words = text[len(prefix) :].split(maxsplit=1)
+
+                    if not words:
+                        continue
+
+                    # Commands may be followed by the bot username, with or without "@"
+                    word = words[0].lower()
+
+                    for end in range(1, len(word) + 1):
+                        positions.update(self.commands.get((prefix, word[:end]), ()))
+
+        for table, peer in (
+            (self.chats, getattr(update, "chat", None)),
+            (self.users, getattr(update, "from_user", None)),
+        ):
+            if table and peer:
+                positions.update(table.get(peer.id, ()))
+
+                if peer.username:
+                    positions.update(table.get(peer.username.lower(), ()))
+
+        return [self.handlers[position] for position in sorted(positions)]
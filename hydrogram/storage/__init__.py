@@ -18,6 +18,16 @@
 #  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .base import BaseStorage
+from .log_storage import LogStorage
+from .peer_cache import PeerCache
+from .shared_storage import SharedDatabase, SharedStorage
 from .sqlite_storage import SQLiteStorage
 
-__all__ = ["BaseStorage", "SQLiteStorage"]
+__all__ = [
+    "BaseStorage",
+    "LogStorage",
+    "PeerCache",
+    "SQLiteStorage",
+    "SharedDatabase",
+    "SharedStorage",
+]
@@ -19,30 +19,63 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import logging
 import struct
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Any, Union
 
-from hydrogram import raw
+from hydrogram import raw, utils
+
+log = logging.getLogger(__name__)
 
 InputPeer = Union[raw.types.InputPeerUser, raw.types.InputPeerChat, raw.types.InputPeerChannel]
 
 
+def get_input_peer(peer_id: int, access_hash: int, peer_type: str) -> InputPeer:
+    if peer_type in {"user", "bot"}:
+        return raw.types.InputPeerUser(user_id=peer_id, access_hash=access_hash)
+    if peer_type == "group":
+        return raw.types.InputPeerChat(chat_id=-peer_id)
+    if peer_type in {"channel", "supergroup"}:
+        return raw.types.InputPeerChannel(
+            channel_id=utils.get_channel_id(peer_id), access_hash=access_hash
+        )
+    raise ValueError(f"Invalid peer type: {peer_type}")
+
+
 class BaseStorage(ABC):
     """The BaseStorage class is an abstract base class defining the interface
     for different storage engines used by Hyrogram.
 
+    Storage engines can keep the session fields in memory by implementing :meth:`read_session_record`
+    and :meth:`write_session_record` and answering their accessors with :meth:`session_field`.
+
     Parameters:
         name (``str``):
             The name of the session.
     """
 
     SESSION_STRING_FORMAT: str = ">BI?256sQ?"
+    SESSION_FIELDS: tuple[str, ...] = (
+        "dc_id",
+        "api_id",
+        "test_mode",
+        "auth_key",
+        "date",
+        "user_id",
+        "is_bot",
+    )
 
     def __init__(self, name: str) -> None:
         self.name = name
 
+        # Cached session fields and the ones changed since they were last written
+        self.session_record: dict[str, Any] | None = None
+        self.dirty_session_fields: dict[str, Any] = {}
+        self.session_write_task: asyncio.Task | None = None
+
     @abstractmethod
     async def open(self) -> None:
         """Opens the storage engine."""
@@ -78,6 +111,31 @@ class BaseStorage(ABC):
         """
         ...
 
+    async def update_state(  # noqa: PLR6301
+        self,
+        value: list[tuple[int, int | None, int | None, int | None, int | None]] | int = object,
+    ) -> list[tuple[int, int | None, int | None, int | None, int | None]] | None:
+        """Get or set the persisted update state.
+
+        The common state (pts, qts, date and seq) is stored with id ``0``, while every tracked channel
+        is stored with its raw channel id and its own pts.
+
+        Storage engines persisting the update state override this method. By default nothing is
+        stored, and the client doesn't catch up on the updates missed while it was offline.
+
+        Parameters:
+            value (``List[Tuple[int, int, int, int, int]]`` | ``int``, *optional*):
+                A list of *(id, pts, qts, date, seq)* tuples to store, or an id whose state must be
+                deleted.
+
+        Returns:
+            ``List[Tuple[int, int, int, int, int]]``: The stored states if no value is provided.
+        """
+        if value is object:
+            return []
+
+        return None
+
     @abstractmethod
     async def get_peer_by_id(self, peer_id: int) -> InputPeer:
         """Retrieve a peer by its ID.
@@ -208,6 +266,97 @@ class BaseStorage(ABC):
         """
         ...
 
+    async def read_session_record(self) -> dict[str, Any]:
+        """Read the session fields from the storage.
+
+        By default each field is read with its accessor, such as :meth:`dc_id`. Storage engines
+        answering the accessors with :meth:`session_field` must override this method.
+
+        Returns:
+            ``dict``: The value of each field of :attr:`SESSION_FIELDS`.
+        """
+        return {name: await getattr(self, name)() for name in self.SESSION_FIELDS}
+
+    async def write_session_record(self, fields: dict[str, Any]) -> None:
+        """Write and commit the given session fields to the storage at once.
+
+        By default each field is written with its accessor, such as :meth:`dc_id`. Storage engines
+        answering the accessors with :meth:`session_field` must override this method.
+
+        Parameters:
+            fields (``dict``):
+                The changed fields and their new values.
+        """
+        for name, value in fields.items():
+            await getattr(self, name)(value)
+
+    async def session_field(self, name: str, value: Any = object) -> Any:
+        """Get or set a session field through the in-memory session record.
+
+        The record is read from the storage once. New values are cached immediately and written on the
+        next iteration of the event loop, so that the fields set together, such as the DC ID and the
+        authorization key, are committed together.
+
+        Parameters:
+            name (``str``):
+                The name of the field.
+
+            value (``Any``, *optional*):
+                The value to set.
+
+        Returns:
+            ``Any``: The current value if no value is provided.
+        """
+        if self.session_record is None:
+            cls = type(self)
+
+            # The default hooks go through the accessors, which would call this method again
+            if (
+                cls.read_session_record is BaseStorage.read_session_record
+                or cls.write_session_record is BaseStorage.write_session_record
+            ):
+                raise NotImplementedError(
+                    f"{cls.__name__} must implement read_session_record and write_session_record "
+                    "to answer its session fields with session_field"
+                )
+
+            self.session_record = await self.read_session_record()
+
+        if value is object:
+            return self.session_record.get(name)
+
+        self.session_record[name] = value
+        self.dirty_session_fields[name] = value
+
+        if self.session_write_task is None:
+            self.session_write_task = asyncio.get_running_loop().create_task(
+                self._write_session_fields()
+            )
+
+        return None
+
+    async def flush_session_record(self) -> None:
+        """Write the session fields changed since the last write."""
+        if not self.dirty_session_fields:
+            return
+
+        dirty, self.dirty_session_fields = self.dirty_session_fields, {}
+
+        try:
+            await self.write_session_record(dirty)
+        except BaseException:
+            # Keep the fields that changed in the meantime, retry the others on the next write
+            self.dirty_session_fields = {**dirty, **self.dirty_session_fields}
+            raise
+
+    async def _write_session_fields(self) -> None:
+        self.session_write_task = None
+
+        try:
+            await self.flush_session_record()
+        except Exception as e:
+            log.warning("Unable to write the session: %s", e)
+
     async def export_session_string(self) -> str:
         """Exports the session string for the current session.
 
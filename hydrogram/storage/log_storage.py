@@ -0,0 +1,396 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+import os
+import pickle
+import struct
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from .base import BaseStorage, InputPeer, get_input_peer
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Size and CRC32 of each record
+RECORD_HEADER = struct.Struct("<II")
+
+# Start of the snapshot and log files: magic and format version
+FILE_HEADER = struct.Struct("<6sH")
+MAGIC = b"HGRMLS"
+FORMAT_VERSION = 1
+
+# Records and snapshots are pickled with a fixed protocol, which doesn't change across Python versions
+PICKLE_PROTOCOL = 4
+
+
+class RecordUnpickler(pickle.Unpickler):
+    # Records only contain builtin values: refuse anything else, such as classes or functions
+    def find_class(self, module: str, name: str):  # noqa: PLR6301
+        raise pickle.UnpicklingError(f"Unexpected object in record: {module}.{name}")
+
+
+def dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=PICKLE_PROTOCOL)
+
+
+def loads(data: bytes) -> Any:
+    return RecordUnpickler(io.BytesIO(data)).load()
+
+
+def check_header(data: bytes, path: Path) -> None:
+    magic, version = FILE_HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a session log or snapshot")
+
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} uses the unsupported format version {version}")
+
+
+class LogStorage(BaseStorage):
+    """Storage engine keeping the session in memory and persisting it to an append-only log.
+
+    Every change is appended to a log file as it happens. Once the log grows past the size of the
+    last snapshot, times :attr:`LOG_RATIO`, the whole session is written to a new snapshot in a
+    thread and the log starts over, so that each change is rewritten a bounded amount of times. On
+    open, the snapshot is loaded and the log replayed; a last record cut short by a crash is dropped.
+
+    Both files start with a magic and a format version, checked on open, and values are pickled with
+    a fixed protocol, so that sessions stay readable across Python versions.
+
+    Parameters:
+        name (``str``):
+            The name of the session.
+
+        workdir (``Path``, *optional*):
+            The directory of the snapshot and log files, named after the session.
+            Defaults to None (the session is kept in memory only).
+    """
+
+    USERNAME_TTL = 8 * 60 * 60
+
+    SNAPSHOT_EXTENSION = ".snapshot"
+    LOG_EXTENSION = ".log"
+
+    # The log is compacted into a snapshot once it's this many times the size of the last snapshot,
+    # and at least MIN_LOG_SIZE bytes
+    LOG_RATIO = 1
+    MIN_LOG_SIZE = 1024 * 1024
+
+    def __init__(self, name: str, workdir: Path | None = None):
+        super().__init__(name)
+
+        self.snapshot_path = workdir / (name + self.SNAPSHOT_EXTENSION) if workdir else None
+        self.log_path = workdir / (name + self.LOG_EXTENSION) if workdir else None
+
+        # Logs being compacted, replayed on open in case compaction didn't complete
+        self.old_log_path = workdir / (name + self.LOG_EXTENSION + ".1") if workdir else None
+
+        # id -> (access_hash, type, username, phone_number, last_update_on)
+        self.peers: dict[int, tuple] = {}
+        self.usernames: dict[str, int] = {}
+        self.phone_numbers: dict[str, int] = {}
+        self.states: dict[int, tuple] = {}
+
+        self.log_file: BinaryIO | None = None
+        self.log_size = 0
+        self.snapshot_size = 0
+
+        self.compaction_task: asyncio.Task | None = None
+
+    async def open(self) -> None:
+        self.session_record = {
+            "dc_id": 2,
+            "api_id": None,
+            "test_mode": None,
+            "auth_key": None,
+            "date": 0,
+            "user_id": None,
+            "is_bot": None,
+        }
+
+        if self.log_path is None:
+            return
+
+        if self.snapshot_path.is_file():
+            data = self.snapshot_path.read_bytes()
+            check_header(data, self.snapshot_path)
+            self.snapshot_size = len(data)
+            self.restore(loads(data[FILE_HEADER.size :]))
+
+        if self.old_log_path.is_file():
+            self.replay(self.old_log_path)
+
+        self.log_size = self.replay(self.log_path) if self.log_path.is_file() else 0
+
+        # Drops a partial last record
+        self.open_log()
+
+    def open_log(self) -> None:
+        self.log_file = self.log_path.open("ab")
+        self.log_file.truncate(self.log_size)
+
+        if self.log_size == 0:
+            self.log_file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+            self.log_file.flush()
+            self.log_size = FILE_HEADER.size
+
+    def restore(self, snapshot: dict) -> None:
+        self.session_record.update(snapshot["session"])
+        self.states = snapshot["states"]
+
+        for peer_id, row in snapshot["peers"].items():
+            self._set_peer(peer_id, row)
+
+    def replay(self, path: Path) -> int:
+        """Apply the records of a log file and return the size of its header and complete records."""
+        with path.open("rb") as f:
+            data = f.read()
+
+        # Cut short while being created
+        if len(data) < FILE_HEADER.size:
+            return 0
+
+        check_header(data, path)
+        offset = FILE_HEADER.size
+
+        while offset + RECORD_HEADER.size <= len(data):
+            size, crc = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data[start : start + size]
+
+            if len(payload) < size or zlib.crc32(payload) != crc:
+                log.warning("Dropping a partial record at the end of %s", path)
+                break
+
+            self.apply(loads(payload))
+            offset = start + size
+
+        return offset
+
+    def apply(self, record: tuple) -> None:
+        kind, value = record
+
+        if kind == "peers":
+            for peer_id, *row in value:
+                self._set_peer(peer_id, tuple(row))
+        elif kind == "session":
+            self.session_record.update(value)
+        elif kind == "states":
+            for state_id, *row in value:
+                self.states[state_id] = tuple(row)
+        elif kind == "delete_state":
+            self.states.pop(value, None)
+
+    def append(self, record: tuple) -> None:
+        self.apply(record)
+
+        if self.log_file is None:
+            return
+
+        payload = dumps(record)
+
+        self.log_file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.log_file.flush()
+        self.log_size += RECORD_HEADER.size + len(payload)
+
+        if self.compaction_task is None and self.log_size > max(
+            self.MIN_LOG_SIZE, self.snapshot_size * self.LOG_RATIO
+        ):
+            self.compaction_task = asyncio.get_running_loop().create_task(self.compact())
+
+    def snapshot(self) -> dict:
+        return {
+            "session": dict(self.session_record),
+            "peers": dict(self.peers),
+            "states": dict(self.states),
+        }
+
+    async def compact(self) -> None:
+        """Write the session to a new snapshot and start a new log."""
+        try:
+            # Changes from now on go to the new log, the snapshot includes all the previous ones
+            self.log_file.close()
+
+            if self.old_log_path.is_file():
+                # A previous compaction didn't complete, its log is kept until a snapshot includes it
+                with self.old_log_path.open("ab") as f:
+                    f.write(self.log_path.read_bytes()[FILE_HEADER.size :])
+
+                self.log_path.unlink()
+            else:
+                self.log_path.replace(self.old_log_path)
+
+            self.log_size = 0
+            self.open_log()
+
+            self.snapshot_size = await asyncio.get_running_loop().run_in_executor(
+                None, self._write_snapshot, self.snapshot()
+            )
+
+            self.old_log_path.unlink()
+
+            log.debug("Compacted %s into a snapshot of %s bytes", self.name, self.snapshot_size)
+        except Exception as e:
+            log.warning("Unable to compact %s: %s", self.name, e)
+        finally:
+            self.compaction_task = None
+
+    def _write_snapshot(self, snapshot: dict) -> int:
+        data = FILE_HEADER.pack(MAGIC, FORMAT_VERSION) + dumps(snapshot)
+        path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+
+        with path.open("wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        path.replace(self.snapshot_path)
+
+        return len(data)
+
+    async def save(self) -> None:
+        await self.date(int(time.time()))
+        await self.flush_session_record()
+
+        if self.log_file is not None:
+            self.log_file.flush()
+            os.fsync(self.log_file.fileno())
+
+    async def close(self) -> None:
+        if self.compaction_task is not None:
+            await self.compaction_task
+
+        await self.flush_session_record()
+
+        if self.log_file is not None:
+            os.fsync(self.log_file.fileno())
+            self.log_file.close()
+            self.log_file = None
+
+    async def delete(self) -> None:
+        if self.log_path is not None:
+            for path in (self.snapshot_path, self.log_path, self.old_log_path):
+                path.unlink(missing_ok=True)
+
+    def _set_peer(self, peer_id: int, row: tuple) -> None:
+        old = self.peers.get(peer_id)
+
+        if old is not None:
+            if old[2] and self.usernames.get(old[2]) == peer_id:
+                del self.usernames[old[2]]
+
+            if old[3] and self.phone_numbers.get(old[3]) == peer_id:
+                del self.phone_numbers[old[3]]
+
+        self.peers[peer_id] = row
+
+        if row[2]:
+            self.usernames[row[2]] = peer_id
+
+        if row[3]:
+            self.phone_numbers[row[3]] = peer_id
+
+    async def update_peers(
+        self, peers: list[tuple[int, int, str, str | None, str | None]]
+    ) -> None:
+        now = int(time.time())
+
+        self.append(("peers", [(*peer, now) for peer in peers]))
+
+    async def update_state(
+        self,
+        value: list[tuple[int, int | None, int | None, int | None, int | None]] | int = object,
+    ) -> list[tuple[int, int | None, int | None, int | None, int | None]] | None:
+        if value is object:
+            return [(state_id, *row) for state_id, row in self.states.items()]
+
+        if isinstance(value, int):
+            self.append(("delete_state", value))
+        else:
+            self.append(("states", [tuple(state) for state in value]))
+
+        return None
+
+    async def get_peer_by_id(self, peer_id: int) -> InputPeer:
+        row = self.peers.get(peer_id)
+
+        if row is None:
+            raise KeyError(f"ID not found: {peer_id}")
+
+        return get_input_peer(peer_id, row[0], row[1])
+
+    async def get_peer_by_username(self, username: str) -> InputPeer:
+        peer_id = self.usernames.get(username)
+
+        if peer_id is None:
+            raise KeyError(f"Username not found: {username}")
+
+        row = self.peers[peer_id]
+
+        if abs(time.time() - row[4]) > self.USERNAME_TTL:
+            raise KeyError(f"Username expired: {username}")
+
+        return get_input_peer(peer_id, row[0], row[1])
+
+    async def get_peer_by_phone_number(self, phone_number: str) -> InputPeer:
+        peer_id = self.phone_numbers.get(phone_number)
+
+        if peer_id is None:
+            raise KeyError(f"Phone number not found: {phone_number}")
+
+        row = self.peers[peer_id]
+
+        return get_input_peer(peer_id, row[0], row[1])
+
+    async def read_session_record(self) -> dict[str, Any]:
+        return self.session_record
+
+    async def write_session_record(self, fields: dict[str, Any]) -> None:
+        self.append(("session", fields))
+
+    async def dc_id(self, value: int | object = object) -> int | None:
+        return await self.session_field("dc_id", value)
+
+    async def api_id(self, value: int | object = object) -> int | None:
+        return await self.session_field("api_id", value)
+
+    async def test_mode(self, value: bool | object = object) -> bool | None:
+        return await self.session_field("test_mode", value)
+
+    async def auth_key(self, value: bytes | object = object) -> bytes | None:
+        return await self.session_field("auth_key", value)
+
+    async def date(self, value: int | object = object) -> int | None:
+        return await self.session_field("date", value)
+
+    async def user_id(self, value: int | object = object) -> int | None:
+        return await self.session_field("user_id", value)
+
+    async def is_bot(self, value: bool | object = object) -> bool | None:
+        return await self.session_field("is_bot", value)
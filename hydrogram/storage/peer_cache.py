@@ -0,0 +1,216 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING, Optional
+
+from .base import get_input_peer
+
+if TYPE_CHECKING:
+    from hydrogram import raw
+
+    from .base import BaseStorage, InputPeer
+
+log = logging.getLogger(__name__)
+
+# (access_hash, type, username, phone_number)
+PeerRow = tuple[int, str, Optional[str], Optional[str]]
+
+
+class PeerCache:
+    """In-memory write-behind cache in front of :meth:`~hydrogram.storage.BaseStorage.update_peers`.
+
+    Peers are kept in memory and only the ones that actually changed, or that are seen again
+    :attr:`REFRESH_INTERVAL` seconds after their last write, are marked as dirty. Dirty peers are
+    written to the storage in a single batch every :attr:`FLUSH_INTERVAL` seconds and when the client
+    stops. Lookups are served from memory first and fall back to the storage.
+
+    The full raw objects of the cached peers are kept as well, so that updates referencing them can be
+    built locally without asking the server for the peers again.
+
+    Parameters:
+        storage (:obj:`~hydrogram.storage.BaseStorage`):
+            The storage engine the peers are written to.
+
+        capacity (``int``, *optional*):
+            Maximum amount of peers kept in memory.
+    """
+
+    # Interval of seconds in which dirty peers are written to the storage
+    FLUSH_INTERVAL = 5
+
+    # Peers seen again are written again after this amount of seconds even if unchanged, so that the
+    # storage knows they are still in use: their username doesn't expire and they are not pruned
+    REFRESH_INTERVAL = 60 * 60
+
+    USERNAME_TTL = 8 * 60 * 60
+    CAPACITY = 100000
+
+    def __init__(self, storage: BaseStorage, capacity: int = CAPACITY):
+        self.storage = storage
+        self.capacity = capacity
+
+        self.peers: dict[int, PeerRow] = {}
+        self.usernames: dict[str, int] = {}
+        self.phone_numbers: dict[str, int] = {}
+        self.raw_peers: dict[int, raw.base.User | raw.base.Chat] = {}
+
+        # Last time a peer was seen and last time it was written to the storage
+        self.seen_on: dict[int, float] = {}
+        self.written_on: dict[int, float] = {}
+
+        self.dirty: dict[int, PeerRow] = {}
+
+        self.flush_task: asyncio.Task | None = None
+        self.flush_lock = asyncio.Lock()
+
+    async def start(self):
+        if self.flush_task is None:
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_worker())
+
+    async def stop(self):
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.flush_task
+
+            self.flush_task = None
+
+        await self.flush()
+
+    async def flush_worker(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+
+            try:
+                await self.flush()
+            except Exception as e:
+                log.warning("Unable to flush peers: %s", e)
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.dirty:
+                return
+
+            dirty, self.dirty = self.dirty, {}
+
+            try:
+                await self.storage.update_peers([
+                    (peer_id, *row) for peer_id, row in dirty.items()
+                ])
+            except BaseException:
+                # Keep the peers that changed in the meantime, retry the others on the next flush
+                self.dirty = {**dirty, **self.dirty}
+                raise
+
+            now = time.time()
+
+            for peer_id in dirty:
+                self.written_on[peer_id] = now
+
+            log.debug("Flushed %s peers", len(dirty))
+
+    async def update_peers(self, peers: list[tuple[int, int, str, str | None, str | None]]):
+        now = time.time()
+
+        for peer_id, *row in peers:
+            row = tuple(row)
+            old = self.peers.get(peer_id)
+
+            self.seen_on[peer_id] = now
+
+            if old == row:
+                if now - self.written_on.get(peer_id, 0) > self.REFRESH_INTERVAL:
+                    self.dirty[peer_id] = row
+                continue
+
+            if old is not None:
+                self._unindex(peer_id, old)
+
+            self.peers[peer_id] = row
+            self.dirty[peer_id] = row
+
+            if row[2]:
+                self.usernames[row[2]] = peer_id
+
+            if row[3]:
+                self.phone_numbers[row[3]] = peer_id
+
+        if len(self.peers) > self.capacity:
+            self._evict()
+
+    def update_raw_peers(self, peers: dict[int, raw.base.User | raw.base.Chat]):
+        self.raw_peers.update(peers)
+
+    def get_raw_peer(self, peer_id: int) -> raw.base.User | raw.base.Chat | None:
+        return self.raw_peers.get(peer_id)
+
+    async def get_peer_by_id(self, peer_id: int) -> InputPeer:
+        row = self.peers.get(peer_id)
+
+        if row is None:
+            return await self.storage.get_peer_by_id(peer_id)
+
+        return get_input_peer(peer_id, row[0], row[1])
+
+    async def get_peer_by_username(self, username: str) -> InputPeer:
+        peer_id = self.usernames.get(username)
+
+        if peer_id is None or time.time() - self.seen_on[peer_id] > self.USERNAME_TTL:
+            return await self.storage.get_peer_by_username(username)
+
+        row = self.peers[peer_id]
+
+        return get_input_peer(peer_id, row[0], row[1])
+
+    async def get_peer_by_phone_number(self, phone_number: str) -> InputPeer:
+        peer_id = self.phone_numbers.get(phone_number)
+
+        if peer_id is None:
+            return await self.storage.get_peer_by_phone_number(phone_number)
+
+        row = self.peers[peer_id]
+
+        return get_input_peer(peer_id, row[0], row[1])
+
+    def _unindex(self, peer_id: int, row: PeerRow):
+        if row[2] and self.usernames.get(row[2]) == peer_id:
+            del self.usernames[row[2]]
+
+        if row[3] and self.phone_numbers.get(row[3]) == peer_id:
+            del self.phone_numbers[row[3]]
+
+    def _evict(self):
+        # Drop the least recently seen half of the clean peers; dirty peers stay until flushed
+        clean = sorted(
+            (peer_id for peer_id in self.peers if peer_id not in self.dirty),
+            key=self.seen_on.__getitem__,
+        )
+
+        for peer_id in clean[: self.capacity // 2]:
+            self._unindex(peer_id, self.peers.pop(peer_id))
+            self.raw_peers.pop(peer_id, None)
+            self.seen_on.pop(peer_id, None)
+            self.written_on.pop(peer_id, None)
@@ -0,0 +1,364 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from .base import BaseStorage, InputPeer, get_input_peer
+from .sqlite_storage import BatchWriter, SQLiteStorage
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions
+(
+    id        INTEGER PRIMARY KEY,
+    name      TEXT    NOT NULL UNIQUE,
+    dc_id     INTEGER,
+    api_id    INTEGER,
+    test_mode INTEGER,
+    auth_key  BLOB,
+    date      INTEGER NOT NULL,
+    user_id   INTEGER,
+    is_bot    INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS peers
+(
+    id             INTEGER PRIMARY KEY,
+    type           INTEGER NOT NULL,
+    username       TEXT,
+    phone_number   TEXT,
+    last_update_on INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER))
+);
+
+CREATE TABLE IF NOT EXISTS access_hashes
+(
+    session_id  INTEGER NOT NULL,
+    peer_id     INTEGER NOT NULL,
+    access_hash INTEGER,
+    PRIMARY KEY (session_id, peer_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS update_state
+(
+    session_id INTEGER NOT NULL,
+    id         INTEGER NOT NULL,
+    pts        INTEGER,
+    qts        INTEGER,
+    date       INTEGER,
+    seq        INTEGER,
+    PRIMARY KEY (session_id, id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_peers_username ON peers (username);
+CREATE INDEX IF NOT EXISTS idx_peers_phone_number ON peers (phone_number);
+"""
+
+
+class SharedDatabase:
+    """A SQLite database holding the sessions of many clients.
+
+    Peers are stored once for all the sessions, together with the access hash each session knows
+    them by. A single connection, hence a single thread, serves every :obj:`SharedStorage` of the
+    database, and their writes are committed together.
+
+    The database is opened by the first storage opened and closed after the last one is closed.
+
+    Parameters:
+        path (``str`` | ``Path``):
+            Path of the database file.
+
+    Example:
+        .. code-block:: python
+
+            import asyncio
+
+            from hydrogram import Client, compose
+            from hydrogram.storage import SharedDatabase
+
+            database = SharedDatabase("accounts.db")
+
+
+            async def main():
+                apps = [
+                    Client(name, session_storage_engine=database.storage(name))
+                    for name in ("account1", "account2", "account3")
+                ]
+
+                await compose(apps)
+
+
+            asyncio.run(main())
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+        self.conn: aiosqlite.Connection | None = None
+        self.writer: BatchWriter | None = None
+
+        self.users = 0
+        self.lock = asyncio.Lock()
+
+    def storage(self, name: str) -> SharedStorage:
+        """Create the storage of a session of this database.
+
+        Parameters:
+            name (``str``):
+                The name of the session.
+        """
+        return SharedStorage(name, self)
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            if self.users == 0:
+                self.conn = await aiosqlite.connect(
+                    self.path, cached_statements=SQLiteStorage.CACHED_STATEMENTS
+                )
+
+                await self.conn.execute("PRAGMA journal_mode=WAL")
+                await self.conn.execute("PRAGMA synchronous=NORMAL")
+
+                for name, value in SQLiteStorage.PRAGMAS:
+                    await self.conn.execute(f"PRAGMA {name}={value}")
+
+                await self.conn.executescript(SCHEMA)
+                await self.conn.commit()
+
+                self.writer = BatchWriter(self.conn)
+
+            self.users += 1
+
+    async def release(self) -> None:
+        async with self.lock:
+            self.users -= 1
+
+            if self.users == 0:
+                await self.writer.wait()
+                await self.conn.close()
+
+                self.conn = None
+                self.writer = None
+
+    async def fetchone(self, query: str, parameters: tuple) -> tuple | None:
+        cursor = await self.conn.execute(query, parameters)
+
+        try:
+            return await cursor.fetchone()
+        finally:
+            await cursor.close()
+
+    async def write(self, statement: str, rows: list[tuple]) -> int:
+        return await self.writer.write(statement, rows)
+
+    async def write_many(self, statements: list[tuple[str, list[tuple]]]) -> list[int]:
+        return await self.writer.write_many(statements)
+
+
+class SharedStorage(BaseStorage):
+    """Storage engine keeping a session in a :obj:`SharedDatabase`.
+
+    Parameters:
+        name (``str``):
+            The name of the session, unique within the database.
+
+        database (:obj:`SharedDatabase`):
+            The database the session is stored in.
+    """
+
+    USERNAME_TTL = SQLiteStorage.USERNAME_TTL
+
+    def __init__(self, name: str, database: SharedDatabase):
+        super().__init__(name)
+
+        self.database = database
+        self.session_id: int | None = None
+
+    async def open(self) -> None:
+        await self.database.acquire()
+
+        await self.database.write(
+            "INSERT OR IGNORE INTO sessions (name, dc_id, date) VALUES (?, ?, ?)",
+            [(self.name, 2, 0)],
+        )
+
+        self.session_id = (
+            await self.database.fetchone("SELECT id FROM sessions WHERE name = ?", (self.name,))
+        )[0]
+        self.session_record = await self.read_session_record()
+
+    async def save(self) -> None:
+        await self.date(int(time.time()))
+        await self.flush_session_record()
+
+    async def close(self) -> None:
+        await self.flush_session_record()
+        await self.database.release()
+
+    async def delete(self) -> None:
+        # Peers stay, other sessions may know them
+        await self.database.acquire()
+
+        try:
+            await self.database.write_many([
+                (
+                    f"DELETE FROM {table} WHERE {column} = (SELECT id FROM sessions WHERE name = ?)",
+                    [(self.name,)],
+                )
+                for table, column in (
+                    ("access_hashes", "session_id"),
+                    ("update_state", "session_id"),
+                    ("sessions", "id"),
+                )
+            ])
+        finally:
+            await self.database.release()
+
+    async def update_peers(
+        self, peers: list[tuple[int, int, str, str | None, str | None]]
+    ) -> None:
+        # Phone numbers are only known to some sessions, don't let the others forget them. Peers and
+        # access hashes are written in the same transaction
+        await self.database.write_many([
+            (
+                "INSERT INTO peers (id, type, username, phone_number) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                "type = excluded.type, "
+                "username = excluded.username, "
+                "phone_number = COALESCE(excluded.phone_number, phone_number), "
+                "last_update_on = excluded.last_update_on",
+                [
+                    (peer_id, peer_type, username, phone)
+                    for peer_id, _, peer_type, username, phone in peers
+                ],
+            ),
+            (
+                "REPLACE INTO access_hashes (session_id, peer_id, access_hash) VALUES (?, ?, ?)",
+                [(self.session_id, peer_id, access_hash) for peer_id, access_hash, *_ in peers],
+            ),
+        ])
+
+    async def update_state(
+        self,
+        value: list[tuple[int, int | None, int | None, int | None, int | None]] | int = object,
+    ) -> list[tuple[int, int | None, int | None, int | None, int | None]] | None:
+        if value is object:
+            q = await self.database.conn.execute(
+                "SELECT id, pts, qts, date, seq FROM update_state WHERE session_id = ?",
+                (self.session_id,),
+            )
+            rows = await q.fetchall()
+            await q.close()
+            return rows
+
+        if isinstance(value, int):
+            await self.database.write(
+                "DELETE FROM update_state WHERE session_id = ? AND id = ?",
+                [(self.session_id, value)],
+            )
+        else:
+            await self.database.write(
+                "REPLACE INTO update_state (session_id, id, pts, qts, date, seq) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.session_id, *state) for state in value],
+            )
+
+        return None
+
+    async def get_peer_by_id(self, peer_id: int) -> InputPeer:
+        r = await self.database.fetchone(
+            "SELECT p.id, a.access_hash, p.type FROM access_hashes a "
+            "JOIN peers p ON p.id = a.peer_id "
+            "WHERE a.session_id = ? AND a.peer_id = ?",
+            (self.session_id, peer_id),
+        )
+        if not r:
+            raise KeyError(f"ID not found: {peer_id}")
+
+        return get_input_peer(*r)
+
+    async def get_peer_by_username(self, username: str) -> InputPeer:
+        r = await self.database.fetchone(
+            "SELECT p.id, a.access_hash, p.type, p.last_update_on FROM peers p "
+            "JOIN access_hashes a ON a.peer_id = p.id AND a.session_id = ? "
+            "WHERE p.username = ? "
+            "ORDER BY p.last_update_on DESC",
+            (self.session_id, username),
+        )
+        if not r:
+            raise KeyError(f"Username not found: {username}")
+
+        if abs(time.time() - r[3]) > self.USERNAME_TTL:
+            raise KeyError(f"Username expired: {username}")
+
+        return get_input_peer(*r[:3])
+
+    async def get_peer_by_phone_number(self, phone_number: str) -> InputPeer:
+        r = await self.database.fetchone(
+            "SELECT p.id, a.access_hash, p.type FROM peers p "
+            "JOIN access_hashes a ON a.peer_id = p.id AND a.session_id = ? "
+            "WHERE p.phone_number = ?",
+            (self.session_id, phone_number),
+        )
+        if not r:
+            raise KeyError(f"Phone number not found: {phone_number}")
+
+        return get_input_peer(*r)
+
+    async def read_session_record(self) -> dict[str, Any]:
+        r = await self.database.fetchone(
+            f"SELECT {', '.join(self.SESSION_FIELDS)} FROM sessions WHERE id = ?",
+            (self.session_id,),
+        )
+        return dict(zip(self.SESSION_FIELDS, r))
+
+    async def write_session_record(self, fields: dict[str, Any]) -> None:
+        await self.database.write(
+            f"UPDATE sessions SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+            [(*fields.values(), self.session_id)],
+        )
+
+    async def dc_id(self, value: int | object = object) -> int | None:
+        return await self.session_field("dc_id", value)
+
+    async def api_id(self, value: int | object = object) -> int | None:
+        return await self.session_field("api_id", value)
+
+    async def test_mode(self, value: bool | object = object) -> bool | None:
+        return await self.session_field("test_mode", value)
+
+    async def auth_key(self, value: bytes | object = object) -> bytes | None:
+        return await self.session_field("auth_key", value)
+
+    async def date(self, value: int | object = object) -> int | None:
+        return await self.session_field("date", value)
+
+    async def user_id(self, value: int | object = object) -> int | None:
+        return await self.session_field("user_id", value)
+
+    async def is_bot(self, value: bool | object = object) -> bool | None:
+        return await self.session_field("is_bot", value)
@@ -19,18 +19,23 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import contextlib
 import logging
 import struct
 import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import aiosqlite
 
-from hydrogram import raw, utils
+from .base import BaseStorage, InputPeer, get_input_peer
 
-from .base import BaseStorage, InputPeer
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+log = logging.getLogger(__name__)
 
 SCHEMA = """
 CREATE TABLE sessions
@@ -54,14 +59,23 @@ CREATE TABLE peers
     last_update_on INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER))
 );
 
+CREATE TABLE update_state
+(
+    id   INTEGER PRIMARY KEY,
+    pts  INTEGER,
+    qts  INTEGER,
+    date INTEGER,
+    seq  INTEGER
+);
+
 CREATE TABLE version
 (
     number INTEGER PRIMARY KEY
 );
 
-CREATE INDEX idx_peers_id ON peers (id);
 CREATE INDEX idx_peers_username ON peers (username);
 CREATE INDEX idx_peers_phone_number ON peers (phone_number);
+CREATE INDEX idx_peers_last_update_on ON peers (last_update_on);
 
 CREATE TRIGGER trg_peers_last_update_on
     AFTER UPDATE
@@ -73,24 +87,139 @@ BEGIN
 END;
 """
 
+UPDATE_STATE_SCHEMA = """
+CREATE TABLE update_state
+(
+    id   INTEGER PRIMARY KEY,
+    pts  INTEGER,
+    qts  INTEGER,
+    date INTEGER,
+    seq  INTEGER
+);
+"""
 
-def get_input_peer(peer_id: int, access_hash: int, peer_type: str) -> InputPeer:
-    if peer_type in {"user", "bot"}:
-        return raw.types.InputPeerUser(user_id=peer_id, access_hash=access_hash)
-    if peer_type == "group":
-        return raw.types.InputPeerChat(chat_id=-peer_id)
-    if peer_type in {"channel", "supergroup"}:
-        return raw.types.InputPeerChannel(
-            channel_id=utils.get_channel_id(peer_id), access_hash=access_hash
-        )
-    raise ValueError(f"Invalid peer type: {peer_type}")
+PEERS_INDEXES_SCHEMA = """
+DROP INDEX IF EXISTS idx_peers_id;
+CREATE INDEX IF NOT EXISTS idx_peers_last_update_on ON peers (last_update_on);
+"""
+
+
+class BatchWriter:
+    """Serialize the writes to a connection, committing the ones queued meanwhile together.
+
+    Parameters:
+        conn (``aiosqlite.Connection``):
+            The connection to write to.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+
+        self.queue: list[tuple[list[tuple[str, list[tuple]]], asyncio.Future]] = []
+        self.task: asyncio.Task | None = None
+
+    async def write(self, statement: str, rows: list[tuple]) -> int:
+        return (await self.write_many([(statement, rows)]))[0]
+
+    async def write_many(self, statements: list[tuple[str, list[tuple]]]) -> list[int]:
+        """Write many statements in the same transaction.
+
+        Parameters:
+            statements (``List[Tuple[str, List[tuple]]]``):
+                The statements to execute, each with its rows of parameters.
+
+        Returns:
+            ``List[int]``: The number of rows changed by each statement.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.append((statements, future))
+
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+        return await future
+
+    async def run(self) -> None:
+        try:
+            while self.queue:
+                batch, self.queue = self.queue, []
+
+                try:
+                    changes = [
+                        [
+                            (await self.conn.executemany(statement, rows)).rowcount
+                            for statement, rows in statements
+                        ]
+                        for statements, _ in batch
+                    ]
+
+                    await self.conn.commit()
+                except Exception as e:
+                    with contextlib.suppress(Exception):
+                        await self.conn.rollback()
+
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for (_, future), counts in zip(batch, changes):
+                        if not future.done():
+                            future.set_result(counts)
+        finally:
+            self.task = None
+
+    async def wait(self) -> None:
+        """Wait until the queued writes are committed."""
+        if self.task is not None:
+            await self.task
 
 
 class SQLiteStorage(BaseStorage):
-    VERSION = 3
+    """Storage engine keeping the session in a SQLite database.
+
+    All the writes go through a single connection: the ones issued while a transaction is being
+    committed are queued and committed together in the next one. Peer lookups of session files are
+    served by a pool of read-only connections, which in WAL mode don't wait for the writer.
+
+    Parameters:
+        name (``str``):
+            The name of the session.
+
+        workdir (``Path``, *optional*):
+            The directory of the session file.
+
+        session_string (``str``, *optional*):
+            A session string to load the session from.
+
+        use_memory (``bool``, *optional*):
+            Keep the database in memory instead of a file.
+    """
+
+    VERSION = 5
     USERNAME_TTL = 8 * 60 * 60
     FILE_EXTENSION = ".session"
 
+    # Read-only connections for peer lookups, not used by in-memory databases
+    READERS = 2
+
+    # Prepared statements kept by each connection
+    CACHED_STATEMENTS = 64
+
+    # Peers not seen for this amount of seconds are deleted, and only the most recently seen ones are
+    # kept beyond MAX_PEERS. Both are disabled by default: deleted peers must be met again to be used
+    PEER_TTL: int | None = None
+    MAX_PEERS: int | None = None
+
+    # Interval of seconds in which stale peers are pruned and free pages are released
+    MAINTENANCE_INTERVAL = 60 * 60
+
+    # Peers deleted per transaction and free pages released per maintenance
+    PRUNE_BATCH_SIZE = 10000
+    VACUUM_PAGES = 10000
+
+    # Applied to every connection: an 8 MiB page cache and up to 64 MiB of memory-mapped I/O
+    PRAGMAS = (("cache_size", -8 * 1024), ("mmap_size", 64 * 1024 * 1024))
+
     def __init__(
         self,
         name: str,
@@ -107,6 +236,13 @@ class SQLiteStorage(BaseStorage):
         self.session_string: str | None = session_string
         self.conn: aiosqlite.Connection | None = None
 
+        self.readers: asyncio.Queue[aiosqlite.Connection] | None = None
+        self.reader_connections: list[aiosqlite.Connection] = []
+
+        self.writer: BatchWriter | None = None
+
+        self.maintenance_task: asyncio.Task | None = None
+
     async def update(self) -> None:
         if not self.conn:
             logging.warning("Database connection is not available.")
@@ -122,6 +258,18 @@ class SQLiteStorage(BaseStorage):
             await self.conn.execute("ALTER TABLE sessions ADD api_id INTEGER")
             version += 1
 
+        if version == 3:
+            await self.conn.executescript(UPDATE_STATE_SCHEMA)
+            version += 1
+
+        if version == 4:
+            await self.conn.executescript(PEERS_INDEXES_SCHEMA)
+
+            # Switching to incremental auto-vacuum takes one last full VACUUM
+            await self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            await self.conn.execute("VACUUM")
+            version += 1
+
         await self.version(version)
         await self.conn.commit()
 
@@ -145,21 +293,85 @@ class SQLiteStorage(BaseStorage):
         path = self.database
         file_exists = isinstance(path, Path) and path.is_file()
 
-        self.conn = await aiosqlite.connect(self.database)
+        self.conn = await self.connect(self.database)
+        self.writer = BatchWriter(self.conn)
 
+        # Only applies to new databases, it must come before WAL mode creates the file
+        await self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
         await self.conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode, only the last transactions may be lost on power loss, the database can't get corrupted
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
 
         if file_exists:
             await self.update()
-            await self.conn.execute("VACUUM")
         else:
             await self.create()
 
         await self.conn.commit()
 
+        self.session_record = await self.read_session_record()
+
         if self.session_string:
             await self._load_session_string()
 
+        # Separate connections to an in-memory database would each see their own database
+        if isinstance(self.database, Path) and self.READERS:
+            uri = f"{self.database.absolute().as_uri()}?mode=ro"
+
+            # Autocommit, so that no transaction is ever left open on the readers
+            self.reader_connections = [
+                await self.connect(uri, uri=True, isolation_level=None)
+                for _ in range(self.READERS)
+            ]
+            self.readers = asyncio.Queue()
+
+            for reader in self.reader_connections:
+                await reader.execute("PRAGMA query_only=ON")
+                self.readers.put_nowait(reader)
+
+        self.maintenance_task = asyncio.get_running_loop().create_task(self.maintenance_worker())
+
+    async def connect(self, database: str | Path, **kwargs) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(
+            database, cached_statements=self.CACHED_STATEMENTS, **kwargs
+        )
+
+        for name, value in self.PRAGMAS:
+            await conn.execute(f"PRAGMA {name}={value}")
+
+        return conn
+
+    @contextlib.asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        if self.readers is None:
+            yield self.conn
+            return
+
+        conn = await self.readers.get()
+
+        try:
+            yield conn
+        finally:
+            self.readers.put_nowait(conn)
+
+    async def fetchone(self, query: str, parameters: tuple) -> tuple | None:
+        async with self.reader() as conn:
+            cursor = await conn.execute(query, parameters)
+
+            # Close the cursor right away, an open one would keep the reader on an old snapshot
+            try:
+                return await cursor.fetchone()
+            finally:
+                await cursor.close()
+
+    async def write(self, statement: str, rows: list[tuple]) -> int:
+        """Execute a statement for each row and commit, together with the other writes queued.
+
+        Returns:
+            ``int``: The number of rows changed by the statement.
+        """
+        return await self.writer.write(statement, rows)
+
     async def _load_session_string(self) -> None:
         if not self.conn:
             logging.warning("Database connection is not available.")
@@ -187,16 +399,103 @@ class SQLiteStorage(BaseStorage):
             return
 
         await self.date(int(time.time()))
+        await self.flush_session_record()
         await self.conn.commit()
 
     async def close(self) -> None:
+        if self.maintenance_task is not None:
+            self.maintenance_task.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.maintenance_task
+
+            self.maintenance_task = None
+
         if self.conn:
+            await self.flush_session_record()
+
+            await self.writer.wait()
+
+            for reader in self.reader_connections:
+                await reader.close()
+
+            self.reader_connections.clear()
+            self.readers = None
+
             await self.conn.close()
 
     async def delete(self) -> None:
         if self.database != ":memory:":
             Path(self.database).unlink()
 
+    async def maintenance_worker(self) -> None:
+        while True:
+            await asyncio.sleep(self.MAINTENANCE_INTERVAL)
+
+            try:
+                await self.prune_peers()
+                await self.incremental_vacuum()
+            except Exception as e:
+                log.warning("Unable to maintain the peers table: %s", e)
+
+    async def prune_peers(self) -> int:
+        """Delete the peers exceeding :attr:`PEER_TTL` and :attr:`MAX_PEERS`, the least recently seen
+        ones first.
+
+        Peers are deleted in batches of :attr:`PRUNE_BATCH_SIZE`, so that other writes don't wait for
+        the whole pruning.
+
+        Returns:
+            ``int``: The number of deleted peers.
+        """
+        deleted = 0
+
+        if self.PEER_TTL is not None:
+            deleted += await self._delete_peers(
+                "SELECT id FROM peers WHERE last_update_on < ? LIMIT ?",
+                int(time.time()) - self.PEER_TTL,
+            )
+
+        if self.MAX_PEERS is not None:
+            q = await self.conn.execute("SELECT COUNT(*) FROM peers")
+            count = (await q.fetchone())[0]
+            await q.close()
+
+            if count > self.MAX_PEERS:
+                deleted += await self._delete_peers(
+                    "SELECT id FROM peers ORDER BY last_update_on LIMIT ?",
+                    limit=count - self.MAX_PEERS,
+                )
+
+        if deleted:
+            log.info("Pruned %s peers", deleted)
+
+        return deleted
+
+    async def _delete_peers(self, query: str, *parameters: Any, limit: int | None = None) -> int:
+        deleted = 0
+
+        while limit is None or deleted < limit:
+            batch = (
+                self.PRUNE_BATCH_SIZE
+                if limit is None
+                else min(self.PRUNE_BATCH_SIZE, limit - deleted)
+            )
+            count = await self.write(
+                f"DELETE FROM peers WHERE id IN ({query})", [(*parameters, batch)]
+            )
+            deleted += count
+
+            if count < batch:
+                break
+
+        return deleted
+
+    async def incremental_vacuum(self) -> None:
+        """Release up to :attr:`VACUUM_PAGES` free pages of the database file."""
+        # Run as a script: a single execute() only steps the pragma once, releasing one page
+        await self.conn.executescript(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES});")
+
     async def update_peers(
         self, peers: list[tuple[int, int, str, str | None, str | None]]
     ) -> None:
@@ -204,22 +503,18 @@ class SQLiteStorage(BaseStorage):
             logging.warning("Database connection is not available.")
             return
 
-        await self.conn.executemany(
+        await self.write(
             "REPLACE INTO peers (id, access_hash, type, username, phone_number) "
             "VALUES (?, ?, ?, ?, ?)",
             peers,
         )
-        await self.conn.commit()
 
     async def get_peer_by_id(self, peer_id: int) -> InputPeer | None:
         if not self.conn:
             logging.warning("Database connection is not available.")
             return None
 
-        q = await self.conn.execute(
-            "SELECT id, access_hash, type FROM peers WHERE id = ?", (peer_id,)
-        )
-        r = await q.fetchone()
+        r = await self.fetchone("SELECT id, access_hash, type FROM peers WHERE id = ?", (peer_id,))
         if not r:
             raise KeyError(f"ID not found: {peer_id}")
 
@@ -230,14 +525,13 @@ class SQLiteStorage(BaseStorage):
             logging.warning("Database connection is not available.")
             return None
 
-        q = await self.conn.execute(
+        r = await self.fetchone(
             "SELECT id, access_hash, type, last_update_on "
             "FROM peers "
             "WHERE username = ? "
             "ORDER BY last_update_on DESC",
             (username,),
         )
-        r = await q.fetchone()
         if not r:
             raise KeyError(f"Username not found: {username}")
 
@@ -251,42 +545,57 @@ class SQLiteStorage(BaseStorage):
             logging.warning("Database connection is not available.")
             return None
 
-        q = await self.conn.execute(
+        r = await self.fetchone(
             "SELECT id, access_hash, type FROM peers WHERE phone_number = ?", (phone_number,)
         )
-        r = await q.fetchone()
         if not r:
             raise KeyError(f"Phone number not found: {phone_number}")
 
         return get_input_peer(*r)
 
-    async def _get(self, attr: str) -> Any:
+    async def update_state(
+        self,
+        value: list[tuple[int, int | None, int | None, int | None, int | None]] | int = object,
+    ) -> list[tuple[int, int | None, int | None, int | None, int | None]] | None:
         if not self.conn:
             logging.warning("Database connection is not available.")
             return None
 
-        q = await self.conn.execute(f"SELECT {attr} FROM sessions")
+        if value is object:
+            q = await self.conn.execute("SELECT id, pts, qts, date, seq FROM update_state")
+            return await q.fetchall()
+
+        if isinstance(value, int):
+            await self.write("DELETE FROM update_state WHERE id = ?", [(value,)])
+        else:
+            await self.write(
+                "REPLACE INTO update_state (id, pts, qts, date, seq) VALUES (?, ?, ?, ?, ?)",
+                value,
+            )
+
+        return None
+
+    async def read_session_record(self) -> dict[str, Any]:
+        q = await self.conn.execute(f"SELECT {', '.join(self.SESSION_FIELDS)} FROM sessions")
         row = await q.fetchone()
-        return row[0] if row else None
+        return dict(zip(self.SESSION_FIELDS, row)) if row else {}
 
-    async def _set(self, attr: str, value: Any) -> None:
+    async def write_session_record(self, fields: dict[str, Any]) -> None:
         if not self.conn:
             logging.warning("Database connection is not available.")
             return
 
-        await self.conn.execute(f"UPDATE sessions SET {attr} = ?", (value,))
-        await self.conn.commit()
+        await self.write(
+            f"UPDATE sessions SET {', '.join(f'{name} = ?' for name in fields)}",
+            [tuple(fields.values())],
+        )
 
     async def _accessor(self, attr: str, value: Any = object) -> Any | None:
         if not self.conn:
             logging.warning("Database connection is not available.")
             return None
 
-        if value is object:
-            return await self._get(attr)
-
-        await self._set(attr, value)
-        return None
+        return await self.session_field(attr, value)
 
     async def dc_id(self, value: int | object = object) -> int | None:
         return await self._accessor("dc_id", value)
@@ -191,7 +191,7 @@ from .messages_and_media import (
     web_page,
 )
 from .object import Object
-from .pyromod import Identifier, Listener, ListenerTypes
+from .pyromod import Identifier, Listener, ListenerIndex, ListenerTypes
 from .update import Update
 from .user_and_chats import (
     Chat,
@@ -333,6 +333,7 @@ __all__ = [
     "List",
     "List",
     "Listener",
+    "ListenerIndex",
     "ListenerTypes",
     "Location",
     "LoginUrl",
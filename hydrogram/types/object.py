@@ -111,13 +111,13 @@ class Object:
         self.__dict__ = state
 
     def __getstate__(self):
-        state = self.__dict__.copy()
-        state.pop("_client", None)
+        state = {}
 
-        for attr in state:
-            obj = state[attr]
+        for attr, obj in self.__dict__.items():
+            # Private attributes are the bound client and caches, such as the results of filters
+            if attr.startswith("_"):
+                continue
 
-            if isinstance(obj, datetime):
-                state[attr] = ("dt", obj.timestamp())
+            state[attr] = ("dt", obj.timestamp()) if isinstance(obj, datetime) else obj
 
         return state
@@ -19,6 +19,7 @@
 
 from .identifier import Identifier
 from .listener import Listener
+from .listener_index import ListenerIndex
 from .listener_types import ListenerTypes
 
-__all__ = ["Identifier", "Listener", "ListenerTypes"]
+__all__ = ["Identifier", "Listener", "ListenerIndex", "ListenerTypes"]
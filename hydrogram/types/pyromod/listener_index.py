@@ -0,0 +1,146 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2020-present Cezar H. <https://github.com/usernein>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from dataclasses import fields
+from typing import TYPE_CHECKING, Any
+
+from .identifier import Identifier
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .listener import Listener
+
+FIELDS = tuple(field.name for field in fields(Identifier))
+
+
+def get_values(value: Any) -> list:
+    if value is None:
+        return []
+
+    return value if isinstance(value, list) else [value]
+
+
+class ListenerIndex:
+    """Listeners of one type, indexed by the fields of their identifiers.
+
+    Used as the values of :attr:`hydrogram.Client.listeners`. It behaves like the list of listeners
+    it replaces (in registration order), while finding the listeners matching an update only checks
+    the ones sharing at least one value with it on the most selective field. Adding and removing a
+    listener take constant time.
+    """
+
+    def __init__(self):
+        # Keyed by id, as listeners are not hashable
+        self.listeners: dict[int, Listener] = {}
+        self.positions: dict[int, int] = {}
+        self.counter = 0
+
+        # Per field: listeners whose identifier accepts any value, and listeners by accepted value
+        self.wildcards: dict[str, dict[int, Listener]] = {field: {} for field in FIELDS}
+        self.values: dict[str, dict[Any, dict[int, Listener]]] = {field: {} for field in FIELDS}
+
+    def __iter__(self) -> Iterator[Listener]:
+        return iter(list(self.listeners.values()))
+
+    def __len__(self) -> int:
+        return len(self.listeners)
+
+    def __contains__(self, listener: Listener) -> bool:
+        return id(listener) in self.listeners
+
+    def append(self, listener: Listener):
+        key = id(listener)
+
+        if key in self.listeners:
+            return
+
+        self.listeners[key] = listener
+        self.positions[key] = self.counter
+        self.counter += 1
+
+        for field in FIELDS:
+            values = get_values(getattr(listener.identifier, field))
+
+            if not values:
+                self.wildcards[field][key] = listener
+
+            for value in values:
+                self.values[field].setdefault(value, {})[key] = listener
+
+    def remove(self, listener: Listener):
+        key = id(listener)
+
+        if key not in self.listeners:
+            raise ValueError("The listener is not registered")
+
+        del self.listeners[key]
+        del self.positions[key]
+
+        for field in FIELDS:
+            self.wildcards[field].pop(key, None)
+
+            for value in get_values(getattr(listener.identifier, field)):
+                listeners = self.values[field].get(value)
+
+                if listeners is not None:
+                    listeners.pop(key, None)
+
+                    if not listeners:
+                        del self.values[field][value]
+
+    def get_matching(self, data: Identifier) -> list[Listener]:
+        """Get the listeners whose identifier matches the given data, in registration order."""
+        if not self.listeners:
+            return []
+
+        candidates = None
+
+        # Only the candidates of the field with the fewest of them need to be checked
+        for field in FIELDS:
+            indexed = self.values[field]
+            groups = [self.wildcards[field]]
+            groups.extend(
+                indexed[value] for value in get_values(getattr(data, field)) if value in indexed
+            )
+
+            if candidates is None or sum(map(len, groups)) < sum(map(len, candidates)):
+                candidates = groups
+
+        matching = {
+            key: listener
+            for group in candidates
+            for key, listener in group.items()
+            if listener.identifier.matches(data)
+        }
+
+        return sorted(matching.values(), key=lambda listener: self.positions[id(listener)])
+
+    def get_most_specific(self, data: Identifier) -> Listener | None:
+        """Get the listener matching the given data with the most populated identifier.
+
+        Ties are won by the listener registered first.
+        """
+        return max(
+            self.get_matching(data),
+            key=lambda listener: listener.identifier.count_populated(),
+            default=None,
+        )
@@ -0,0 +1,34 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from .min_peer_resolver import MinPeerResolver
+from .recorder import UpdateRecorder, read_records
+from .short_messages import ShortMessageBuilder
+from .stream import UpdateConsumer, UpdatePublisher
+from .updates_manager import UpdatesManager
+
+__all__ = [
+    "MinPeerResolver",
+    "ShortMessageBuilder",
+    "UpdateConsumer",
+    "UpdatePublisher",
+    "UpdateRecorder",
+    "UpdatesManager",
+    "read_records",
+]
@@ -0,0 +1,121 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from hydrogram import raw, utils
+
+if TYPE_CHECKING:
+    import hydrogram
+
+log = logging.getLogger(__name__)
+
+
+class MinPeerResolver:
+    """Resolve the min peers of channel messages in batches.
+
+    Messages coming with min peers (users and chats without an access hash) are collected for
+    :attr:`WINDOW` seconds, then the full peers are fetched with a single ``channels.GetMessages``
+    call per channel. Every caller waits until the request for its channel completes.
+    """
+
+    # Seconds to wait for more messages of the same channels before fetching them
+    WINDOW = 0.05
+
+    # Maximum amount of message ids per channels.GetMessages call
+    MAX_MESSAGE_IDS = 100
+
+    def __init__(self, client: hydrogram.Client):
+        self.client = client
+
+        self.pending: dict[int, tuple[set[int], asyncio.Future]] = {}
+        self.flush_handle: asyncio.TimerHandle | None = None
+
+        self.requests = 0
+        self.resolved_messages = 0
+
+    async def resolve(
+        self, channel_id: int, message_ids: list[int]
+    ) -> tuple[dict[int, raw.base.User], dict[int, raw.base.Chat]]:
+        """Fetch the peers of the given messages.
+
+        Parameters:
+            channel_id (``int``):
+                The raw id of the channel the messages belong to.
+
+            message_ids (``list``):
+                The ids of the messages coming with min peers.
+
+        Returns:
+            ``tuple``: The users and chats maps of the fetched messages. On errors, the maps are empty.
+        """
+        if channel_id not in self.pending:
+            self.pending[channel_id] = (set(), self.client.loop.create_future())
+
+        ids, future = self.pending[channel_id]
+        ids.update(message_ids)
+
+        if self.flush_handle is None:
+            self.flush_handle = self.client.loop.call_later(self.WINDOW, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        self.flush_handle = None
+        pending, self.pending = self.pending, {}
+
+        for channel_id, (ids, future) in pending.items():
+            self.client.loop.create_task(self._fetch(channel_id, sorted(ids), future))
+
+    async def _fetch(self, channel_id: int, message_ids: list[int], future: asyncio.Future):
+        users = {}
+        chats = {}
+
+        try:
+            peer = await self.client.resolve_peer(utils.get_channel_id(channel_id))
+            channel = raw.types.InputChannel(
+                channel_id=peer.channel_id, access_hash=peer.access_hash
+            )
+
+            for i in range(0, len(message_ids), self.MAX_MESSAGE_IDS):
+                r = await self.client.invoke(
+                    raw.functions.channels.GetMessages(
+                        channel=channel,
+                        id=[
+                            raw.types.InputMessageID(id=message_id)
+                            for message_id in message_ids[i : i + self.MAX_MESSAGE_IDS]
+                        ],
+                    )
+                )
+
+                self.requests += 1
+
+                users.update({u.id: u for u in r.users})
+                chats.update({c.id: c for c in r.chats})
+        except Exception as e:
+            log.debug("Unable to resolve min peers of channel %s: %s", channel_id, e)
+        else:
+            self.resolved_messages += len(message_ids)
+        finally:
+            if not future.done():
+                future.set_result((users, chats))
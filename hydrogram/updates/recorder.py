@@ -0,0 +1,96 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import struct
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from hydrogram.raw.core import TLObject
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+MAGIC = b"HGUPDATES1"
+
+# Timestamp and size of each record
+RECORD_HEADER = struct.Struct("<dI")
+
+
+class UpdateRecorder:
+    """Record the raw updates received by a client to an append-only file.
+
+    The file starts with a magic string, followed by one record per ``Updates`` object: its receive
+    timestamp (float64), its size (uint32), both little-endian, and its TL serialization. Read the
+    records with :func:`read_records` and replay them with :obj:`~hydrogram.updates.replay.UpdateReplayer`.
+
+    Parameters:
+        path (``str``):
+            Path of the file. Records are appended in case it already exists.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.file: BinaryIO | None = None
+
+        self.records = 0
+
+    def record(self, updates: TLObject):
+        if self.file is None:
+            self.file = self.path.open("ab")
+
+            if not self.file.tell():
+                self.file.write(MAGIC)
+
+        data = updates.write()
+
+        self.file.write(RECORD_HEADER.pack(time.time(), len(data)) + data)
+        self.records += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_records(path: str) -> Iterator[tuple[float, TLObject]]:
+    """Read the records of a file written by :class:`UpdateRecorder`.
+
+    Yields:
+        ``tuple``: The receive timestamp and the raw ``Updates`` object of each record.
+    """
+    with Path(path).open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an update recording")
+
+        while header := f.read(RECORD_HEADER.size):
+            if len(header) < RECORD_HEADER.size:
+                break
+
+            timestamp, size = RECORD_HEADER.unpack(header)
+            data = f.read(size)
+
+            # The last record is incomplete in case the client didn't stop cleanly
+            if len(data) < size:
+                break
+
+            yield timestamp, TLObject.read(BytesIO(data))
@@ -0,0 +1,213 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+import hydrogram
+from hydrogram import raw
+from hydrogram.raw.core import TLObject
+
+from .recorder import read_records
+
+if TYPE_CHECKING:
+    from hydrogram import types
+
+log = logging.getLogger(__name__)
+
+# A canned response, or a function building it from the query
+Response = Union[TLObject, Callable[[TLObject], Any]]
+
+
+class ReplayClient(hydrogram.Client):
+    """Client running offline, for replaying recorded updates.
+
+    It never connects to Telegram: the session is kept in memory and RPCs are answered with the canned
+    responses registered for their type, whose users and chats are stored like the real ones. Handlers
+    are added as usual.
+
+    Parameters:
+        name (``str``, *optional*):
+            A name for the client.
+            Defaults to "replay".
+
+        responses (``dict``, *optional*):
+            Canned responses of the RPCs, keyed by the type of the raw function, e.g.
+            *{functions.messages.SendMessage: types.Updates(...)}*. A value can also be a function,
+            or a coroutine function, receiving the query and returning the response.
+
+        me (:obj:`~hydrogram.types.User`, *optional*):
+            The user the client acts as, since it can't be fetched.
+
+        **kwargs:
+            Any other parameter of :obj:`~hydrogram.Client`, e.g. *workers*.
+    """
+
+    def __init__(
+        self,
+        name: str = "replay",
+        responses: dict[type[TLObject], Response] | None = None,
+        me: types.User | None = None,
+        **kwargs,
+    ):
+        super().__init__(name, in_memory=True, **kwargs)
+
+        self.responses = dict(responses or {})
+        self.me = me
+
+        self.invocations: Counter[type[TLObject]] = Counter()
+
+    async def invoke(self, query: TLObject, *args, **kwargs) -> Any:
+        self.invocations[type(query)] += 1
+
+        try:
+            response = self.responses[type(query)]
+        except KeyError:
+            raise NotImplementedError(
+                f"No canned response for {type(query).__name__} in the replay client"
+            ) from None
+
+        # Raw objects are callable too
+        if not isinstance(response, TLObject):
+            response = response(query)
+
+            if inspect.isawaitable(response):
+                response = await response
+
+        await self.fetch_peers(getattr(response, "users", []))
+        await self.fetch_peers(getattr(response, "chats", []))
+
+        return response
+
+    async def start(self) -> ReplayClient:
+        await self.storage.open()
+        await self.dispatcher.start()
+
+        # Methods such as resolve_peer refuse to run otherwise
+        self.is_connected = True
+
+        return self
+
+    async def stop(self, block: bool = True) -> ReplayClient:
+        self.is_connected = False
+
+        await self.dispatcher.stop()
+        await self.peer_cache.stop()
+        await self.storage.close()
+
+        return self
+
+
+class UpdateReplayer:
+    """Feed the updates of a recording into the dispatcher of a client.
+
+    The recorded ``Updates`` objects are unpacked the way :meth:`~hydrogram.Client.handle_updates`
+    does, their peers are stored and each update is put in the dispatcher queue. The difference
+    sequence checks are skipped, the recording is replayed as is.
+
+    Parameters:
+        client (:obj:`~hydrogram.Client`):
+            The client to dispatch the updates to, usually a :obj:`ReplayClient`.
+
+        path (``str``):
+            Path of a file written by :obj:`~hydrogram.updates.UpdateRecorder`.
+    """
+
+    def __init__(self, client: hydrogram.Client, path: str):
+        self.client = client
+        self.path = path
+
+        # Updates dispatched and recorded objects that couldn't be replayed
+        self.updates = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Updates handled per second by the last replay."""
+        return self.updates / self.elapsed if self.elapsed else 0.0
+
+    async def replay(self, speed: float | None = 1.0):
+        """Replay the recording and wait until all its updates are handled.
+
+        Parameters:
+            speed (``float``, *optional*):
+                Pacing of the replay relative to the original one, e.g. 2 to replay twice as fast.
+                Pass None to replay as fast as possible.
+                Defaults to 1.
+        """
+        self.updates = 0
+        self.skipped = 0
+
+        queue = self.client.dispatcher.updates_queue
+        first = None
+        start = time.perf_counter()
+
+        for timestamp, updates in read_records(self.path):
+            if speed is not None:
+                first = timestamp if first is None else first
+                delay = (timestamp - first) / speed - (time.perf_counter() - start)
+
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            for packet in await self.unpack(updates):
+                await queue.put(packet)
+                self.updates += 1
+
+        await queue.join()
+
+        self.elapsed = time.perf_counter() - start
+
+        log.info(
+            "Replayed %s updates in %.3fs (%.0f updates/s)",
+            self.updates,
+            self.elapsed,
+            self.throughput,
+        )
+
+    async def unpack(self, updates: TLObject) -> list[tuple[TLObject, dict, dict]]:
+        if isinstance(updates, (raw.types.Updates, raw.types.UpdatesCombined)):
+            await self.client.fetch_peers(updates.users)
+            await self.client.fetch_peers(updates.chats)
+
+            users = {u.id: u for u in updates.users}
+            chats = {c.id: c for c in updates.chats}
+
+            return [(update, users, chats) for update in updates.updates]
+
+        if isinstance(updates, raw.types.UpdateShort):
+            return [(updates.update, {}, {})]
+
+        if isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
+            built = await self.client.short_message_builder.build(updates)
+
+            if built is not None:
+                return [built]
+
+        # Short messages of unknown peers would need a difference, and there's no server to ask
+        self.skipped += 1
+
+        return []
@@ -0,0 +1,126 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from hydrogram import raw, utils
+
+if TYPE_CHECKING:
+    import hydrogram
+
+log = logging.getLogger(__name__)
+
+
+class ShortMessageBuilder:
+    """Build full messages out of short message updates.
+
+    Private and basic group messages are often sent as :obj:`~hydrogram.raw.types.UpdateShortMessage`
+    and :obj:`~hydrogram.raw.types.UpdateShortChatMessage`, which only carry the ids of the peers
+    involved. The full message is built locally using the peers kept by the client's peer cache;
+    when any of them is unknown the caller has to fall back to ``updates.GetDifference``.
+    """
+
+    def __init__(self, client: hydrogram.Client):
+        self.client = client
+
+        self.built = 0
+        self.fallbacks = 0
+
+    async def build(
+        self, update: raw.types.UpdateShortMessage | raw.types.UpdateShortChatMessage
+    ) -> tuple[raw.types.UpdateNewMessage, dict, dict] | None:
+        """Build the update of a new message and the peers it references.
+
+        Parameters:
+            update (:obj:`~hydrogram.raw.types.UpdateShortMessage` | :obj:`~hydrogram.raw.types.UpdateShortChatMessage`):
+                The short update to build the message from.
+
+        Returns:
+            ``tuple``: The :obj:`~hydrogram.raw.types.UpdateNewMessage` together with the users and
+            chats maps, or None in case a required peer is unknown.
+        """
+        if isinstance(update, raw.types.UpdateShortMessage):
+            user_id = await self.client.storage.user_id() if update.out else update.user_id
+            from_id = raw.types.PeerUser(user_id=user_id)
+            peer_id = raw.types.PeerUser(user_id=update.user_id)
+        else:
+            from_id = raw.types.PeerUser(user_id=update.from_id)
+            peer_id = raw.types.PeerChat(chat_id=update.chat_id)
+
+        required = [from_id, peer_id]
+
+        if update.fwd_from and update.fwd_from.from_id:
+            required.append(update.fwd_from.from_id)
+
+        if update.via_bot_id:
+            required.append(raw.types.PeerUser(user_id=update.via_bot_id))
+
+        users = {}
+        chats = {}
+
+        for peer in required:
+            raw_peer = self.client.peer_cache.get_raw_peer(utils.get_peer_id(peer))
+
+            if raw_peer is None:
+                self.fallbacks += 1
+                log.debug("Unknown peer %s, falling back to GetDifference", peer)
+                return None
+
+            if isinstance(peer, raw.types.PeerUser):
+                users[raw_peer.id] = raw_peer
+            else:
+                chats[raw_peer.id] = raw_peer
+
+        # Mentioned users are not required to parse the message, but are included when known
+        for entity in update.entities or []:
+            if isinstance(entity, raw.types.MessageEntityMentionName):
+                raw_peer = self.client.peer_cache.get_raw_peer(entity.user_id)
+
+                if raw_peer is not None:
+                    users[raw_peer.id] = raw_peer
+
+        message = raw.types.Message(
+            id=update.id,
+            peer_id=peer_id,
+            date=update.date,
+            message=update.message,
+            out=update.out,
+            mentioned=update.mentioned,
+            media_unread=update.media_unread,
+            silent=update.silent,
+            from_id=from_id,
+            fwd_from=update.fwd_from,
+            via_bot_id=update.via_bot_id,
+            reply_to=update.reply_to,
+            entities=update.entities,
+            ttl_period=update.ttl_period,
+        )
+
+        self.built += 1
+
+        return (
+            raw.types.UpdateNewMessage(
+                message=message, pts=update.pts, pts_count=update.pts_count
+            ),
+            users,
+            chats,
+        )
@@ -0,0 +1,317 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from hydrogram.raw.core import TLObject
+from hydrogram.raw.core.primitives import Vector
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    import hydrogram
+
+log = logging.getLogger(__name__)
+
+# (update, users, chats), as put in the dispatcher queue
+Packet = tuple[TLObject, dict[int, TLObject], dict[int, TLObject]]
+
+HEADER_SIZE = 4
+DEFAULT_GROUP = "default"
+
+
+def encode_packet(update: TLObject, users: dict, chats: dict) -> bytes:
+    """Serialize a packet as a TL frame: the update followed by the vectors of its users and chats."""
+    payload = b"".join([
+        update.write(),
+        Vector(list(users.values())),
+        Vector(list(chats.values())),
+    ])
+
+    return len(payload).to_bytes(HEADER_SIZE, "little") + payload
+
+
+def decode_packet(payload: bytes) -> Packet:
+    data = BytesIO(payload)
+    update = TLObject.read(data)
+
+    peers = []
+
+    for _ in range(2):
+        data.read(4)  # Vector constructor id
+        peers.append({peer.id: peer for peer in Vector.read(data, TLObject)})
+
+    return update, peers[0], peers[1]
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    size = int.from_bytes(await reader.readexactly(HEADER_SIZE), "little")
+    return await reader.readexactly(size)
+
+
+class Subscriber:
+    def __init__(self, writer: asyncio.StreamWriter, group: str, window: int):
+        self.writer = writer
+        self.group = group
+        self.frames: asyncio.Queue[bytes] = asyncio.Queue(window)
+        self.closed = asyncio.Event()
+        self.sent = 0
+
+    async def put(self, frame: bytes) -> bool:
+        """Queue a frame, waiting for room in the window.
+
+        Returns:
+            ``bool``: False in case the consumer disconnected before the frame could be queued.
+        """
+        if self.closed.is_set():
+            return False
+
+        if not self.frames.full():
+            self.frames.put_nowait(frame)
+            return True
+
+        put = asyncio.ensure_future(self.frames.put(frame))
+        closed = asyncio.ensure_future(self.closed.wait())
+
+        try:
+            await asyncio.wait({put, closed}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            put.cancel()
+            closed.cancel()
+
+        # Frames queued for a disconnected consumer are never sent
+        return not self.closed.is_set()
+
+    def close(self):
+        self.closed.set()
+
+        while not self.frames.empty():
+            self.frames.get_nowait()
+
+    async def send_frames(self):
+        while True:
+            frame = await self.frames.get()
+            self.writer.write(frame)
+            await self.writer.drain()
+            self.sent += 1
+
+
+class UpdatePublisher:
+    """Publish the raw updates received by a client to other processes over a Unix domain socket.
+
+    Every update is sent as a frame made of a 4 bytes little-endian length followed by the TL
+    serialization of the update and of the vectors of its users and chats. Consumers (see
+    :class:`UpdateConsumer`) join a group when connecting: each update is sent to every group, to
+    the consumer of the group with the fewest pending frames.
+
+    Each consumer has room for *window* pending frames. Once all the consumers of a group are full,
+    publishing waits, which in turn slows down the dispatcher. Updates are dropped for groups with no
+    consumers, as well as the frames pending for a consumer that disconnects.
+
+    Parameters:
+        path (``str``):
+            Path of the socket.
+
+        window (``int``, *optional*):
+            Maximum amount of frames pending for each consumer.
+    """
+
+    WINDOW = 1000
+
+    def __init__(self, path: str, window: int = WINDOW):
+        self.path = path
+        self.window = window
+
+        self.server: asyncio.AbstractServer | None = None
+        self.groups: dict[str, list[Subscriber]] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+        self.published = 0
+        self.dropped = 0
+
+    async def start(self):
+        Path(self.path).unlink(missing_ok=True)
+
+        self.server = await asyncio.start_unix_server(self.on_connection, self.path)
+
+    async def stop(self):
+        if self.server is None:
+            return
+
+        self.server.close()
+
+        for task in self.tasks:
+            task.cancel()
+
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+        self.server = None
+
+        Path(self.path).unlink(missing_ok=True)
+
+    async def publish(self, update: TLObject, users: dict, chats: dict):
+        if not self.groups:
+            self.dropped += 1
+            return
+
+        frame = encode_packet(update, users, chats)
+
+        for group in list(self.groups):
+            # Pick another consumer of the group in case the chosen one disconnects meanwhile
+            while subscribers := self.groups.get(group):
+                subscriber = min(subscribers, key=lambda s: s.frames.qsize())
+
+                if await subscriber.put(frame):
+                    break
+
+        self.published += 1
+
+    async def on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self.tasks.add(task)
+
+        try:
+            group = (await read_frame(reader)).decode() or DEFAULT_GROUP
+        except (asyncio.IncompleteReadError, ConnectionError, UnicodeDecodeError):
+            writer.close()
+            self.tasks.discard(task)
+            return
+
+        subscriber = Subscriber(writer, group, self.window)
+        self.groups.setdefault(group, []).append(subscriber)
+        sender = asyncio.create_task(subscriber.send_frames())
+
+        log.info('Update consumer joined group "%s"', group)
+
+        try:
+            # Consumers don't send anything else, reading only detects disconnections
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            self.groups[group].remove(subscriber)
+
+            if not self.groups[group]:
+                del self.groups[group]
+
+            # Publishers waiting for room in its window move on
+            subscriber.close()
+            sender.cancel()
+
+            with contextlib.suppress(asyncio.CancelledError, ConnectionError):
+                await sender
+
+            writer.close()
+            self.tasks.discard(task)
+
+            log.info('Update consumer left group "%s"', group)
+
+
+class UpdateConsumer:
+    """Receive the updates published by an :class:`UpdatePublisher`.
+
+    Parameters:
+        path (``str``):
+            Path of the socket of the publisher.
+
+        group (``str``, *optional*):
+            The group to join. Updates are load balanced between the consumers of the same group.
+            Defaults to "default".
+
+        client (:obj:`~hydrogram.Client`, *optional*):
+            A client used to parse the raw updates into Hydrogram objects (see :meth:`parse`).
+            Parsed objects are bound to it.
+
+    Example:
+        .. code-block:: python
+
+            consumer = UpdateConsumer("/tmp/updates.sock", group="indexer", client=app)
+            await consumer.connect()
+
+            async for update, users, chats in consumer:
+                message = await consumer.parse(update, users, chats)
+    """
+
+    def __init__(
+        self, path: str, group: str = DEFAULT_GROUP, client: hydrogram.Client | None = None
+    ):
+        self.path = path
+        self.group = group
+        self.client = client
+
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+
+        group = self.group.encode()
+        self.writer.write(len(group).to_bytes(HEADER_SIZE, "little") + group)
+        await self.writer.drain()
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+            with contextlib.suppress(ConnectionError):
+                await self.writer.wait_closed()
+
+            self.reader = self.writer = None
+
+    async def read(self) -> Packet | None:
+        """Wait for the next update.
+
+        Returns:
+            ``tuple``: The raw update with its users and chats maps, or None once the publisher is gone.
+        """
+        try:
+            return decode_packet(await read_frame(self.reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+
+    async def parse(self, update: TLObject, users: dict, chats: dict) -> Any:
+        """Parse a raw update the same way the dispatcher of the client does.
+
+        Returns:
+            :obj:`~hydrogram.types.Update`: The parsed update, or None for updates with no parser.
+        """
+        parser = self.client.dispatcher.update_parsers.get(type(update))
+
+        if parser is None:
+            return None
+
+        result = parser(update, users, chats)
+
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result[0]
+
+    async def __aiter__(self) -> AsyncIterator[Packet]:
+        while (packet := await self.read()) is not None:
+            yield packet
@@ -0,0 +1,650 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import TYPE_CHECKING, Union
+
+from hydrogram import raw, utils
+from hydrogram.errors import RPCError
+
+if TYPE_CHECKING:
+    import hydrogram
+
+log = logging.getLogger(__name__)
+
+# The common pts and qts sequences are keyed by name, channel sequences by their raw channel id
+StateKey = Union[str, int]
+PendingUpdate = tuple[int, int, raw.core.TLObject, dict, dict, bool]
+
+PTS = "pts"
+QTS = "qts"
+COMMON = "common"
+
+CHANNEL_PTS_UPDATES = (
+    raw.types.UpdateNewChannelMessage,
+    raw.types.UpdateEditChannelMessage,
+    raw.types.UpdateDeleteChannelMessages,
+    raw.types.UpdateReadChannelInbox,
+    raw.types.UpdateChannelWebPage,
+    raw.types.UpdatePinnedChannelMessages,
+)
+
+
+def get_update_channel_id(update: raw.base.Update) -> int | None:
+    channel_id = getattr(update, "channel_id", None)
+
+    if channel_id is None:
+        peer = getattr(getattr(update, "message", None), "peer_id", None)
+        channel_id = getattr(peer, "channel_id", None)
+
+    return channel_id
+
+
+class UpdatesManager:
+    """Keep track of the update state and deliver updates to the dispatcher in order.
+
+    Every update carrying a *pts* or *qts* is checked against the local state: updates that fit the
+    sequence are dispatched, duplicates are dropped and updates that arrive after a gap are held for
+    :attr:`HOLD_TIMEOUT` seconds, waiting for the missing ones. If the gap is still there after the
+    timeout, the missing updates are fetched with ``updates.GetDifference`` (common sequence) or
+    ``updates.GetChannelDifference`` (channel sequences).
+
+    The state is saved periodically and when the client stops. When a saved state is found on start,
+    the updates missed in the meantime are fetched and dispatched before any live update.
+    """
+
+    # Seconds to wait for the missing updates of a gap before fetching the difference
+    HOLD_TIMEOUT = 0.5
+
+    # Maximum amount of channel differences that are fetched at the same time
+    MAX_CONCURRENT_CHANNEL_DIFFERENCES = 4
+
+    CHANNEL_DIFFERENCE_LIMIT = 100
+    BOT_CHANNEL_DIFFERENCE_LIMIT = 100000
+
+    # Interval of seconds in which the update state is saved to the storage
+    SAVE_INTERVAL = 60
+
+    # Errors of channels the account has left or can no longer access, whose state is dropped
+    LOST_CHANNEL_ERRORS = frozenset({
+        "CHANNEL_INVALID",
+        "CHANNEL_PRIVATE",
+        "CHANNEL_PUBLIC_GROUP_NA",
+        "PEER_ID_INVALID",
+    })
+
+    def __init__(self, client: hydrogram.Client):
+        self.client = client
+
+        self.pts: int | None = None
+        self.qts: int | None = None
+        self.date: int | None = None
+        self.seq: int | None = None
+
+        self.channels: dict[int, int] = {}
+
+        self.pending: dict[StateKey, list[PendingUpdate]] = {}
+        self.gap_timers: dict[StateKey, asyncio.TimerHandle] = {}
+        self.recovery_tasks: dict[StateKey, asyncio.Task] = {}
+
+        # Updates received while catching up, processed in arrival order once caught up
+        self.held: list[tuple[raw.base.Update, dict, dict, bool]] = []
+
+        self.is_catching_up = False
+        self.catch_up_task: asyncio.Task | None = None
+        self.catch_up_updates = 0
+        self.catch_up_time = 0.0
+
+        self.save_task: asyncio.Task | None = None
+        self.saved_state: tuple | None = None
+        self.saved_channels: dict[int, int] = {}
+
+        self.channel_difference_semaphore = asyncio.Semaphore(
+            self.MAX_CONCURRENT_CHANNEL_DIFFERENCES
+        )
+
+    async def start(self):
+        common_state = None
+
+        for state_id, pts, qts, date, seq in await self.client.storage.update_state():
+            if state_id == 0:
+                common_state = (pts, qts, date, seq)
+            else:
+                self.channels[state_id] = pts
+
+        self.saved_channels = self.channels.copy()
+
+        if common_state is not None:
+            self.pts, self.qts, self.date, self.seq = self.saved_state = common_state
+
+            log.info(
+                "Update state loaded: pts=%s qts=%s date=%s seq=%s (%s channels)",
+                self.pts,
+                self.qts,
+                self.date,
+                self.seq,
+                len(self.channels),
+            )
+
+            self.is_catching_up = True
+            self.catch_up_task = self.client.loop.create_task(self.catch_up())
+        else:
+            self.set_state(await self.client.invoke(raw.functions.updates.GetState()))
+
+        self.save_task = self.client.loop.create_task(self.save_worker())
+
+    async def stop(self):
+        for task in (self.save_task, self.catch_up_task):
+            if task is not None:
+                task.cancel()
+
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+        self.save_task = self.catch_up_task = None
+
+        for timer in self.gap_timers.values():
+            timer.cancel()
+
+        for task in list(self.recovery_tasks.values()):
+            task.cancel()
+
+        await asyncio.gather(*self.recovery_tasks.values(), return_exceptions=True)
+
+        self.gap_timers.clear()
+        self.recovery_tasks.clear()
+
+        await self.save()
+
+        self.pending.clear()
+        self.held.clear()
+
+    async def save(self):
+        if self.pts is None:
+            return
+
+        state = (self.pts, self.qts, self.date, self.seq)
+        channels = {
+            channel_id: pts
+            for channel_id, pts in self.channels.items()
+            if self.saved_channels.get(channel_id) != pts
+        }
+
+        if state == self.saved_state and not channels:
+            return
+
+        await self.client.storage.update_state([
+            (0, *state),
+            *((channel_id, pts, None, None, None) for channel_id, pts in channels.items()),
+        ])
+
+        self.saved_state = state
+        self.saved_channels.update(channels)
+
+    async def save_worker(self):
+        while True:
+            await asyncio.sleep(self.SAVE_INTERVAL)
+
+            try:
+                await self.save()
+            except Exception as e:
+                log.warning("Unable to save the update state: %s", e)
+
+    async def catch_up(self):
+        """Fetch the updates missed since the saved state and dispatch them before the live ones.
+
+        The common difference is fetched slice by slice while the differences of all the tracked
+        channels are fetched concurrently; every slice is dispatched as soon as it arrives.
+        """
+        self.catch_up_updates = 0
+        start = time.perf_counter()
+
+        try:
+            self._schedule_recovery(COMMON)
+
+            for channel_id in list(self.channels):
+                self._schedule_recovery(channel_id)
+
+            # Differences can schedule further recoveries (e.g.: UpdateChannelTooLong)
+            while self.recovery_tasks:
+                await asyncio.gather(*self.recovery_tasks.values(), return_exceptions=True)
+        finally:
+            self.is_catching_up = False
+            self.catch_up_time = time.perf_counter() - start
+
+            held, self.held = self.held, []
+
+            # Updates already fetched with the differences are dropped as duplicates
+            for update, users, chats, dispatch in held:
+                self.process_update(update, users, chats, dispatch)
+
+        log.info(
+            "Caught up %s updates in %.2fs (%.1f updates/s)",
+            self.catch_up_updates,
+            self.catch_up_time,
+            self.catch_up_updates / self.catch_up_time if self.catch_up_time else 0,
+        )
+
+    def set_state(self, state: raw.types.updates.State):
+        self.pts = state.pts
+        self.qts = state.qts
+        self.date = state.date
+        self.seq = state.seq
+
+    def check_seq(self, updates: raw.types.Updates | raw.types.UpdatesCombined) -> bool:
+        """Check the seq of an updates container.
+
+        Returns ``False`` in case the container was already handled and must be skipped.
+        A gap in the seq sequence schedules a difference recovery.
+        """
+        if not updates.seq or self.seq is None:
+            return True
+
+        seq_start = getattr(updates, "seq_start", updates.seq)
+
+        if updates.seq <= self.seq:
+            log.debug("Skipping duplicated updates (seq=%s, local=%s)", updates.seq, self.seq)
+            return False
+
+        if seq_start > self.seq + 1:
+            log.debug("Seq gap detected (seq_start=%s, local=%s)", seq_start, self.seq)
+            self._schedule_recovery(COMMON)
+
+        return True
+
+    def update_seq(self, updates: raw.base.Updates):
+        if getattr(updates, "seq", 0) and (self.seq is None or updates.seq > self.seq):
+            self.seq = updates.seq
+
+        if getattr(updates, "date", None) and (self.date is None or updates.date > self.date):
+            self.date = updates.date
+
+    def is_duplicate(self, update: raw.core.TLObject) -> bool:
+        key, value, count = self._get_sequence(update)
+
+        if key is None:
+            return False
+
+        local = self._get_local(key)
+
+        return local is not None and local + count > value
+
+    def process_update(
+        self,
+        update: raw.base.Update,
+        users: dict[int, raw.base.User],
+        chats: dict[int, raw.base.Chat],
+        dispatch: bool = True,
+    ):
+        """Check an update against the local state and dispatch it if it fits the sequence.
+
+        Parameters:
+            update (``raw.base.Update``):
+                The update to process.
+
+            users (``dict``):
+                The users that come along with the update.
+
+            chats (``dict``):
+                The chats that come along with the update.
+
+            dispatch (``bool``, *optional*):
+                Pass False to only advance the local state, used for updates that come as results of
+                RPC calls.
+        """
+        if isinstance(update, raw.types.UpdateChannelTooLong):
+            if update.channel_id not in self.channels and update.pts:
+                self.channels[update.channel_id] = update.pts
+
+            self._schedule_recovery(update.channel_id)
+            return
+
+        if self.is_catching_up:
+            self.held.append((update, users, chats, dispatch))
+            return
+
+        key, value, count = self._get_sequence(update)
+
+        if key is None:
+            if dispatch:
+                self._dispatch(update, users, chats)
+            return
+
+        if self._get_recovery_key(key) in self.recovery_tasks:
+            self.pending.setdefault(key, []).append((value, count, update, users, chats, dispatch))
+            return
+
+        local = self._get_local(key)
+
+        if local is None or local + count == value:
+            self._set_local(key, value)
+
+            if dispatch:
+                self._dispatch(update, users, chats)
+
+            if key in self.pending:
+                self._drain_pending(key)
+        elif local + count > value:
+            log.debug("Skipping duplicated update %s (%s=%s, local=%s)", key, key, value, local)
+        else:
+            log.debug(
+                "Gap detected for %s (%s=%s, count=%s, local=%s)", key, key, value, count, local
+            )
+            self.pending.setdefault(key, []).append((value, count, update, users, chats, dispatch))
+
+            if key not in self.gap_timers:
+                self.gap_timers[key] = self.client.loop.call_later(
+                    self.HOLD_TIMEOUT, self._on_gap_timeout, key
+                )
+
+    def process_rpc_result(self, result: raw.core.TLObject):
+        """Advance the local state using the updates contained in the result of an RPC call."""
+        if isinstance(result, (raw.types.Updates, raw.types.UpdatesCombined)):
+            if not self.check_seq(result):
+                return
+
+            for update in result.updates:
+                self.process_update(update, {}, {}, dispatch=False)
+
+            self.update_seq(result)
+        elif isinstance(result, raw.types.UpdateShort):
+            self.process_update(result.update, {}, {}, dispatch=False)
+            self.update_seq(result)
+        elif isinstance(result, raw.types.UpdateShortSentMessage):
+            self.process_update(result, {}, {}, dispatch=False)
+
+    def recover(self):
+        """Schedule a full difference recovery of the common state."""
+        self._schedule_recovery(COMMON)
+
+    @staticmethod
+    def _get_sequence(update: raw.core.TLObject) -> tuple[StateKey | None, int, int]:
+        pts = getattr(update, "pts", None)
+
+        if pts is not None:
+            pts_count = getattr(update, "pts_count", None) or 0
+
+            if isinstance(update, CHANNEL_PTS_UPDATES):
+                channel_id = get_update_channel_id(update)
+
+                if channel_id is None:
+                    return None, 0, 0
+
+                return channel_id, pts, pts_count
+
+            return PTS, pts, pts_count
+
+        qts = getattr(update, "qts", None)
+
+        if qts:
+            return QTS, qts, 1
+
+        return None, 0, 0
+
+    def _get_local(self, key: StateKey) -> int | None:
+        if key == PTS:
+            return self.pts
+
+        if key == QTS:
+            return self.qts
+
+        return self.channels.get(key)
+
+    def _set_local(self, key: StateKey, value: int):
+        if key == PTS:
+            self.pts = value
+        elif key == QTS:
+            self.qts = value
+        else:
+            self.channels[key] = value
+
+    @staticmethod
+    def _get_recovery_key(key: StateKey) -> StateKey:
+        return COMMON if key in {PTS, QTS} else key
+
+    def _dispatch(self, update: raw.base.Update, users: dict, chats: dict):
+        if self.is_catching_up:
+            self.catch_up_updates += 1
+
+        self.client.dispatcher.updates_queue.put_nowait((update, users, chats))
+
+    def _drain_pending(self, key: StateKey, force: bool = False):
+        pending = sorted(self.pending.pop(key, []), key=lambda p: p[0] - p[1])
+
+        for i, (value, count, update, users, chats, dispatch) in enumerate(pending):
+            local = self._get_local(key)
+
+            if local is not None and local + count > value:
+                continue
+
+            if local is not None and local + count < value and not force:
+                self.pending[key] = pending[i:]
+
+                if key not in self.gap_timers:
+                    self.gap_timers[key] = self.client.loop.call_later(
+                        self.HOLD_TIMEOUT, self._on_gap_timeout, key
+                    )
+                return
+
+            self._set_local(key, value)
+
+            if dispatch:
+                self._dispatch(update, users, chats)
+
+        timer = self.gap_timers.pop(key, None)
+
+        if timer is not None:
+            timer.cancel()
+
+    def _on_gap_timeout(self, key: StateKey):
+        self.gap_timers.pop(key, None)
+
+        if self.pending.get(key):
+            log.info("Gap for %s was not filled in time, fetching difference", key)
+            self._schedule_recovery(self._get_recovery_key(key))
+
+    def _schedule_recovery(self, key: StateKey):
+        if key in self.recovery_tasks:
+            return
+
+        task = self.client.loop.create_task(
+            self._recover_common() if key == COMMON else self._recover_channel(key)
+        )
+        self.recovery_tasks[key] = task
+        task.add_done_callback(lambda _: self._forget_recovery(key, task))
+
+    def _forget_recovery(self, key: StateKey, task: asyncio.Task):
+        # A newer recovery may already be running for the same key
+        if self.recovery_tasks.get(key) is task:
+            del self.recovery_tasks[key]
+
+    async def _recover_common(self):
+        try:
+            await self._get_difference()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Unable to fetch the difference, flushing held updates: %s", e)
+            force = True
+        else:
+            force = False
+        finally:
+            self.recovery_tasks.pop(COMMON, None)
+
+        if self.is_catching_up:
+            return
+
+        for key in (PTS, QTS):
+            timer = self.gap_timers.pop(key, None)
+
+            if timer is not None:
+                timer.cancel()
+
+            self._drain_pending(key, force=force)
+
+    async def _recover_channel(self, channel_id: int):
+        try:
+            async with self.channel_difference_semaphore:
+                await self._get_channel_difference(channel_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self._is_channel_lost(e):
+                log.info(
+                    "Channel %s is no longer accessible, dropping its state: %s", channel_id, e
+                )
+                await self._forget_channel(channel_id)
+            else:
+                log.warning(
+                    "Unable to fetch the difference of channel %s, flushing held updates: %s",
+                    channel_id,
+                    e,
+                )
+
+            force = True
+        else:
+            force = False
+        finally:
+            self.recovery_tasks.pop(channel_id, None)
+
+        if self.is_catching_up:
+            return
+
+        timer = self.gap_timers.pop(channel_id, None)
+
+        if timer is not None:
+            timer.cancel()
+
+        self._drain_pending(channel_id, force=force)
+
+    def _is_channel_lost(self, error: Exception) -> bool:
+        # Peers without a known access hash can't be resolved
+        if isinstance(error, KeyError):
+            return True
+
+        return isinstance(error, RPCError) and error.ID in self.LOST_CHANNEL_ERRORS
+
+    async def _forget_channel(self, channel_id: int):
+        self.channels.pop(channel_id, None)
+
+        if self.saved_channels.pop(channel_id, None) is None:
+            return
+
+        try:
+            await self.client.storage.update_state(channel_id)
+        except Exception as e:
+            log.warning("Unable to delete the update state of channel %s: %s", channel_id, e)
+
+    async def _get_difference(self):
+        while True:
+            diff = await self.client.invoke(
+                raw.functions.updates.GetDifference(pts=self.pts, date=self.date, qts=self.qts)
+            )
+
+            if isinstance(diff, raw.types.updates.DifferenceEmpty):
+                self.date = diff.date
+                self.seq = diff.seq
+                return
+
+            if isinstance(diff, raw.types.updates.DifferenceTooLong):
+                log.warning("Difference too long, updates up to pts %s are lost", diff.pts)
+                self.pts = diff.pts
+                continue
+
+            users = {u.id: u for u in diff.users}
+            chats = {c.id: c for c in diff.chats}
+
+            for message in diff.new_messages:
+                self._dispatch(
+                    raw.types.UpdateNewMessage(message=message, pts=0, pts_count=0), users, chats
+                )
+
+            for update in diff.other_updates:
+                if isinstance(update, (raw.types.UpdateChannelTooLong, *CHANNEL_PTS_UPDATES)):
+                    self.process_update(update, users, chats)
+                else:
+                    self._dispatch(update, users, chats)
+
+            if isinstance(diff, raw.types.updates.Difference):
+                self.set_state(diff.state)
+                return
+
+            self.set_state(diff.intermediate_state)
+
+    async def _get_channel_difference(self, channel_id: int):
+        pts = self.channels.get(channel_id)
+
+        if pts is None:
+            log.debug("No local state for channel %s, difference not fetched", channel_id)
+            return
+
+        peer = await self.client.resolve_peer(utils.get_channel_id(channel_id))
+        channel = raw.types.InputChannel(channel_id=peer.channel_id, access_hash=peer.access_hash)
+
+        limit = (
+            self.BOT_CHANNEL_DIFFERENCE_LIMIT
+            if self.client.me and self.client.me.is_bot
+            else self.CHANNEL_DIFFERENCE_LIMIT
+        )
+
+        while True:
+            diff = await self.client.invoke(
+                raw.functions.updates.GetChannelDifference(
+                    channel=channel,
+                    filter=raw.types.ChannelMessagesFilterEmpty(),
+                    pts=self.channels[channel_id],
+                    limit=limit,
+                    force=True,
+                )
+            )
+
+            if isinstance(diff, raw.types.updates.ChannelDifferenceEmpty):
+                self.channels[channel_id] = diff.pts
+                return
+
+            users = {u.id: u for u in diff.users}
+            chats = {c.id: c for c in diff.chats}
+
+            if isinstance(diff, raw.types.updates.ChannelDifferenceTooLong):
+                log.warning("Channel %s difference too long, some updates are lost", channel_id)
+                self.channels[channel_id] = diff.dialog.pts
+                messages = diff.messages
+                other_updates = []
+            else:
+                self.channels[channel_id] = diff.pts
+                messages = diff.new_messages
+                other_updates = diff.other_updates
+
+            for message in messages:
+                self._dispatch(
+                    raw.types.UpdateNewChannelMessage(message=message, pts=0, pts_count=0),
+                    users,
+                    chats,
+                )
+
+            for update in other_updates:
+                self._dispatch(update, users, chats)
+
+            if diff.final:
+                return
@@ -0,0 +1,66 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+
+from hydrogram.types import ListenerTypes
+
+
+class Client:
+    def __init__(self, workers: int = 4, sharded_updates: bool = False, lane_size: int = 1000):
+        self.no_updates = False
+        self.workers = workers
+        self.sharded_updates = sharded_updates
+        self.lane_size = lane_size
+        self.executor = None
+        self.listeners = {listener_type: [] for listener_type in ListenerTypes}
+        self.name = "test"
+        self.me = None
+        self.process_workers = 2
+        self.update_stream = None
+        self.sent = []
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    @staticmethod
+    def get_listener_matching_with_data(*_):
+        return None
+
+    async def send_message(self, chat_id: int, text: str):
+        await asyncio.sleep(0)
+        self.sent.append((chat_id, text))
+        return Message(text, chat=Peer(chat_id))
+
+
+class Peer:
+    def __init__(self, peer_id: int, username: str | None = None):
+        self.id = peer_id
+        self.username = username
+
+
+class Message:
+    def __init__(self, text: str, chat: Peer | None = None, from_user: Peer | None = None):
+        self.text = text
+        self.caption = None
+        self.chat = chat
+        self.from_user = from_user
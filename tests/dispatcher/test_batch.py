@@ -0,0 +1,96 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from hydrogram import filters, raw
+from hydrogram.dispatcher import Dispatcher
+from hydrogram.handlers import MessageBatchHandler, MessageHandler
+from tests.dispatcher import Client, Message, Peer
+
+
+def new_message() -> raw.types.UpdateNewMessage:
+    return raw.types.UpdateNewMessage(message=raw.types.MessageEmpty(id=1), pts=1, pts_count=1)
+
+
+async def start(handler: MessageBatchHandler, texts: list[str]) -> Dispatcher:
+    client = Client(workers=1)
+    client.dispatcher = dispatcher = Dispatcher(client)
+    messages = iter([Message(text, chat=Peer(1)) for text in texts])
+
+    dispatcher.update_parsers[raw.types.UpdateNewMessage] = lambda *_: (
+        next(messages),
+        MessageHandler,
+    )
+    dispatcher.add_handler(handler, 0)
+
+    await dispatcher.start()
+
+    for _ in texts:
+        dispatcher.updates_queue.put_nowait((new_message(), {}, {}))
+
+    await dispatcher.updates_queue.join()
+
+    return dispatcher
+
+
+@pytest.mark.asyncio
+async def test_size():
+    batches = []
+
+    async def callback(_, messages):
+        await asyncio.sleep(0)
+        batches.append([message.text for message in messages])
+
+    starts_with_a = filters.create(lambda _, __, m: m.text.startswith("a"))
+    handler = MessageBatchHandler(callback, starts_with_a, max_size=3, max_latency=60)
+    dispatcher = await start(handler, ["a1", "a2", "b", "a3", "a4", "a5", "a6", "a7"])
+
+    assert batches == [["a1", "a2", "a3"], ["a4", "a5", "a6"]]
+    assert handler.size_flushes == 2
+
+    await dispatcher.stop()
+
+    assert batches[-1] == ["a7"]
+    assert list(handler.flush_sizes) == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_latency():
+    batches = []
+
+    def callback(_, messages):
+        batches.append([message.text for message in messages])
+
+    handler = MessageBatchHandler(callback, max_size=10, max_latency=0.05)
+    dispatcher = await start(handler, ["a", "b"])
+
+    assert not batches
+
+    await asyncio.sleep(0.1)
+
+    assert batches == [["a", "b"]]
+    assert handler.latency_flushes == 1
+    assert handler.flush_latencies[0] >= 0.05
+
+    await dispatcher.stop()
+
+    assert len(batches) == 1
@@ -0,0 +1,82 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import multiprocessing
+import os
+
+import pytest
+
+from hydrogram.dispatcher import Dispatcher
+from hydrogram.handlers import MessageHandler
+from hydrogram.process_pool import check_not_importing_main, run_in_process
+from tests.dispatcher import Client, Message, Peer
+
+
+@run_in_process
+async def reply(client, message):
+    sent = await client.send_message(message.chat.id, f"{message.text} from {os.getpid()}")
+
+    if sent.chat.id != message.chat.id:
+        raise ValueError("Unexpected result")
+
+
+@run_in_process
+def fail(_, __):
+    raise ValueError("Failed in worker")
+
+
+@run_in_process
+async def unknown_method(client, _):
+    await client.no_such_method()
+
+
+@pytest.mark.asyncio
+async def test_run_in_process():
+    client = Client()
+    client.dispatcher = dispatcher = Dispatcher(client)
+
+    await dispatcher._execute_callback(MessageHandler(reply), Message("hi", chat=Peer(1)))
+
+    assert len(client.sent) == 1
+    chat_id, text = client.sent[0]
+    assert chat_id == 1
+    assert text.startswith("hi from ")
+    assert text != f"hi from {os.getpid()}"
+    assert dispatcher.process_pool.calls == 1
+
+    with pytest.raises(ValueError, match="Failed in worker"):
+        await dispatcher._execute_callback(MessageHandler(fail), Message("hi", chat=Peer(1)))
+
+    with pytest.raises(AttributeError):
+        await dispatcher._execute_callback(
+            MessageHandler(unknown_method), Message("hi", chat=Peer(1))
+        )
+
+    await dispatcher.process_pool.stop()
+    assert dispatcher.process_pool.executor is None
+
+
+def test_check_not_importing_main(monkeypatch):
+    check_not_importing_main()
+
+    # As while a spawned worker imports the main script
+    monkeypatch.setattr(multiprocessing.current_process(), "_inheriting", True, raising=False)
+
+    with pytest.raises(RuntimeError, match="__main__"):
+        check_not_importing_main()
@@ -0,0 +1,81 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from hydrogram import filters
+from hydrogram.handlers import CallbackQueryHandler, MessageHandler
+from hydrogram.routing import HandlerRouter
+from tests.dispatcher import Message, Peer
+
+
+async def callback(*_):
+    pass
+
+
+def build() -> tuple[HandlerRouter, list[MessageHandler]]:
+    handlers = [
+        MessageHandler(callback, filters.command(["start", "help"])),
+        MessageHandler(callback, filters.text & filters.chat([1, "@group"])),
+        MessageHandler(callback, filters.user("alice") & filters.private),
+        MessageHandler(callback, filters.command("settings", prefixes="!")),
+        MessageHandler(callback, filters.text),
+    ]
+    router = HandlerRouter()
+    router.build([handlers, [CallbackQueryHandler(callback, filters.user(1))]])
+
+    return router, handlers
+
+
+def candidates(router: HandlerRouter, message: Message, **kwargs) -> list[list[int]]:
+    return list(router.route(message, MessageHandler, **kwargs))
+
+
+def test_commands():
+    router, handlers = build()
+
+    assert candidates(router, Message("/start")) == [[handlers[0], handlers[4]], []]
+    assert candidates(router, Message("/HELP@bot args"))[0] == [handlers[0], handlers[4]]
+    assert candidates(router, Message("/helpbot"))[0] == [handlers[0], handlers[4]]
+    assert candidates(router, Message("!settings"))[0] == [handlers[3], handlers[4]]
+    assert candidates(router, Message("/settings"))[0] == [handlers[4]]
+
+
+def test_peers():
+    router, handlers = build()
+
+    assert candidates(router, Message("hi", chat=Peer(1)))[0] == [handlers[1], handlers[4]]
+    assert candidates(router, Message("hi", chat=Peer(2, "Group")))[0] == [
+        handlers[1],
+        handlers[4],
+    ]
+    assert candidates(router, Message("hi", chat=Peer(3), from_user=Peer(4, "Alice")))[0] == [
+        handlers[2],
+        handlers[4],
+    ]
+    assert candidates(router, Message("hi", chat=Peer(3)), prune=False)[0] == handlers
+
+
+def test_filter_changes():
+    router, handlers = build()
+    message = Message("hi", chat=Peer(5))
+
+    assert candidates(router, message)[0] == [handlers[4]]
+
+    handlers[1].filters.other.add(5)
+
+    assert candidates(router, message)[0] == [handlers[1], handlers[4]]
@@ -0,0 +1,92 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import random
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.dispatcher import Dispatcher
+from hydrogram.handlers import RawUpdateHandler
+from tests.dispatcher import Client
+
+
+def read_inbox(channel_id: int, max_id: int) -> raw.types.UpdateReadChannelInbox:
+    return raw.types.UpdateReadChannelInbox(
+        channel_id=channel_id, max_id=max_id, still_unread_count=0, pts=max_id
+    )
+
+
+async def dispatch(client: Client, updates: list) -> tuple[list, Dispatcher]:
+    dispatcher = Dispatcher(client)
+    handled = []
+
+    async def callback(_, update, __, ___):
+        await asyncio.sleep(random.random() / 1000)
+        handled.append((update.channel_id, update.max_id))
+
+    dispatcher.add_handler(RawUpdateHandler(callback), 0)
+
+    await dispatcher.start()
+
+    for update in updates:
+        dispatcher.updates_queue.put_nowait((update, {}, {}))
+
+    await dispatcher.updates_queue.join()
+    await dispatcher.stop()
+
+    return handled, dispatcher
+
+
+@pytest.mark.asyncio
+async def test_per_chat_order():
+    updates = [read_inbox(channel_id, i) for i in range(50) for channel_id in range(1, 9)]
+
+    handled, dispatcher = await dispatch(Client(sharded_updates=True, lane_size=4), updates)
+
+    assert len(handled) == len(updates)
+
+    for channel_id in range(1, 9):
+        assert [i for c, i in handled if c == channel_id] == list(range(50))
+
+    assert sum(dispatcher.lane_processed) == len(updates)
+    assert dispatcher.lane_imbalance == 1.0
+    assert max(dispatcher.lane_peak_sizes) <= 4
+
+
+@pytest.mark.asyncio
+async def test_imbalance():
+    updates = [read_inbox(1, i) for i in range(30)] + [read_inbox(2, i) for i in range(10)]
+
+    handled, dispatcher = await dispatch(Client(workers=2, sharded_updates=True), updates)
+
+    assert len(handled) == 40
+    assert dispatcher.lane_processed == [10, 30]
+    assert dispatcher.lane_imbalance == 1.5
+
+
+@pytest.mark.asyncio
+async def test_unsharded():
+    updates = [read_inbox(1, i) for i in range(20)]
+
+    handled, dispatcher = await dispatch(Client(), updates)
+
+    assert sorted(i for _, i in handled) == list(range(20))
+    assert not dispatcher.lanes
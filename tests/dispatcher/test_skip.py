@@ -0,0 +1,100 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from hydrogram import filters, raw
+from hydrogram.dispatcher import Dispatcher
+from hydrogram.handlers import CallbackQueryHandler, MessageHandler, RawUpdateHandler
+from hydrogram.types import ListenerTypes
+from tests.dispatcher import Client, Message, Peer
+
+
+async def callback(*_):
+    pass
+
+
+def new_message() -> raw.types.UpdateNewMessage:
+    return raw.types.UpdateNewMessage(message=raw.types.MessageEmpty(id=1), pts=1, pts_count=1)
+
+
+@pytest.mark.asyncio
+async def test_skip_unhandled():
+    client = Client()
+    dispatcher = Dispatcher(client)
+    dispatcher.add_handler(CallbackQueryHandler(callback), 0)
+
+    await dispatcher.start()
+    dispatcher.updates_queue.put_nowait((new_message(), {}, {}))
+    await dispatcher.updates_queue.join()
+
+    assert dispatcher.skipped_updates == 1
+
+    await dispatcher.stop()
+
+
+def test_index():
+    client = Client()
+    dispatcher = Dispatcher(client)
+    update = new_message()
+
+    assert not dispatcher._can_be_handled(update)
+
+    client.listeners[ListenerTypes.MESSAGE].append(object())
+    assert dispatcher._can_be_handled(update)
+    client.listeners[ListenerTypes.MESSAGE].clear()
+
+    handler = MessageHandler(callback)
+    dispatcher.add_handler(handler, 1)
+    assert dispatcher._can_be_handled(update)
+
+    dispatcher.remove_handler(handler, 1)
+    assert not dispatcher._can_be_handled(update)
+
+    dispatcher.add_handler(RawUpdateHandler(callback), 0)
+    assert dispatcher._can_be_handled(update)
+    assert dispatcher._can_be_handled(raw.types.UpdateConfig())
+
+
+@pytest.mark.asyncio
+async def test_filter_cache():
+    calls = []
+
+    def func(_, __, m):
+        calls.append(m)
+        return True
+
+    f = filters.create(func, deterministic=True)
+    client = Client()
+    dispatcher = Dispatcher(client)
+    dispatcher.add_handler(MessageHandler(callback, f & ~f), 0)
+    dispatcher.add_handler(MessageHandler(callback, f), 1)
+
+    message = Message("hi", chat=Peer(1), from_user=Peer(2))
+    dispatcher.update_parsers[raw.types.UpdateNewMessage] = lambda *_: (message, MessageHandler)
+
+    await dispatcher.start()
+    dispatcher.updates_queue.put_nowait((new_message(), {}, {}))
+    await dispatcher.updates_queue.join()
+
+    assert len(calls) == 1
+    assert (dispatcher.filter_cache_hits, dispatcher.filter_cache_misses) == (2, 3)
+    assert dispatcher.filter_cache_hit_rate == 0.4
+
+    await dispatcher.stop()
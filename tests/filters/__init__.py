@@ -19,10 +19,17 @@
 
 from __future__ import annotations
 
+import asyncio
+
 
 class Client:
     def __init__(self):
         self.me = User("username")
+        self.executor = None
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
 
     async def get_me(self):
         return self.me
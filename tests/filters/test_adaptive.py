@@ -0,0 +1,105 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from hydrogram import filters
+from tests.filters import Client, Message
+
+c = Client()
+
+
+def text_filter(text: str, **kwargs) -> filters.Filter:
+    def func(flt, _, m):
+        flt.calls += 1
+        return m.text == flt.text
+
+    return filters.create(func, "TextFilter", text=text, calls=0, **kwargs)
+
+
+def slow_filter() -> filters.Filter:
+    async def func(flt, _, __):
+        flt.calls += 1
+        await asyncio.sleep(0.001)
+        return True
+
+    return filters.create(func, "SlowFilter", calls=0)
+
+
+async def run(flt: filters.Filter, texts: list[str]) -> list[bool]:
+    return [bool(await flt(c, Message(text))) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_and():
+    slow, a = slow_filter(), text_filter("a")
+    f = filters.adaptive(slow & a)
+    f.REORDER_INTERVAL = 10
+
+    assert f.compile() is None
+    assert await run(f, ["a", "b"] * 5) == [True, False] * 5
+    assert f.order == [1, 0]
+
+    slow.calls = 0
+    assert await run(f, ["a", "b"] * 5) == [True, False] * 5
+    assert slow.calls == 5
+    assert f.stats[0].calls == 15
+
+
+@pytest.mark.asyncio
+async def test_or():
+    slow, a = slow_filter(), text_filter("a")
+    f = filters.adaptive(slow | a)
+    f.REORDER_INTERVAL = 10
+
+    assert await run(f, ["a", "b"] * 5) == [True] * 10
+    assert f.order == [1, 0]
+    assert f.stats[1].selectivity == 6 / 12
+
+
+@pytest.mark.asyncio
+async def test_not_reorderable():
+    slow, a, b = slow_filter(), text_filter("a"), text_filter("b")
+    command = text_filter("c", reorderable=False)
+    f = filters.adaptive(slow & command & a & slow & ~b)
+    f.REORDER_INTERVAL = 1
+
+    assert not f.reorderable
+    assert (~command).reorderable is False
+    assert await run(f, ["c", "c"]) == [False, False]
+    assert f.order[:2] == [0, 1]
+    assert sorted(f.order[2:]) == [2, 3, 4]
+
+
+def test_nested():
+    slow, a = slow_filter(), text_filter("a")
+    inner = slow | a
+    f = filters.adaptive(text_filter("b") & inner)
+
+    assert f.adaptive
+    assert inner.adaptive
+
+
+def test_compiled_by_default():
+    f = text_filter("a") & text_filter("b")
+
+    assert not f.adaptive
+    assert f.compile() is not None
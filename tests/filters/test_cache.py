@@ -0,0 +1,107 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from hydrogram import filters
+from tests.filters import Client, Message
+
+c = Client()
+
+
+def counting_filter(text: str, **kwargs) -> filters.Filter:
+    def func(flt, _, m):
+        flt.calls += 1
+        return m.text == flt.text
+
+    return filters.create(func, "CountingFilter", text=text, calls=0, **kwargs)
+
+
+def cached_message(text: str) -> Message:
+    message = Message(text)
+    message._filter_cache = filters.FilterCache()
+    return message
+
+
+@pytest.mark.asyncio
+async def test_memoized():
+    f = counting_filter("a", deterministic=True)
+    message = cached_message("a")
+
+    assert await filters.run_filter(f, c, message)
+    assert await filters.run_filter(f, c, message)
+    assert await filters.run_filter(f & f, c, message)
+    assert f.calls == 1
+    assert message._filter_cache.misses == 2
+    assert message._filter_cache.hits == 3
+
+
+@pytest.mark.asyncio
+async def test_not_deterministic():
+    f = counting_filter("a")
+    message = cached_message("a")
+
+    assert await filters.run_filter(f, c, message)
+    assert await filters.run_filter(f, c, message)
+    assert f.calls == 2
+    assert not message._filter_cache
+
+
+@pytest.mark.asyncio
+async def test_without_cache():
+    f = counting_filter("a", deterministic=True)
+    message = Message("a")
+
+    assert await filters.run_filter(f, c, message)
+    assert await filters.run_filter(f & f, c, message)
+    assert f.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_composite():
+    a, b = counting_filter("a", deterministic=True), counting_filter("b", deterministic=True)
+    shared = a | b
+    message = cached_message("b")
+
+    assert shared.deterministic
+    assert not (shared & counting_filter("b")).deterministic
+
+    assert await filters.run_filter(shared & filters.text, c, message)
+    assert not await filters.run_filter(~shared, c, message)
+    assert await filters.run_filter(filters.text & shared, c, message)
+    assert (a.calls, b.calls) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_async():
+    calls = []
+
+    async def func(_, __, m):
+        await asyncio.sleep(0)
+        calls.append(m)
+        return True
+
+    f = filters.create(func, deterministic=True)
+    message = cached_message("a")
+
+    assert await filters.run_filter(f & counting_filter("a"), c, message)
+    assert await filters.run_filter(f, c, message)
+    assert len(calls) == 1
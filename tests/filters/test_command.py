@@ -136,3 +136,22 @@ def test_no_text():
 
     m = Message()
     assert not f(c, m)
+
+
+def test_without_at_mention():
+    f = filters.command("start")
+
+    m = Message("/startusername a")
+    assert f(c, m)
+    assert m.command == ["start", "a"]
+
+
+def test_parsed_once():
+    start = filters.command("start")
+    help_ = filters.command(["help", "settings"])
+
+    m = Message("/help a")
+    assert not start(c, m)
+    assert help_(c, m)
+    assert m.command == ["help", "a"]
+    assert len(m._commands) == 1
@@ -0,0 +1,107 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import threading
+
+import pytest
+
+from hydrogram import enums, filters, types
+from tests.filters import Client, Message
+
+c = Client()
+
+
+def text_filter(text: str) -> filters.Filter:
+    return filters.create(lambda flt, _, m: m.text == flt.text, "TextFilter", text=text)
+
+
+def thread_filter(**kwargs) -> filters.Filter:
+    def func(flt, _, __):
+        flt.threads.append(threading.current_thread())
+        return True
+
+    return filters.create(func, "ThreadFilter", threads=[], **kwargs)
+
+
+def test_compile():
+    f = text_filter("a") | (~text_filter("b") & text_filter("c"))
+
+    assert f.compile() is not None
+    assert f.compile()(c, Message("a"))
+    assert f.compile()(c, Message("c"))
+    assert not f.compile()(c, Message("b"))
+
+
+def test_compile_user_and_chat():
+    f = text_filter("a") & filters.user([1, "@Alice"]) & filters.chat(-100)
+
+    message = Message("a")
+    message.from_user = types.User(id=2, username="alice")
+    message.chat = types.Chat(id=-100, type=enums.ChatType.SUPERGROUP)
+
+    assert f.compile() is not None
+    assert f.compile()(c, message)
+
+    message.chat = types.Chat(id=-200, type=enums.ChatType.SUPERGROUP)
+
+    assert not f.compile()(c, message)
+
+
+def test_flatten():
+    a, b, d = text_filter("a"), text_filter("b"), text_filter("d")
+
+    assert (a & b & d).flatten() == [a, b, d]
+    assert (a | (b | d)).flatten() == [a, b, d]
+    assert (a & (b | d)).flatten()[0] is a
+
+
+@pytest.mark.asyncio
+async def test_inline():
+    f = thread_filter() & ~text_filter("b")
+
+    assert await f(c, Message("a"))
+    assert not await f(c, Message("b"))
+    assert f.base.threads == [threading.current_thread()] * 2
+
+
+@pytest.mark.asyncio
+async def test_blocking():
+    blocking = thread_filter(blocking=True)
+    f = text_filter("a") & blocking
+
+    assert f.compile() is None
+    assert await f(c, Message("a"))
+    assert not await f(c, Message("b"))
+    assert len(blocking.threads) == 1
+    assert blocking.threads[0] is not threading.current_thread()
+
+
+@pytest.mark.asyncio
+async def test_async():
+    async def func(_, __, m):
+        await asyncio.sleep(0)
+        return m.text == "a"
+
+    f = filters.create(func) | text_filter("b")
+
+    assert f.compile() is None
+    assert await f(c, Message("a"))
+    assert await f(c, Message("b"))
+    assert not await f(c, Message("c"))
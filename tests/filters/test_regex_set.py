@@ -0,0 +1,121 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from hydrogram import filters, types
+from tests.filters import Client
+
+c = Client()
+
+
+def new_message(text: str | None = None, caption: str | None = None) -> types.Message:
+    return types.Message(id=1, text=text, caption=caption)
+
+
+def test_required_literals():
+    f = filters.regex_set([
+        "foo",
+        "fo+",
+        r"b(a)r|qux",
+        "(?i)BAZ",
+        re.compile("q", re.IGNORECASE),
+        r"(x)\1",
+        r"\d+",
+        "café",
+    ])
+
+    assert f.literals == {
+        "foo": [0],
+        "f": [1],
+        "b": [2],
+        "qux": [2],
+        "baz": [3],
+        "q": [4],
+        "x": [5],
+        "caf": [7],
+    }
+    assert f.unfiltered == [6]
+
+    m = new_message("foo bar BAZ Q xx 1")
+    assert f(c, m)
+    assert [match.group() for match in m.matches] == ["foo", "foo", "bar", "BAZ", "Q", "xx", "1"]
+
+
+def test_parser_failure(monkeypatch):
+    def fail(*_):
+        raise RuntimeError("Unsupported pattern")
+
+    monkeypatch.setattr(filters, "get_required_literals", fail)
+
+    f = filters.regex_set(["foo", "ba+r"])
+
+    # Every pattern is run instead
+    assert f.literals == {}
+    assert f.unfiltered == [0, 1]
+    assert f(c, new_message("a baar"))
+    assert not f(c, new_message("qux"))
+
+
+def test_shared_scan():
+    f = filters.regex_set(["a+", "ab", "c"])
+    m = new_message("aab")
+
+    assert f[1](c, m)
+    assert [match.group() for match in m.matches] == ["ab"]
+
+    assert f["a+"](c, m)
+    assert [match.group() for match in m.matches] == ["aa"]
+
+    assert not f[2](c, m)
+    assert m.matches is None
+
+    assert list(m._regex_sets) == [f]
+
+
+def test_same_as_regex():
+    patterns = [r"\d+", r"\w+@\w+", r"^hello", r"$", r"(?=a)", r"[aeiou]{2}"]
+    f = filters.regex_set(patterns)
+
+    for text in ("hello 123 foo@bar", "aa", "nothing here", "x", "HELLO K"):
+        expected = {
+            index: [match.span() for match in re.finditer(pattern, text)]
+            for index, pattern in enumerate(patterns)
+        }
+        found = {
+            index: [match.span() for match in matches] for index, matches in f.scan(text).items()
+        }
+
+        assert found == {index: spans for index, spans in expected.items() if spans}
+
+
+def test_caption():
+    f = filters.regex_set(["a"])
+
+    assert f(c, new_message(caption="a"))
+    assert not f(c, new_message())
+
+
+def test_unsupported_update():
+    with pytest.raises(ValueError):
+        filters.regex_set(["a"])(c, object())
@@ -0,0 +1,127 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import random
+
+import pytest
+
+from hydrogram.types import Identifier, Listener, ListenerIndex, ListenerTypes
+
+
+def new_listener(**kwargs) -> Listener:
+    return Listener(
+        listener_type=ListenerTypes.MESSAGE,
+        filters=None,
+        unallowed_click_alert=True,
+        identifier=Identifier(**kwargs),
+    )
+
+
+def test_most_specific():
+    index = ListenerIndex()
+    any_chat = new_listener()
+    chat = new_listener(chat_id=1)
+    chat_user = new_listener(chat_id=[1, "group"], from_user_id=2)
+    other_chat = new_listener(chat_id=3, from_user_id=2)
+
+    for listener in (any_chat, chat, chat_user, other_chat):
+        index.append(listener)
+
+    data = Identifier(chat_id=[1, "group"], from_user_id=[2, "alice"], message_id=5)
+
+    assert index.get_matching(data) == [any_chat, chat, chat_user]
+    assert index.get_most_specific(data) is chat_user
+    assert index.get_most_specific(Identifier(chat_id=["group"], from_user_id=3)) is any_chat
+    assert index.get_most_specific(Identifier(chat_id=1)) is chat
+
+
+def test_ties():
+    index = ListenerIndex()
+    first, second = new_listener(chat_id=1), new_listener(chat_id=[1, 2])
+
+    index.append(first)
+    index.append(second)
+
+    assert index.get_most_specific(Identifier(chat_id=1)) is first
+
+
+def test_remove():
+    index = ListenerIndex()
+    listener = new_listener(chat_id=1, message_id=[2, 3])
+
+    index.append(listener)
+    assert listener in index
+    assert len(index) == 1
+
+    index.remove(listener)
+    assert not index
+    assert index.get_most_specific(Identifier(chat_id=1, message_id=2)) is None
+    assert not index.values["chat_id"]
+    assert not index.values["message_id"]
+
+    with pytest.raises(ValueError):
+        index.remove(listener)
+
+
+def test_equal_listeners():
+    index = ListenerIndex()
+    a, b = new_listener(chat_id=1), new_listener(chat_id=1)
+
+    index.append(a)
+    index.append(b)
+    index.remove(b)
+
+    assert list(index) == [a]
+
+
+def test_same_as_scan():
+    rng = random.Random(0)
+    index = ListenerIndex()
+    listeners = []
+
+    def value(choices: list):
+        kind = rng.randrange(3)
+        return None if kind == 0 else rng.choice(choices) if kind == 1 else rng.sample(choices, 2)
+
+    for _ in range(300):
+        listener = new_listener(
+            chat_id=value([1, 2, 3, "a"]),
+            from_user_id=value([4, 5, "b"]),
+            message_id=value([6, 7, 8]),
+            inline_message_id=value(["x", "y"]),
+        )
+        listeners.append(listener)
+        index.append(listener)
+
+    for listener in listeners[::3]:
+        index.remove(listener)
+
+    del listeners[::3]
+
+    for _ in range(300):
+        data = Identifier(
+            chat_id=value([1, 2, 3, "a"]),
+            from_user_id=value([4, 5, "b"]),
+            message_id=value([6, 7, 8]),
+            inline_message_id=value(["x", "y"]),
+        )
+
+        assert index.get_matching(data) == [
+            listener for listener in listeners if listener.identifier.matches(data)
+        ]
@@ -0,0 +1,40 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+
+class Storage:
+    def __init__(self):
+        self.writes = []
+
+    async def update_peers(self, peers: list[tuple]):
+        self.writes.append(peers)
+
+    @staticmethod
+    async def get_peer_by_id(peer_id: int):
+        raise KeyError(f"ID not found: {peer_id}")
+
+    @staticmethod
+    async def get_peer_by_username(username: str):
+        raise KeyError(f"Username not found: {username}")
+
+    @staticmethod
+    async def get_peer_by_phone_number(phone_number: str):
+        raise KeyError(f"Phone number not found: {phone_number}")
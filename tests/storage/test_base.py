@@ -0,0 +1,79 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from hydrogram.storage import BaseStorage
+
+
+@pytest.mark.asyncio
+async def test_update_state_is_optional():
+    # Storage engines written before update state persistence keep working
+    assert "update_state" not in BaseStorage.__abstractmethods__
+
+    assert await BaseStorage.update_state(None) == []
+    assert await BaseStorage.update_state(None, [(0, 1, 2, 3, 4)]) is None
+    assert await BaseStorage.update_state(None) == []
+
+
+class FieldStorage(BaseStorage):
+    def __init__(self):
+        super().__init__("test")
+        self.fields = dict.fromkeys(BaseStorage.SESSION_FIELDS)
+
+
+def accessor(name: str):
+    async def method(self, value=object):  # noqa: RUF029
+        if value is object:
+            return self.fields[name]
+
+        self.fields[name] = value
+        return None
+
+    return method
+
+
+for field in BaseStorage.SESSION_FIELDS:
+    setattr(FieldStorage, field, accessor(field))
+
+# Only the session accessors are implemented, the other abstract methods aren't used
+FieldStorage.__abstractmethods__ = frozenset()
+
+
+class RecordStorage(FieldStorage):
+    async def dc_id(self, value=object):
+        return await self.session_field("dc_id", value)
+
+
+@pytest.mark.asyncio
+async def test_default_session_record_hooks():
+    storage = FieldStorage()
+    storage.fields["dc_id"] = 2
+
+    assert (await storage.read_session_record())["dc_id"] == 2
+
+    await storage.write_session_record({"dc_id": 4, "is_bot": True})
+
+    assert (storage.fields["dc_id"], storage.fields["is_bot"]) == (4, True)
+
+    # Nothing to write for storages not using session_field
+    await storage.flush_session_record()
+
+    with pytest.raises(NotImplementedError, match="read_session_record"):
+        await RecordStorage().dc_id()
@@ -0,0 +1,166 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.storage import LogStorage
+
+
+def user(peer_id: int, username: str | None = None) -> tuple:
+    return (peer_id, peer_id * 10, "user", username, None)
+
+
+async def reopen(tmp_path) -> LogStorage:
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_persistence(tmp_path):
+    storage = await reopen(tmp_path)
+
+    await storage.dc_id(4)
+    await storage.auth_key(b"k" * 256)
+    await storage.update_peers([user(1, "alice"), user(2)])
+    await storage.update_peers([user(1, "bob")])
+    await storage.update_state([(0, 1, 2, 3, 4), (5, 6, None, None, None)])
+    await storage.update_state(5)
+    await storage.close()
+
+    storage = await reopen(tmp_path)
+
+    assert (await storage.dc_id(), await storage.auth_key()) == (4, b"k" * 256)
+    assert await storage.get_peer_by_id(2) == raw.types.InputPeerUser(user_id=2, access_hash=20)
+    assert await storage.get_peer_by_username("bob") == raw.types.InputPeerUser(
+        user_id=1, access_hash=10
+    )
+    assert await storage.update_state() == [(0, 1, 2, 3, 4)]
+
+    with pytest.raises(KeyError):
+        await storage.get_peer_by_username("alice")
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_partial_record(tmp_path):
+    storage = await reopen(tmp_path)
+
+    await storage.update_peers([user(1)])
+    await storage.update_peers([user(2)])
+    await storage.close()
+
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(log_path.read_bytes()[:-3])
+
+    storage = await reopen(tmp_path)
+
+    assert await storage.get_peer_by_id(1)
+
+    with pytest.raises(KeyError):
+        await storage.get_peer_by_id(2)
+
+    # New records follow the last complete one
+    await storage.update_peers([user(3)])
+    await storage.close()
+
+    storage = await reopen(tmp_path)
+
+    assert sorted(storage.peers) == [1, 3]
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(LogStorage, "MIN_LOG_SIZE", 1000)
+
+    storage = await reopen(tmp_path)
+
+    for i in range(100):
+        await storage.update_peers([user(i % 10 + 1, f"user{i}")])
+
+    await storage.compaction_task
+
+    # Ten peers updated ten times each are compacted into a snapshot of ten peers
+    assert (tmp_path / "test.snapshot").is_file()
+    assert not (tmp_path / "test.log.1").exists()
+    assert storage.log_size < 1000
+
+    await storage.close()
+
+    storage = await reopen(tmp_path)
+
+    assert len(storage.peers) == 10
+    assert await storage.get_peer_by_username("user99") == raw.types.InputPeerUser(
+        user_id=10, access_hash=100
+    )
+
+    await storage.close()
+    await storage.delete()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_file_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(LogStorage, "MIN_LOG_SIZE", 0)
+
+    storage = await reopen(tmp_path)
+    await storage.update_peers([user(1)])
+    await storage.compaction_task
+    await storage.update_peers([user(2)])
+    await storage.close()
+
+    for name in ("test.snapshot", "test.log"):
+        assert (tmp_path / name).read_bytes().startswith(b"HGRMLS\x01\x00")
+
+    storage = await reopen(tmp_path)
+    assert sorted(storage.peers) == [1, 2]
+    await storage.close()
+
+    # Files of another format are refused instead of being misread
+    log_path = tmp_path / "test.log"
+    log_path.write_bytes(b"HGRMLS\x02\x00" + log_path.read_bytes()[8:])
+
+    with pytest.raises(ValueError, match="version 2"):
+        await reopen(tmp_path)
+
+    (tmp_path / "test.snapshot").write_bytes(b"\x00" * 100)
+
+    with pytest.raises(ValueError, match="not a session"):
+        await reopen(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_in_memory():
+    storage = LogStorage("test")
+    await storage.open()
+
+    await storage.is_bot(True)
+    await storage.update_peers([user(1)])
+
+    assert await storage.is_bot()
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    await storage.close()
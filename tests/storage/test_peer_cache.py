@@ -0,0 +1,72 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.storage import PeerCache
+from tests.storage import Storage
+
+USER = (1, 10, "user", "username", "123")
+CHANNEL = (-1000000000001, 20, "channel", None, None)
+
+
+@pytest.mark.asyncio
+async def test_write_behind():
+    storage = Storage()
+    cache = PeerCache(storage)
+
+    await cache.update_peers([USER, CHANNEL])
+    await cache.update_peers([USER])
+
+    assert storage.writes == []
+
+    await cache.flush()
+    await cache.update_peers([USER, CHANNEL])
+    await cache.flush()
+
+    assert storage.writes == [[USER, CHANNEL]]
+
+    await cache.update_peers([(1, 10, "user", "another", "123")])
+    await cache.flush()
+
+    assert storage.writes[-1] == [(1, 10, "user", "another", "123")]
+
+
+@pytest.mark.asyncio
+async def test_lookups():
+    cache = PeerCache(Storage())
+
+    await cache.update_peers([USER, CHANNEL])
+
+    assert await cache.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await cache.get_peer_by_username("username") == raw.types.InputPeerUser(
+        user_id=1, access_hash=10
+    )
+    assert await cache.get_peer_by_phone_number("123") == raw.types.InputPeerUser(
+        user_id=1, access_hash=10
+    )
+    assert await cache.get_peer_by_id(-1000000000001) == raw.types.InputPeerChannel(
+        channel_id=1, access_hash=20
+    )
+
+    await cache.update_peers([(1, 10, "user", None, "123")])
+
+    with pytest.raises(KeyError):
+        await cache.get_peer_by_username("username")
@@ -0,0 +1,100 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from hydrogram.storage import SQLiteStorage
+
+
+async def open_storage(tmp_path) -> tuple[SQLiteStorage, list[str]]:
+    storage = SQLiteStorage("test", tmp_path)
+    statements = []
+
+    await storage.open()
+    await storage.conn.set_trace_callback(statements.append)
+
+    return storage, statements
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached(tmp_path):
+    storage, statements = await open_storage(tmp_path)
+
+    for _ in range(10):
+        assert await storage.dc_id() == 2
+        assert await storage.auth_key() is None
+        assert await storage.test_mode() is None
+
+    assert statements == []
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_are_committed_together(tmp_path):
+    storage, statements = await open_storage(tmp_path)
+
+    await storage.dc_id(4)
+    await storage.auth_key(b"k" * 256)
+
+    assert await storage.dc_id() == 4
+    assert statements == []
+
+    await asyncio.sleep(0.1)
+
+    assert [s.split()[0] for s in statements] == ["BEGIN", "UPDATE", "COMMIT"]
+
+    await storage.user_id(1)
+    await storage.close()
+
+    storage, _ = await open_storage(tmp_path)
+
+    assert (await storage.dc_id(), await storage.auth_key(), await storage.user_id()) == (
+        4,
+        b"k" * 256,
+        1,
+    )
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_session_string():
+    storage = SQLiteStorage("test", use_memory=True)
+    await storage.open()
+
+    await storage.dc_id(4)
+    await storage.api_id(1)
+    await storage.test_mode(False)
+    await storage.auth_key(b"k" * 256)
+    await storage.user_id(1)
+    await storage.is_bot(True)
+
+    session_string = await storage.export_session_string()
+    await storage.close()
+
+    storage = SQLiteStorage("test", session_string=session_string, use_memory=True)
+    await storage.open()
+
+    assert await storage.export_session_string() == session_string
+    assert await storage.is_bot()
+
+    await storage.close()
@@ -0,0 +1,124 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.storage import SharedDatabase
+
+CHANNEL = -1000000000001
+
+
+async def count(database: SharedDatabase, table: str) -> int:
+    return (await database.fetchone(f"SELECT COUNT(*) FROM {table}", ()))[0]
+
+
+@pytest.mark.asyncio
+async def test_peers_are_shared(tmp_path):
+    database = SharedDatabase(tmp_path / "shared.db")
+    alice = database.storage("alice")
+    bob = database.storage("bob")
+
+    await alice.open()
+    await bob.open()
+
+    assert alice.database.conn is bob.database.conn
+
+    statements = []
+    await database.conn.set_trace_callback(statements.append)
+
+    await alice.update_peers([
+        (CHANNEL, 10, "channel", "news", None),
+        (1, 100, "user", None, "123"),
+    ])
+
+    # Peers and access hashes are committed together
+    assert statements.count("COMMIT") == 1
+
+    await database.conn.set_trace_callback(None)
+    await bob.update_peers([(CHANNEL, 20, "channel", "news", None), (1, 200, "user", None, None)])
+
+    assert await count(database, "peers") == 2
+    assert await count(database, "access_hashes") == 4
+
+    # Each session uses its own access hashes
+    assert await alice.get_peer_by_username("news") == raw.types.InputPeerChannel(
+        channel_id=1, access_hash=10
+    )
+    assert await bob.get_peer_by_id(CHANNEL) == raw.types.InputPeerChannel(
+        channel_id=1, access_hash=20
+    )
+
+    # The phone number known to alice isn't lost, but bob can only find peers it met
+    assert await alice.get_peer_by_phone_number("123") == raw.types.InputPeerUser(
+        user_id=1, access_hash=100
+    )
+    assert await bob.get_peer_by_phone_number("123") == raw.types.InputPeerUser(
+        user_id=1, access_hash=200
+    )
+
+    carol = database.storage("carol")
+    await carol.open()
+
+    with pytest.raises(KeyError):
+        await carol.get_peer_by_id(CHANNEL)
+
+    for storage in (alice, bob, carol):
+        await storage.close()
+
+    assert database.conn is None
+
+
+@pytest.mark.asyncio
+async def test_sessions(tmp_path):
+    database = SharedDatabase(tmp_path / "shared.db")
+    alice = database.storage("alice")
+    bob = database.storage("bob")
+
+    await alice.open()
+    await bob.open()
+
+    await alice.auth_key(b"a" * 256)
+    await alice.update_state([(0, 1, 2, 3, 4)])
+    await bob.dc_id(4)
+    await bob.update_state([(0, 5, 6, 7, 8)])
+
+    await alice.close()
+    await bob.close()
+
+    alice = database.storage("alice")
+    bob = database.storage("bob")
+
+    await alice.open()
+    await bob.open()
+
+    assert (await alice.dc_id(), await alice.auth_key()) == (2, b"a" * 256)
+    assert (await bob.dc_id(), await bob.auth_key()) == (4, None)
+    assert await alice.update_state() == [(0, 1, 2, 3, 4)]
+    assert await bob.update_state() == [(0, 5, 6, 7, 8)]
+
+    await bob.update_peers([(1, 200, "user", None, None)])
+    await bob.delete()
+
+    assert await count(database, "sessions") == 1
+    assert await count(database, "access_hashes") == 0
+    assert await count(database, "update_state") == 1
+
+    await alice.close()
+    await bob.close()
@@ -0,0 +1,221 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.storage import PeerCache, SQLiteStorage
+
+
+def user(peer_id: int) -> tuple:
+    return (peer_id, peer_id * 10, "user", f"user{peer_id}", str(peer_id))
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched(tmp_path):
+    storage = SQLiteStorage("test", tmp_path)
+    await storage.open()
+
+    statements = []
+    await storage.conn.set_trace_callback(statements.append)
+
+    await asyncio.gather(*(storage.update_peers([user(i)]) for i in range(1, 11)))
+
+    # Writes queued before the writer runs are committed together
+    assert statements.count("COMMIT") == 1
+
+    assert await storage.get_peer_by_id(10) == raw.types.InputPeerUser(user_id=10, access_hash=100)
+    assert await storage.get_peer_by_username("user3") == raw.types.InputPeerUser(
+        user_id=3, access_hash=30
+    )
+    assert await storage.get_peer_by_phone_number("5") == raw.types.InputPeerUser(
+        user_id=5, access_hash=50
+    )
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_readers(tmp_path):
+    storage = SQLiteStorage("test", tmp_path)
+    await storage.open()
+
+    assert len(storage.reader_connections) == SQLiteStorage.READERS
+
+    async with storage.reader() as conn:
+        assert conn is not storage.conn
+
+        with pytest.raises(Exception, match="readonly"):
+            await conn.execute("DELETE FROM peers")
+
+    # Lookups keep working while a batch of writes is committed
+    writes = asyncio.ensure_future(storage.update_peers([user(i) for i in range(1, 5001)]))
+    lookups = await asyncio.gather(
+        *(storage.get_peer_by_id(1) for _ in range(20)), return_exceptions=True
+    )
+    await writes
+
+    assert all(isinstance(r, (raw.types.InputPeerUser, KeyError)) for r in lookups)
+    assert await storage.get_peer_by_id(5000) == raw.types.InputPeerUser(
+        user_id=5000, access_hash=50000
+    )
+
+    await storage.close()
+
+    assert storage.reader_connections == []
+
+
+@pytest.mark.asyncio
+async def test_in_memory():
+    storage = SQLiteStorage("test", use_memory=True)
+    await storage.open()
+
+    assert storage.readers is None
+
+    await storage.update_peers([user(1)])
+
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    await storage.close()
+
+
+V4_SCHEMA = """
+CREATE TABLE sessions (dc_id INTEGER PRIMARY KEY, api_id INTEGER, test_mode INTEGER, auth_key BLOB,
+                       date INTEGER NOT NULL, user_id INTEGER, is_bot INTEGER);
+CREATE TABLE peers (id INTEGER PRIMARY KEY, access_hash INTEGER, type INTEGER NOT NULL, username TEXT,
+                    phone_number TEXT,
+                    last_update_on INTEGER NOT NULL DEFAULT (CAST(STRFTIME('%s', 'now') AS INTEGER)));
+CREATE TABLE update_state (id INTEGER PRIMARY KEY, pts INTEGER, qts INTEGER, date INTEGER, seq INTEGER);
+CREATE TABLE version (number INTEGER PRIMARY KEY);
+CREATE INDEX idx_peers_id ON peers (id);
+INSERT INTO version VALUES (4);
+INSERT INTO sessions VALUES (2, 1, 0, NULL, 0, 1, 0);
+INSERT INTO peers (id, access_hash, type) VALUES (1, 10, 'user');
+"""
+
+
+async def fetch_all(storage: SQLiteStorage, query: str) -> list[tuple]:
+    q = await storage.conn.execute(query)
+    rows = await q.fetchall()
+    await q.close()
+    return rows
+
+
+@pytest.mark.asyncio
+async def test_migration(tmp_path):
+    with sqlite3.connect(tmp_path / "test.session") as conn:
+        conn.executescript(V4_SCHEMA)
+
+    storage = SQLiteStorage("test", tmp_path)
+    await storage.open()
+
+    indexes = {row[0] for row in await fetch_all(storage, "SELECT name FROM sqlite_master")}
+
+    assert await storage.version() == SQLiteStorage.VERSION
+    assert await fetch_all(storage, "PRAGMA auto_vacuum") == [(2,)]
+    assert "idx_peers_id" not in indexes
+    assert "idx_peers_last_update_on" in indexes
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_prune_peers(tmp_path, monkeypatch):
+    storage = SQLiteStorage("test", tmp_path)
+    await storage.open()
+
+    now = int(time.time())
+
+    # Peer i was last seen i minutes ago
+    await storage.write(
+        "REPLACE INTO peers (id, access_hash, type, last_update_on) VALUES (?, ?, ?, ?)",
+        [(i, i, "user", now - i * 60) for i in range(1, 101)],
+    )
+
+    monkeypatch.setattr(storage, "PRUNE_BATCH_SIZE", 7)
+    monkeypatch.setattr(storage, "PEER_TTL", 90 * 60 + 30)
+
+    # Peers 91 to 100 haven't been seen for too long
+    assert await storage.prune_peers() == 10
+
+    monkeypatch.setattr(storage, "MAX_PEERS", 50)
+
+    # Then the 40 least recently seen ones exceed the cap
+    assert await storage.prune_peers() == 40
+    assert await fetch_all(storage, "SELECT MIN(id), MAX(id) FROM peers") == [(1, 50)]
+    assert await storage.prune_peers() == 0
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_seen_peers_are_not_pruned(tmp_path, monkeypatch):
+    storage = SQLiteStorage("test", tmp_path)
+    await storage.open()
+
+    cache = PeerCache(storage)
+    peers = [(1, 10, "user", None, None), (2, 20, "user", None, None)]
+
+    await cache.update_peers(peers)
+    await cache.flush()
+
+    # Both peers were written two hours ago and never changed since
+    two_hours_ago = int(time.time()) - 2 * 60 * 60
+
+    await storage.write(
+        "REPLACE INTO peers (id, access_hash, type, last_update_on) VALUES (?, ?, ?, ?)",
+        [(peer[0], peer[1], peer[2], two_hours_ago) for peer in peers],
+    )
+    cache.written_on = dict.fromkeys(cache.written_on, two_hours_ago)
+
+    # Peer 1 is seen again without changes
+    await cache.update_peers(peers[:1])
+    await cache.flush()
+
+    monkeypatch.setattr(storage, "PEER_TTL", 60 * 60)
+
+    assert await storage.prune_peers() == 1
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    with pytest.raises(KeyError):
+        await storage.get_peer_by_id(2)
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_incremental_vacuum(tmp_path):
+    storage = SQLiteStorage("test", tmp_path)
+    await storage.open()
+
+    await storage.update_peers([user(i) for i in range(1, 20001)])
+    await storage.write("DELETE FROM peers", [()])
+
+    assert (await fetch_all(storage, "PRAGMA freelist_count"))[0][0] > 0
+
+    await storage.incremental_vacuum()
+
+    assert await fetch_all(storage, "PRAGMA freelist_count") == [(0,)]
+
+    await storage.close()
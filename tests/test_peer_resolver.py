@@ -0,0 +1,234 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import traceback
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.errors import ChannelInvalid, FloodWait, PeerIdInvalid, UsernameNotOccupied
+from hydrogram.updates.replay import ReplayClient
+
+ALICE = raw.types.User(id=1, access_hash=10, username="alice")
+
+
+async def resolve_alice(_):
+    await asyncio.sleep(0.01)
+
+    return raw.types.contacts.ResolvedPeer(
+        peer=raw.types.PeerUser(user_id=1), chats=[], users=[ALICE]
+    )
+
+
+async def start(responses: dict) -> ReplayClient:
+    client = ReplayClient(responses=responses)
+    await client.start()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_coalescing():
+    client = await start({raw.functions.contacts.ResolveUsername: resolve_alice})
+
+    peers = await asyncio.gather(*(client.resolve_peer("@Alice") for _ in range(10)))
+
+    assert peers == [raw.types.InputPeerUser(user_id=1, access_hash=10)] * 10
+    assert client.invocations[raw.functions.contacts.ResolveUsername] == 1
+    assert (client.peer_resolver.misses, client.peer_resolver.coalesced) == (1, 9)
+
+    # Known from now on
+    await client.resolve_peer("alice")
+
+    assert client.peer_resolver.misses == 1
+    assert not client.peer_resolver.pending
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader():
+    async def resolve_alice_slowly(query):
+        await asyncio.sleep(0.1)
+        return await resolve_alice(query)
+
+    client = await start({raw.functions.contacts.ResolveUsername: resolve_alice_slowly})
+
+    leader = asyncio.ensure_future(asyncio.wait_for(client.resolve_peer("alice"), 0.05))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(client.resolve_peer("alice"))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await leader
+
+    # The request goes on for the other callers
+    assert await waiter == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert client.invocations[raw.functions.contacts.ResolveUsername] == 1
+    assert not client.peer_resolver.pending
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_negative_cache(monkeypatch):
+    def not_occupied(_):
+        raise UsernameNotOccupied
+
+    client = await start({raw.functions.contacts.ResolveUsername: not_occupied})
+
+    errors = []
+
+    for _ in range(3):
+        with pytest.raises(UsernameNotOccupied) as e:
+            await client.resolve_peer("nobody")
+
+        errors.append(e.value)
+
+    assert client.invocations[raw.functions.contacts.ResolveUsername] == 1
+    assert client.peer_resolver.hits == 2
+
+    # Remembered errors are raised as new instances, their tracebacks don't pile up
+    assert errors[1] is not errors[2]
+    assert str(errors[1]) == str(errors[0])
+    assert len(traceback.extract_tb(errors[2].__traceback__)) == len(
+        traceback.extract_tb(errors[1].__traceback__)
+    )
+
+    monkeypatch.setattr(client.peer_resolver, "NEGATIVE_TTL", 0)
+    client.peer_resolver.failures.clear()
+
+    for _ in range(2):
+        with pytest.raises(UsernameNotOccupied):
+            await client.resolve_peer("nobody")
+
+    assert client.invocations[raw.functions.contacts.ResolveUsername] == 3
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_unknown_id():
+    client = await start({raw.functions.users.GetUsers: lambda _: []})
+
+    for _ in range(2):
+        with pytest.raises(PeerIdInvalid):
+            await client.resolve_peer(1)
+
+    assert client.invocations[raw.functions.users.GetUsers] == 1
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_temporary_errors():
+    def flood_wait(_):
+        raise FloodWait(value=10)
+
+    client = await start({raw.functions.contacts.ResolveUsername: flood_wait})
+
+    for _ in range(2):
+        with pytest.raises(FloodWait):
+            await client.resolve_peer("alice")
+
+    assert client.invocations[raw.functions.contacts.ResolveUsername] == 2
+    assert client.peer_resolver.failures == {}
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_batching():
+    def get_users(query):
+        return [
+            raw.types.User(id=user.user_id, access_hash=user.user_id * 10)
+            for user in query.id
+            if user.user_id <= 250
+        ]
+
+    client = await start({raw.functions.users.GetUsers: get_users})
+
+    peers = await client.resolve_peers(list(range(1, 251)))
+
+    assert peers[249] == raw.types.InputPeerUser(user_id=250, access_hash=2500)
+    assert client.invocations[raw.functions.users.GetUsers] == 3
+    assert client.peer_resolver.requests == 3
+
+    results = await asyncio.gather(
+        client.resolve_peer(1), client.resolve_peer(251), return_exceptions=True
+    )
+
+    assert results[0] == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert isinstance(results[1], PeerIdInvalid)
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_fallback():
+    def get_channels(query):
+        if any(channel.channel_id > 2 for channel in query.id):
+            raise ChannelInvalid
+
+        return raw.types.messages.Chats(
+            chats=[
+                raw.types.Channel(
+                    id=channel.channel_id,
+                    access_hash=channel.channel_id * 10,
+                    title="Channel",
+                    photo=raw.types.ChatPhotoEmpty(),
+                    date=0,
+                )
+                for channel in query.id
+            ]
+        )
+
+    client = await start({raw.functions.channels.GetChannels: get_channels})
+
+    results = await asyncio.gather(
+        *(client.resolve_peer(-1000000000000 - i) for i in (1, 2, 3)), return_exceptions=True
+    )
+
+    assert results[:2] == [
+        raw.types.InputPeerChannel(channel_id=1, access_hash=10),
+        raw.types.InputPeerChannel(channel_id=2, access_hash=20),
+    ]
+    assert isinstance(results[2], ChannelInvalid)
+
+    # The failed batch, then each channel alone
+    assert client.invocations[raw.functions.channels.GetChannels] == 4
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_flood_wait():
+    def flood_wait(_):
+        raise FloodWait(value=10)
+
+    client = await start({raw.functions.users.GetUsers: flood_wait})
+
+    results = await asyncio.gather(
+        *(client.resolve_peer(i) for i in range(1, 101)), return_exceptions=True
+    )
+
+    # Not asked again for each user, which would make the flood worse
+    assert all(isinstance(result, FloodWait) for result in results)
+    assert client.invocations[raw.functions.users.GetUsers] == 1
+
+    await client.stop()
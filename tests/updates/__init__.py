@@ -0,0 +1,76 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+from hydrogram import raw
+
+
+class Dispatcher:
+    def __init__(self):
+        self.updates_queue = asyncio.Queue()
+
+
+class Storage:
+    def __init__(self):
+        self.state = []
+
+    async def update_state(self, value=object):
+        if value is object:
+            return self.state
+
+        if isinstance(value, int):
+            self.state = [state for state in self.state if state[0] != value]
+        else:
+            self.state = value
+
+        return None
+
+    @staticmethod
+    async def user_id():
+        await asyncio.sleep(0)
+        return 1
+
+
+class Client:
+    def __init__(self):
+        self.dispatcher = Dispatcher()
+        self.storage = Storage()
+        self.me = None
+        self.requests = []
+        self.responses = []
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    async def invoke(self, query):
+        self.requests.append(query)
+        await asyncio.sleep(0)
+        response = self.responses.pop(0)
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    @staticmethod
+    async def resolve_peer(peer_id):
+        await asyncio.sleep(0)
+        return raw.types.InputPeerChannel(channel_id=-1000000000000 - peer_id, access_hash=1)
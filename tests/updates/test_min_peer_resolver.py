@@ -0,0 +1,72 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.updates import MinPeerResolver
+from tests.updates import Client
+
+
+def messages(user_id: int) -> raw.types.messages.ChannelMessages:
+    return raw.types.messages.ChannelMessages(
+        pts=1,
+        count=1,
+        messages=[],
+        topics=[],
+        chats=[],
+        users=[raw.types.User(id=user_id, access_hash=user_id)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_batched():
+    client = Client()
+    client.responses = [messages(1)]
+    resolver = MinPeerResolver(client)
+
+    results = await asyncio.gather(
+        resolver.resolve(1, [10, 11]),
+        resolver.resolve(1, [12]),
+    )
+
+    assert len(client.requests) == 1
+    assert [m.id for m in client.requests[0].id] == [10, 11, 12]
+    assert results[0] == results[1]
+    assert list(results[0][0]) == [1]
+    assert resolver.requests == 1
+    assert resolver.resolved_messages == 3
+
+
+@pytest.mark.asyncio
+async def test_chunks_and_errors():
+    client = Client()
+    client.responses = [messages(1), messages(2)]
+    resolver = MinPeerResolver(client)
+    resolver.MAX_MESSAGE_IDS = 2
+
+    users, _ = await resolver.resolve(1, [1, 2, 3])
+
+    assert len(client.requests) == 2
+    assert set(users) == {1, 2}
+
+    # No response left: the error is swallowed and empty maps are returned
+    assert await resolver.resolve(1, [4]) == ({}, {})
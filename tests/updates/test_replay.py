@@ -0,0 +1,160 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.handlers import MessageHandler
+from hydrogram.updates import UpdateRecorder, read_records
+from hydrogram.updates.replay import ReplayClient, UpdateReplayer
+
+
+def new_updates(message_id: int) -> raw.types.Updates:
+    return raw.types.Updates(
+        updates=[
+            raw.types.UpdateNewMessage(
+                message=raw.types.Message(
+                    id=message_id,
+                    peer_id=raw.types.PeerUser(user_id=1),
+                    from_id=raw.types.PeerUser(user_id=1),
+                    date=0,
+                    message="hi",
+                ),
+                pts=message_id,
+                pts_count=1,
+            )
+        ],
+        users=[raw.types.User(id=1, access_hash=2, first_name="Alice")],
+        chats=[],
+        date=0,
+        seq=0,
+    )
+
+
+def record(path, count: int) -> UpdateRecorder:
+    recorder = UpdateRecorder(str(path))
+
+    for i in range(count):
+        recorder.record(new_updates(i + 1))
+
+    recorder.close()
+
+    return recorder
+
+
+def test_records(tmp_path):
+    path = tmp_path / "updates.bin"
+
+    record(path, 2)
+    record(path, 1)
+
+    records = list(read_records(str(path)))
+
+    assert [r[1].updates[0].message.id for r in records] == [1, 2, 1]
+    assert all(abs(r[0] - time.time()) < 60 for r in records)
+
+    # A record cut short by a crash is ignored
+    path.write_bytes(path.read_bytes()[:-3])
+
+    assert len(list(read_records(str(path)))) == 2
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "updates.bin"
+    path.write_bytes(b"nope")
+
+    with pytest.raises(ValueError, match="not an update recording"):
+        list(read_records(str(path)))
+
+
+@pytest.mark.asyncio
+async def test_replay(tmp_path):
+    path = tmp_path / "updates.bin"
+    record(path, 50)
+
+    client = ReplayClient(workers=4)
+    texts = []
+
+    async def on_message(_, message):
+        await asyncio.sleep(0)
+        texts.append(message.text)
+
+    client.add_handler(MessageHandler(on_message))
+
+    await client.start()
+
+    replayer = UpdateReplayer(client, str(path))
+    await replayer.replay(speed=None)
+
+    assert replayer.updates == 50
+    assert replayer.skipped == 0
+    assert replayer.throughput > 0
+    assert texts == ["hi"] * 50
+    assert (await client.resolve_peer(1)).access_hash == 2
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_replay_pacing(tmp_path):
+    path = tmp_path / "updates.bin"
+    recorder = UpdateRecorder(str(path))
+
+    recorder.record(new_updates(1))
+    time.sleep(0.2)
+    recorder.record(new_updates(2))
+    recorder.close()
+
+    client = ReplayClient()
+    await client.start()
+
+    replayer = UpdateReplayer(client, str(path))
+
+    await replayer.replay(speed=2)
+    assert 0.1 <= replayer.elapsed < 0.2
+
+    await replayer.replay(speed=None)
+    assert replayer.elapsed < 0.1
+
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_canned_responses():
+    state = raw.types.updates.State(pts=1, qts=0, date=0, seq=0, unread_count=0)
+
+    client = ReplayClient(
+        responses={
+            raw.functions.updates.GetState: state,
+            raw.functions.help.GetAppConfig: lambda query: raw.types.help.AppConfig(
+                hash=query.hash, config=raw.types.JsonNull()
+            ),
+        }
+    )
+
+    assert await client.invoke(raw.functions.updates.GetState()) is state
+    assert await client.invoke(raw.functions.updates.GetState()) is state
+    assert (await client.invoke(raw.functions.help.GetAppConfig(hash=7))).hash == 7
+    assert client.invocations[raw.functions.updates.GetState] == 2
+
+    with pytest.raises(NotImplementedError, match="GetDifference"):
+        await client.invoke(raw.functions.updates.GetDifference(pts=1, date=0, qts=0))
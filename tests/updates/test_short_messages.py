@@ -0,0 +1,84 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.storage import PeerCache
+from hydrogram.updates import ShortMessageBuilder
+from tests.updates import Client
+
+
+def user(user_id: int) -> raw.types.User:
+    return raw.types.User(id=user_id, access_hash=user_id, first_name=str(user_id))
+
+
+def short_message(**kwargs) -> raw.types.UpdateShortMessage:
+    return raw.types.UpdateShortMessage(
+        id=5, user_id=2, message="hi", pts=10, pts_count=1, date=0, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_private_message():
+    client = Client()
+    client.peer_cache = PeerCache(client.storage)
+    client.peer_cache.update_raw_peers({1: user(1), 2: user(2)})
+    builder = ShortMessageBuilder(client)
+
+    update, users, chats = await builder.build(short_message())
+
+    assert update.pts == 10
+    assert update.message.id == 5
+    assert update.message.from_id.user_id == 2
+    assert update.message.peer_id.user_id == 2
+    assert set(users) == {2}
+    assert not chats
+
+    update, users, _ = await builder.build(short_message(out=True))
+
+    assert update.message.out
+    assert update.message.from_id.user_id == 1
+    assert set(users) == {1, 2}
+    assert builder.built == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_message():
+    client = Client()
+    client.peer_cache = PeerCache(client.storage)
+    client.peer_cache.update_raw_peers({
+        2: user(2),
+        -3: raw.types.Chat(id=3, title="", photo=None, participants_count=0, date=0, version=0),
+    })
+    builder = ShortMessageBuilder(client)
+
+    update, users, chats = await builder.build(
+        raw.types.UpdateShortChatMessage(
+            id=5, from_id=2, chat_id=3, message="hi", pts=10, pts_count=1, date=0
+        )
+    )
+
+    assert update.message.peer_id.chat_id == 3
+    assert set(users) == {2}
+    assert set(chats) == {3}
+
+    # The bot the message was sent via is unknown
+    assert await builder.build(short_message(via_bot_id=4)) is None
+    assert builder.fallbacks == 1
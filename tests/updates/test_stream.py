@@ -0,0 +1,146 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import types
+
+import pytest
+
+from hydrogram import raw
+from hydrogram.updates import UpdateConsumer, UpdatePublisher
+from hydrogram.updates.stream import Subscriber, decode_packet, encode_packet
+
+
+def new_update(message_id: int) -> raw.types.UpdateNewMessage:
+    return raw.types.UpdateNewMessage(
+        message=raw.types.Message(
+            id=message_id,
+            peer_id=raw.types.PeerUser(user_id=1),
+            date=0,
+            message="hi",
+        ),
+        pts=message_id,
+        pts_count=1,
+    )
+
+
+def test_frames():
+    users = {1: raw.types.User(id=1, first_name="Alice")}
+    chats = {2: raw.types.Channel(id=2, title="News", photo=raw.types.ChatPhotoEmpty(), date=0)}
+
+    frame = encode_packet(new_update(1), users, chats)
+    update, decoded_users, decoded_chats = decode_packet(frame[4:])
+
+    assert int.from_bytes(frame[:4], "little") == len(frame) - 4
+    assert isinstance(update, raw.types.UpdateNewMessage)
+    assert (update.message.id, update.message.message, update.pts) == (1, "hi", 1)
+    assert decoded_users[1].first_name == "Alice"
+    assert decoded_chats[2].title == "News"
+
+
+async def connect(path: str, group: str) -> UpdateConsumer:
+    consumer = UpdateConsumer(path, group)
+    await consumer.connect()
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_groups(tmp_path):
+    path = str(tmp_path / "updates.sock")
+    publisher = UpdatePublisher(path)
+    await publisher.start()
+
+    await publisher.publish(new_update(0), {}, {})
+    assert publisher.dropped == 1
+
+    workers = [await connect(path, "workers") for _ in range(2)]
+    logger = await connect(path, "logger")
+
+    while len(publisher.groups) < 2 or len(publisher.groups["workers"]) < 2:
+        await asyncio.sleep(0.01)
+
+    for message_id in range(1, 5):
+        await publisher.publish(new_update(message_id), {}, {})
+
+    logged = [(await logger.read())[0].message.id for _ in range(4)]
+    assert logged == [1, 2, 3, 4]
+
+    sent = [subscriber.sent for subscriber in publisher.groups["workers"]]
+    assert sum(sent) == 4
+
+    received = []
+
+    for consumer, count in zip(workers, sent):
+        received.extend([(await consumer.read())[0].message.id for _ in range(count)])
+
+    assert sorted(received) == [1, 2, 3, 4]
+
+    await publisher.stop()
+
+    assert await logger.read() is None
+
+    for consumer in [*workers, logger]:
+        await consumer.close()
+
+
+@pytest.mark.asyncio
+async def test_full_consumer_disconnects(tmp_path, monkeypatch):
+    async def stalled(_):
+        await asyncio.Event().wait()
+
+    # Frames are never sent, the window stays full
+    monkeypatch.setattr(Subscriber, "send_frames", stalled)
+
+    path = str(tmp_path / "updates.sock")
+    publisher = UpdatePublisher(path, window=1)
+    await publisher.start()
+
+    consumer = await connect(path, "workers")
+
+    while not publisher.groups:
+        await asyncio.sleep(0.01)
+
+    await publisher.publish(new_update(1), {}, {})
+    publishing = asyncio.ensure_future(publisher.publish(new_update(2), {}, {}))
+
+    await asyncio.sleep(0.05)
+    assert not publishing.done()
+
+    await consumer.close()
+
+    # The frame is dropped instead of waiting forever
+    await asyncio.wait_for(publishing, 1)
+    assert publisher.groups == {}
+
+    await publisher.stop()
+
+
+@pytest.mark.asyncio
+async def test_parse():
+    async def parser(update, users, chats):
+        await asyncio.sleep(0)
+        return f"message {update.message.id}", None
+
+    client = types.SimpleNamespace(
+        dispatcher=types.SimpleNamespace(update_parsers={raw.types.UpdateNewMessage: parser})
+    )
+    consumer = UpdateConsumer("unused", client=client)
+
+    assert await consumer.parse(new_update(3), {}, {}) == "message 3"
+    assert await consumer.parse(raw.types.UpdateConfig(), {}, {}) is None
@@ -0,0 +1,277 @@
+#  Hydrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-2023 Dan <https://github.com/delivrance>
+#  Copyright (C) 2023-present Hydrogram <https://hydrogram.org>
+#
+#  This file is part of Hydrogram.
+#
+#  Hydrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Hydrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Hydrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from hydrogram import errors, raw
+from hydrogram.updates import UpdatesManager
+from hydrogram.updates.updates_manager import COMMON
+from tests.updates import Client
+
+
+def new_message(pts: int, pts_count: int = 1) -> raw.types.UpdateNewMessage:
+    return raw.types.UpdateNewMessage(
+        message=raw.types.MessageEmpty(id=pts), pts=pts, pts_count=pts_count
+    )
+
+
+def new_channel_message(
+    channel_id: int, pts: int, pts_count: int = 1
+) -> raw.types.UpdateNewChannelMessage:
+    return raw.types.UpdateNewChannelMessage(
+        message=raw.types.MessageEmpty(
+            id=pts, peer_id=raw.types.PeerChannel(channel_id=channel_id)
+        ),
+        pts=pts,
+        pts_count=pts_count,
+    )
+
+
+def dispatched(client: Client) -> list:
+    result = []
+
+    while not client.dispatcher.updates_queue.empty():
+        result.append(client.dispatcher.updates_queue.get_nowait()[0])
+
+    return result
+
+
+def test_in_order():
+    client = Client()
+    manager = UpdatesManager(client)
+    manager.pts = 10
+
+    manager.process_update(new_message(11), {}, {})
+    manager.process_update(new_message(13, 2), {}, {})
+
+    assert [u.pts for u in dispatched(client)] == [11, 13]
+    assert manager.pts == 13
+
+
+def test_duplicate():
+    client = Client()
+    manager = UpdatesManager(client)
+    manager.pts = 10
+
+    manager.process_update(new_message(11), {}, {})
+    manager.process_update(new_message(11), {}, {})
+    manager.process_update(new_message(9), {}, {})
+
+    assert [u.pts for u in dispatched(client)] == [11]
+
+
+@pytest.mark.asyncio
+async def test_gap_filled():
+    client = Client()
+    manager = UpdatesManager(client)
+    manager.pts = 10
+
+    manager.process_update(new_message(12), {}, {})
+    manager.process_update(new_message(13), {}, {})
+
+    assert dispatched(client) == []
+
+    manager.process_update(new_message(11), {}, {})
+
+    assert [u.pts for u in dispatched(client)] == [11, 12, 13]
+    assert not manager.gap_timers
+
+    await asyncio.sleep(manager.HOLD_TIMEOUT)
+
+    assert client.requests == []
+
+
+@pytest.mark.asyncio
+async def test_gap_recovered():
+    client = Client()
+    client.responses.append(
+        raw.types.updates.Difference(
+            new_messages=[raw.types.MessageEmpty(id=11)],
+            new_encrypted_messages=[],
+            other_updates=[],
+            chats=[],
+            users=[],
+            state=raw.types.updates.State(pts=12, qts=0, date=0, seq=0, unread_count=0),
+        )
+    )
+
+    manager = UpdatesManager(client)
+    manager.HOLD_TIMEOUT = 0
+    manager.pts = 10
+
+    manager.process_update(new_message(12), {}, {})
+    await asyncio.sleep(0.01)
+
+    updates = dispatched(client)
+
+    assert isinstance(client.requests[0], raw.functions.updates.GetDifference)
+    assert [u.message.id for u in updates] == [11]
+    assert manager.pts == 12
+
+
+@pytest.mark.asyncio
+async def test_recovery_rescheduled():
+    client = Client()
+    client.responses.extend([
+        raw.types.updates.Difference(
+            new_messages=[],
+            new_encrypted_messages=[],
+            other_updates=[],
+            chats=[],
+            users=[],
+            state=raw.types.updates.State(pts=11, qts=0, date=0, seq=0, unread_count=0),
+        ),
+        raw.types.updates.DifferenceEmpty(date=0, seq=0),
+    ])
+
+    manager = UpdatesManager(client)
+    manager.HOLD_TIMEOUT = 0
+    manager.pts = 10
+
+    async def worker():
+        # Woken by the update the first recovery drains, before that recovery is done
+        await client.dispatcher.updates_queue.get()
+        manager.recover()
+        return manager.recovery_tasks[COMMON]
+
+    rescheduled = asyncio.ensure_future(worker())
+    manager.process_update(new_message(12), {}, {})
+
+    second = await rescheduled
+
+    # The first recovery is done, but must not forget the second one
+    assert manager.recovery_tasks.get(COMMON) is second
+
+    await second
+
+    assert manager.recovery_tasks == {}
+    assert len(client.requests) == 2
+
+    client = Client()
+    manager = UpdatesManager(client)
+
+    manager.process_update(new_channel_message(1, 5), {}, {})
+    manager.process_update(new_channel_message(2, 100), {}, {})
+    manager.process_update(new_channel_message(1, 6), {}, {})
+    manager.process_update(new_channel_message(1, 6), {}, {})
+
+    assert len(dispatched(client)) == 3
+    assert manager.channels == {1: 6, 2: 100}
+
+
+def test_rpc_result():
+    client = Client()
+    manager = UpdatesManager(client)
+    manager.pts = 10
+
+    manager.process_rpc_result(raw.types.UpdateShortSentMessage(id=1, pts=11, pts_count=1, date=0))
+    manager.process_update(new_message(12), {}, {})
+
+    assert [u.pts for u in dispatched(client)] == [12]
+
+
+@pytest.mark.asyncio
+async def test_catch_up():
+    client = Client()
+    client.storage.state = [(0, 10, 0, 0, 0)]
+    client.responses.append(
+        raw.types.updates.Difference(
+            new_messages=[raw.types.MessageEmpty(id=11)],
+            new_encrypted_messages=[],
+            other_updates=[],
+            chats=[],
+            users=[],
+            state=raw.types.updates.State(pts=11, qts=0, date=0, seq=0, unread_count=0),
+        )
+    )
+
+    manager = UpdatesManager(client)
+    await manager.start()
+
+    manager.process_update(new_message(12), {}, {})
+    manager.process_update(
+        raw.types.UpdateUserStatus(user_id=1, status=raw.types.UserStatusEmpty()), {}, {}
+    )
+
+    await manager.catch_up_task
+
+    updates = dispatched(client)
+
+    assert [type(u) for u in updates] == [
+        raw.types.UpdateNewMessage,
+        raw.types.UpdateNewMessage,
+        raw.types.UpdateUserStatus,
+    ]
+    assert updates[0].message.id == 11
+    assert manager.catch_up_updates == 1
+    assert manager.pts == 12
+
+    await manager.stop()
+
+    assert client.storage.state == [(0, 12, 0, 0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_catch_up_keeps_arrival_order():
+    client = Client()
+    client.storage.state = [(0, 10, 0, 0, 0)]
+    client.responses.append(raw.types.updates.DifferenceEmpty(date=0, seq=0))
+
+    manager = UpdatesManager(client)
+    await manager.start()
+
+    status = raw.types.UpdateUserStatus(user_id=1, status=raw.types.UserStatusEmpty())
+
+    manager.process_update(status, {}, {})
+    manager.process_update(new_message(11), {}, {})
+    manager.process_update(status, {}, {})
+
+    await manager.catch_up_task
+
+    assert [type(u) for u in dispatched(client)] == [
+        raw.types.UpdateUserStatus,
+        raw.types.UpdateNewMessage,
+        raw.types.UpdateUserStatus,
+    ]
+
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_catch_up_lost_channel():
+    client = Client()
+    client.storage.state = [(0, 10, 0, 0, 0), (5, 100, None, None, None)]
+    client.responses.extend([
+        raw.types.updates.DifferenceEmpty(date=0, seq=0),
+        errors.ChannelPrivate(),
+    ])
+
+    manager = UpdatesManager(client)
+    await manager.start()
+    await manager.catch_up_task
+
+    assert isinstance(client.requests[1], raw.functions.updates.GetChannelDifference)
+
+    # The channel is no longer tracked nor fetched on the next start
+    assert manager.channels == {}
+    assert client.storage.state == [(0, 10, 0, 0, 0)]
+
+    await manager.stop()